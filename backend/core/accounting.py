@@ -0,0 +1,166 @@
+"""
+Mission Token Accounting for SysMind.
+Every model call is charged to the mission from the API's usage metadata
+(local estimate as fallback), so cost and latency per incident are measured
+instead of hand-written. A history compactor keeps the prompt under a token
+budget by folding older steps into a rolling summary instead of dropping them.
+"""
+import os
+import time
+
+from backend.core.ratelimit import BudgetExhausted, estimate_tokens
+
+
+class TokenLedger:
+    """
+    Per-mission token and latency totals, with an optional hard token budget.
+    """
+
+    def __init__(self, mission_budget: int = 0):
+        self.mission_budget = mission_budget
+        self.started = time.time()
+        self.calls = []
+        self.tool_calls = 0
+        self.tool_latency_s = 0.0
+        self.compactions = 0
+        self.cycles = []
+
+    def record(self, step: int, prompt_tokens: int, output_tokens: int, latency_s: float, source: str = "usage"):
+        """Charges one model call. `source` is 'usage' (API metadata) or 'estimate'."""
+        self.calls.append({
+            "step": step,
+            "prompt_tokens": int(prompt_tokens or 0),
+            "output_tokens": int(output_tokens or 0),
+            "latency_s": round(latency_s, 3),
+            "source": source,
+        })
+
+    def record_usage(self, step: int, response, est_prompt_tokens: int, latency_s: float):
+        """Charges a model response, falling back to the local estimator when usage metadata is missing."""
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None) if usage else None
+        if prompt_tokens:
+            output_tokens = (getattr(usage, "total_token_count", None) or 0) - prompt_tokens
+            if output_tokens <= 0:
+                output_tokens = getattr(usage, "candidates_token_count", None) or 0
+            self.record(step, prompt_tokens, output_tokens, latency_s, "usage")
+        else:
+            self.record(step, est_prompt_tokens, estimate_tokens(self._output_text(response)), latency_s, "estimate")
+
+    @staticmethod
+    def _output_text(response) -> str:
+        """Text and function calls of a response, without the SDK's `.text` accessor warnings."""
+        chunks = []
+        for candidate in getattr(response, "candidates", None) or []:
+            content = getattr(candidate, "content", None)
+            for part in (content.parts if content else None) or []:
+                if part.text:
+                    chunks.append(part.text)
+                elif part.function_call:
+                    chunks.append(f"{part.function_call.name}({part.function_call.args})")
+        return "".join(chunks)
+
+    def record_cycle(self, step: int, think_s: float, first_action_s, cycle_s: float):
+        """Cycle timing; `first_action_s` is None for cycles that ran no tool."""
+        self.cycles.append({
+            "step": step,
+            "think_s": round(think_s, 3),
+            "time_to_first_action_s": None if first_action_s is None else round(first_action_s, 3),
+            "cycle_s": round(cycle_s, 3),
+        })
+
+    def record_tool(self, latency_s: float):
+        self.tool_calls += 1
+        self.tool_latency_s += latency_s
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(c["prompt_tokens"] + c["output_tokens"] for c in self.calls)
+
+    def check(self):
+        """Raises BudgetExhausted once the mission has spent its token budget."""
+        if self.mission_budget and self.total_tokens >= self.mission_budget:
+            raise BudgetExhausted(f"Mission token budget exhausted ({self.total_tokens}/{self.mission_budget} tokens)")
+
+    def totals(self) -> dict:
+        prompt = sum(c["prompt_tokens"] for c in self.calls)
+        output = sum(c["output_tokens"] for c in self.calls)
+        llm_latency = sum(c["latency_s"] for c in self.calls)
+        ttfa = [c["time_to_first_action_s"] for c in self.cycles if c["time_to_first_action_s"] is not None]
+        return {
+            "llm_calls": len(self.calls),
+            "prompt_tokens": prompt,
+            "output_tokens": output,
+            "total_tokens": prompt + output,
+            "avg_tokens_per_call": round((prompt + output) / len(self.calls), 1) if self.calls else 0.0,
+            "estimated_calls": sum(1 for c in self.calls if c["source"] == "estimate"),
+            "mission_token_budget": self.mission_budget or None,
+            "llm_latency_s": round(llm_latency, 3),
+            "tool_calls": self.tool_calls,
+            "tool_latency_s": round(self.tool_latency_s, 3),
+            "mission_duration_s": round(time.time() - self.started, 3),
+            "history_compactions": self.compactions,
+            "avg_time_to_first_action_s": round(sum(ttfa) / len(ttfa), 3) if ttfa else None,
+            "per_call": self.calls,
+            "cycles": self.cycles,
+        }
+
+
+class HistoryCompactor:
+    """
+    Rolling summary of older OODA steps. Recent steps stay verbatim; once the
+    history nears its token budget, everything older is folded into one line
+    per step, and the summary itself is capped to a quarter of the budget.
+    """
+
+    def __init__(self, token_budget: int = 4000, threshold: float = 0.8, keep_recent: int = 3):
+        self.token_budget = token_budget
+        self.threshold = threshold
+        self.keep_recent = keep_recent
+        self.compacted = 0
+        self.omitted = 0
+        self.summary_lines = []
+
+    @staticmethod
+    def summarize_step(h: dict) -> str:
+        result = " ".join(str(h["result"]).split())
+        if len(result) > 120:
+            result = result[:120] + "..."
+        return f"Step {h['step']}: {h['tool']}({h['args']}) -> {result}"
+
+    def needs_compaction(self, history_tokens: int) -> bool:
+        return bool(self.token_budget) and history_tokens >= self.token_budget * self.threshold
+
+    def compact(self, history: list) -> int:
+        """Folds all but the last `keep_recent` steps into the summary; returns how many were folded."""
+        cut = len(history) - self.keep_recent
+        if cut <= self.compacted:
+            return 0
+        folded = history[self.compacted:cut]
+        self.summary_lines.extend(self.summarize_step(h) for h in folded)
+        self.compacted = cut
+        # The summary must not become the new bloat
+        while len(self.summary_lines) > 1 and estimate_tokens("\n".join(self.summary_lines)) > self.token_budget // 4:
+            self.summary_lines.pop(0)
+            self.omitted += 1
+        return len(folded)
+
+    def recent(self, history: list) -> list:
+        return history[self.compacted:]
+
+    def summary_text(self) -> str:
+        if not self.summary_lines:
+            return ""
+        head = f"[{self.omitted} earlier steps omitted]\n" if self.omitted else ""
+        return "EARLIER STEPS (compacted):\n" + head + "\n".join(self.summary_lines) + "\n"
+
+
+def ledger_from_env() -> TokenLedger:
+    return TokenLedger(mission_budget=int(os.environ.get("SYSMIND_MISSION_TOKEN_BUDGET", "0")))
+
+
+def compactor_from_env() -> HistoryCompactor:
+    return HistoryCompactor(
+        token_budget=int(os.environ.get("SYSMIND_HISTORY_TOKEN_BUDGET", "4000")),
+        keep_recent=int(os.environ.get("SYSMIND_HISTORY_KEEP_RECENT", "3")),
+    )
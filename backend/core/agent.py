@@ -5,22 +5,35 @@
 import os
 import subprocess
 import time
-import functools
 import json
-import functools
-import json
-import base64
 import re
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 from google import genai
 from google.genai import types
 from backend.strategies.ubuntu import UbuntuStrategy
-from backend.tools.process import ProcessTools
+from backend.tools.process import SNAPSHOT_SORT_KEYS, ProcessTools
 from backend.tools.files import FileTools
 from backend.tools.service import ServiceTools
-from backend.tools.network import NetworkTools
-from backend.tools.multimodal import MultimodalTools
+from backend.tools.network import NetworkTools, SOCKET_STATES
+from backend.tools.metrics import MetricsTools
+from backend.tools.logs import LogTools, load_signatures
+from backend.tools.multimodal import MultimodalTools, estimate_image_tokens, image_digest, prepare_image, vision_cache_from_env
+from backend.transport.shell import ShellSession, ShellSessionError, ShellSessionLost
+from backend.transport.docker_api import get_transport
+from backend.core.cache import cache_from_env
+from backend.core.session import ChatSession
+from backend.core.accounting import compactor_from_env, ledger_from_env
+from backend.core.prefetch import Prefetcher
+from backend.core.rules import TELEMETRY_COMMAND, RuleEngine, parse_telemetry, rule_engine_from_env
+from backend.core.anomaly import analyze_metrics, describe as describe_metrics
+from backend.core.sampler import release_sampler, sampler_from_env
+from backend.core.diffing import differ_from_env
+from backend.core.cursors import cursor_store_from_env
+from backend.core.ratelimit import BudgetExhausted, RetryPolicy, estimate_tokens, get_rate_limiter
 from rich.console import Console
 from rich.panel import Panel
 from rich.live import Live
@@ -32,33 +45,38 @@ try:
 except ImportError:
     pyttsx3 = None
 
-def exponential_backoff(max_retries=10):
-    """Decorator for retrying API calls with extreme patience for free tiers."""
-    def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            retries = 0
-            while retries < max_retries:
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    if "429" in str(e):
-                        # Free tier needs very long cooldowns if RPM is hit
-                        wait_time = (2 ** retries) * 15 
-                        print(f"[RETRY] Quota exceeded (429). Waiting {wait_time}s for reset (Retry {retries+1}/{max_retries})...")
-                        time.sleep(wait_time)
-                        retries += 1
-                    else:
-                        raise e
-            return func(*args, **kwargs)
-        return wrapper
-    return decorator
+# Knowledge base file is shared by every agent in the process (fleet mode)
+_KB_LOCK = threading.Lock()
+
+# Time-range and severity filters shared by read_log and grep_file (served by the target-side log index)
+LOG_FILTER_SCHEMA = {
+    "since": types.Schema(type="STRING", description="Start time, 'YYYY-MM-DD HH:MM[:SS]' or 'HH:MM' (log's latest day)."),
+    "until": types.Schema(type="STRING", description="End time, same formats."),
+    "level": types.Schema(type="STRING", description="Minimum severity, e.g. ERROR (includes CRITICAL/FATAL)."),
+}
+
+# Diagnostics with no side effects on the target: safe to start before the model turn is complete
+READ_ONLY_TOOLS = frozenset({
+    "list_processes", "list_directory", "read_log", "grep_file", "check_service", "get_net_stats",
+    "check_disk_space", "get_system_stats", "analyze_metrics", "get_metrics", "snapshot_processes",
+    "inspect_sockets", "summarize_log", "logs_around", "search_logs", "scan_log_signatures",
+})
+
+
+def create_client(api_key: str = None):
+    """Gemini client; GEMINI_BASE_URL points it at a compatible endpoint (e.g. the local stub server)."""
+    base_url = os.environ.get("GEMINI_BASE_URL")
+    if base_url:
+        return genai.Client(api_key=api_key or "stub", http_options=types.HttpOptions(base_url=base_url))
+    return genai.Client(api_key=api_key)
 
 class SysMindAgent:
     """
     SysMind: An autonomous SRE Agent (Titanium & Grand Prize Edition).
     """
-    def __init__(self, target_name: str = "sysmind-target"):
+    def __init__(self, target_name: str = "sysmind-target", client=None, console: Console = None,
+                 report_dir: str = ".", budget=None, interactive: bool = True, auto_approve: bool = False,
+                 transport=None, brain=None):
         self.target_name = target_name
         self.strategy = None
         self.process_tools = None
@@ -66,8 +84,72 @@ class SysMindAgent:
         self.service_tools = None
         self.network_tools = None
         self.multimodal_tools = None
-        self.console = Console(force_terminal=True, legacy_windows=True, safe_box=True)
+        self.metrics_tools = None
+        self.log_tools = None
+        self.console = console or Console(force_terminal=True, legacy_windows=True, safe_box=True)
+        # Fleet Mode hooks: per-target report directory, shared LLM budget, progress events
+        self.report_dir = report_dir
+        self.budget = budget
+        # Process-wide RPM/TPM scheduler: calls are paced before they are sent, not after a 429
+        self.rate_limiter = get_rate_limiter()
+        # Optional content-addressed response cache (SYSMIND_CACHE=true)
+        self.response_cache = cache_from_env()
+        self._tool_schema = None
+        # Built once per agent, not once per cycle
+        self._tool_declarations = None
+        self._gen_config = None
+        # Session mode: structured multi-turn conversation instead of a rebuilt prompt string
+        self.chat_mode = os.environ.get("SYSMIND_CHAT_SESSION", "false").lower() == "true"
+        self._last_model_content = None
+        # Per-mission token/latency accounting (reset by every ooda_loop)
+        self.ledger = ledger_from_env()
+        self.mission_metrics = None
+        self._step = 0
+        # Streaming: read-only calls start while the rest of the turn is still arriving
+        self.streaming = os.environ.get("SYSMIND_STREAMING", "false").lower() == "true"
+        self._dispatcher = None
+        self._dispatched = []
+        self._cycle_started = None
+        # Speculative prefetch of the usual opening diagnostics while the model thinks
+        self.prefetch_enabled = os.environ.get("SYSMIND_PREFETCH", "false").lower() == "true"
+        self.prefetch_max_age = float(os.environ.get("SYSMIND_PREFETCH_MAX_AGE", "10"))
+        self.prefetcher = None
+        # Rule engine fast path: known incident signatures resolved without an LLM round trip
+        self.rule_engine = rule_engine_from_env()
+        self._rule_pending = None
+        self._rules_done = True
+        self._rule_hint = ""
+        self.rule_stats = {}
+        # Vision path: screenshots are shrunk before upload and analyses cached by image SHA-256
+        self.vision_cache = vision_cache_from_env()
+        self.vision_max_side = int(os.environ.get("SYSMIND_VISION_MAX_SIDE", "1024"))
+        self.vision_stats = {}
+        # Numeric series first: a screenshot only goes to the vision model when no raw series can be sampled
+        self.vision_fallback_only = os.environ.get("SYSMIND_VISION_FALLBACK_ONLY", "true").lower() == "true"
+        # Background CPU/MEM/NET/IO sampler for this target (SYSMIND_METRICS_SAMPLER=true), started on connect
+        self.sampler = None
+        # Repeated read-only diagnostics reach the model as diffs against their previous output
+        self.differ = differ_from_env()
+        # Log kit (scripts/logkit.py) is installed on the target on first use
+        self._logkit_ready = False
+        # read_log(since_last=True) positions, per target and file, kept across missions
+        self.log_cursors = cursor_store_from_env()
+        self.on_event = None
+        # Non-interactive agents (fleet workers) never block on input(); they deny unless auto_approve
+        self.interactive = interactive
+        self.auto_approve = auto_approve
         self.simulation_mode = os.environ.get("SYSMIND_SIMULATION", "false").lower() == "true"
+        # Pluggable brain (e.g. ScriptedBrain): decide(prompt) -> [(tool, args)], replaces the model
+        self.brain = brain
+        # Titanium Transport: one long-lived shell per target (one-shot docker exec stays as fallback)
+        self.persistent_shell = os.environ.get("SYSMIND_PERSISTENT_SHELL", "true").lower() == "true" and transport is None
+        self.shell = None
+        self._shell_warned = False
+        # Engine API over the Docker socket (pooled, shared by every agent in the process),
+        # or any object with the same surface (e.g. FakeTarget)
+        self.transport = transport or get_transport()
+        # Hard cap on tool output held in memory (head/tail ring, totals always reported)
+        self.output_cap = int(os.environ.get("SYSMIND_OUTPUT_CAP_BYTES", "16384"))
         
         # Identity Policy: Grand Prize & Titanium Hybrid (SRE USE Methodology)
         self.identity = (
@@ -90,6 +172,8 @@ class SysMindAgent:
             "2. Check Saturation (e.g., queue lengths, high load average). "
             "3. Check Errors (e.g., tail -n 50 /var/log/syslog, grep ERROR). "
             
+            "VERIFY: After a remediation, confirm recovery with get_metrics (post-action window) instead of re-running ps. "
+
             "MEMORY: Utilize previous incident knowledge if applicable. "
             "DO NOT jump to conclusions. You must verify a failure from at least TWO independent sources. "
             "Finalize with a 'post_mortem.md' report using 'write_file'."
@@ -97,13 +181,17 @@ class SysMindAgent:
         )
 
         api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            print("[CRITICAL] GEMINI_API_KEY not found in .env")
+        # Gemini 3 Flash optimized, fallback to 2.0 Flash for testing
+        self.model_id = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
+        if client is not None:
+            # Shared client (Fleet Mode): one connection pool for every worker
+            self.client = client
+        elif not api_key and not os.environ.get("GEMINI_BASE_URL"):
+            if brain is None:
+                print("[CRITICAL] GEMINI_API_KEY not found in .env")
             self.client = None
         else:
-            self.client = genai.Client(api_key=api_key)
-            # Gemini 3 Flash optimized, fallback to 2.0 Flash for testing
-            self.model_id = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
+            self.client = create_client(api_key)
             
             if "gemini-3" in self.model_id:
                 self.console.print("[bold green][OK][/bold green] Using Gemini 3 Flash (Optimized)")
@@ -130,9 +218,14 @@ class SysMindAgent:
 
     def _save_knowledge(self, lesson: str):
         """Saves a new lesson to the knowledge base."""
-        self.knowledge.append({"date": datetime.now().strftime("%Y-%m-%d"), "lesson": lesson})
-        with open(self.kb_file, 'w') as f:
-            json.dump({"lessons": self.knowledge[-5:]}, f, indent=2) # Keep last 5 lessons
+        entry = {"date": datetime.now().strftime("%Y-%m-%d"), "lesson": lesson}
+        with _KB_LOCK:
+            # Re-read under the lock: other agents of the fleet may have saved lessons since our load
+            self.knowledge = (self._load_knowledge() + [entry])[-5:] # Keep last 5 lessons
+            tmp = f"{self.kb_file}.{os.getpid()}.{threading.get_ident()}"
+            with open(tmp, 'w') as f:
+                json.dump({"lessons": self.knowledge}, f, indent=2)
+            os.replace(tmp, self.kb_file)
 
     def _speak(self, text: str):
         """Grand Prize Audio Feedback (Jarvis Mode)."""
@@ -144,15 +237,132 @@ class SysMindAgent:
             engine.runAndWait()
         except: pass
 
+    def _emit(self, event: str, **data):
+        """Progress hook for aggregate views (Fleet Mode). Never breaks the mission."""
+        if self.on_event:
+            try:
+                self.on_event(self.target_name, event, **data)
+            except Exception:
+                pass
+
+    def _confirm(self, question: str) -> bool:
+        """Human approval gate; non-interactive agents fall back to their auto_approve policy."""
+        if not self.interactive:
+            self.console.print(f"[bold yellow][SAFETY] Non-interactive: {'auto-approved' if self.auto_approve else 'denied'} ({question.strip()})[/bold yellow]")
+            return self.auto_approve
+        return input(question).lower() == 'y'
+
+    def _llm_slot(self):
+        """Shared budget slot around every model call (no-op for a standalone agent)."""
+        return self.budget.slot() if self.budget else nullcontext()
+
+    def _call_model(self, est_tokens: int, prompt_tokens: int = None, **request):
+        """Single entry point for generate_content: budget slot + shared rate limiter + bounded retries + accounting."""
+        def send():
+            with self._llm_slot():
+                started = time.time()
+                response = self.client.models.generate_content(**request)
+                self.ledger.record_usage(self._step, response, prompt_tokens or est_tokens, time.time() - started)
+                return response
+
+        def on_retry(attempt, delay, error):
+            self.console.print(f"[yellow][RETRY] Model call failed ({RetryPolicy.status_code(error)}). "
+                               f"Retry {attempt}/{self.rate_limiter.retry_policy.max_retries} in {delay:.1f}s...[/yellow]")
+
+        return self.rate_limiter.call(send, est_tokens=est_tokens, on_retry=on_retry)
+
+    def _stream_model(self, est_tokens: int, prompt_tokens: int = None, on_call=None, **request):
+        """
+        Streaming generate_content: thought text renders live while chunks arrive and
+        each complete function call is handed to `on_call` immediately. Returns the
+        assembled response so callers see the same shape as a blocking call.
+        """
+        def send():
+            with self._llm_slot():
+                started = time.time()
+                parts, usage, grounding = [], None, None
+                text = Text()
+                panel = lambda: Panel(text, title="[bold cyan]🧠 Brain Streaming...[/bold cyan]", border_style="cyan")
+                with Live(panel(), console=self.console, transient=True, refresh_per_second=8) as live:
+                    for chunk in self.client.models.generate_content_stream(**request):
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                        if not chunk.candidates:
+                            continue
+                        candidate = chunk.candidates[0]
+                        grounding = getattr(candidate, "grounding_metadata", None) or grounding
+                        for part in (candidate.content.parts if candidate.content else None) or []:
+                            parts.append(part)
+                            if part.function_call and on_call:
+                                args = {k: v for k, v in part.function_call.args.items()} if part.function_call.args else {}
+                                on_call(len([p for p in parts if p.function_call]) - 1, part.function_call.name, args)
+                            elif part.text:
+                                text.append(part.text)
+                                live.update(panel())
+                if text and any(p.function_call for p in parts):
+                    # Live was transient: keep the reasoning that accompanied the actions
+                    self.console.print(Panel(text, title="[bold cyan]🧠 Cognitive Process[/bold cyan]", border_style="cyan"))
+                response = types.GenerateContentResponse(
+                    candidates=[types.Candidate(content=types.Content(role="model", parts=parts), grounding_metadata=grounding)] if parts else [],
+                    usage_metadata=usage,
+                )
+                self.ledger.record_usage(self._step, response, prompt_tokens or est_tokens, time.time() - started)
+                return response
+
+        def on_retry(attempt, delay, error):
+            self.console.print(f"[yellow][RETRY] Model stream failed ({RetryPolicy.status_code(error)}). "
+                               f"Retry {attempt}/{self.rate_limiter.retry_policy.max_retries} in {delay:.1f}s...[/yellow]")
+
+        return self.rate_limiter.call(send, est_tokens=est_tokens, on_retry=on_retry)
+
+    def _timed_tool(self, name: str, args: dict):
+        started = time.time()
+        result = self.run_tool(name, **args)
+        return result, time.time() - started
+
+    def _dispatch_early(self, index: int, name: str, args: dict):
+        """
+        Starts a streamed function call before the turn is complete. Only an unbroken
+        prefix of read-only calls is dispatched, so execution order is never changed
+        and destructive actions still wait for the full turn (and HITL).
+        """
+        if index < len(self._dispatched):
+            return  # already handled (stream retried)
+        if name not in READ_ONLY_TOOLS or (self._dispatched and self._dispatched[-1] is None):
+            self._dispatched.append(None)  # the prefix is closed
+            return
+        if self._dispatcher is None:
+            self._dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sysmind-dispatch")
+        dispatched_at = time.time()
+        self._dispatched.append((name, args, dispatched_at, self._dispatcher.submit(self._timed_tool, name, args)))
+        self.console.print(f"[dim][EARLY DISPATCH] {name} started while the model is still streaming.[/dim]")
+
+    def _drain_dispatched(self):
+        """Waits out early-dispatched calls nobody collected (failed cycle) so the target link is free."""
+        for entry in self._dispatched:
+            if entry is not None:
+                try:
+                    entry[3].result()
+                except Exception:
+                    pass
+        self._dispatched = []
+
+    def _close_cycle(self, step: int, think_s: float, first_action: float):
+        """Cycle timing: model wait, time-to-first-action and total, reported separately."""
+        now = time.time()
+        ttfa = round(first_action - self._cycle_started, 3) if first_action else None
+        self.ledger.record_cycle(step, think_s, ttfa, now - self._cycle_started)
+        first = f"{ttfa:.2f}s" if ttfa is not None else "-"
+        self.console.print(f"[dim][TIMING] think {think_s:.2f}s | first action {first} | cycle {now - self._cycle_started:.2f}s[/dim]")
+
+    def _report_path(self, filename: str) -> str:
+        os.makedirs(self.report_dir, exist_ok=True)
+        return os.path.join(self.report_dir, filename)
+
     def connect(self):
         """Verifies target accessibility with safety timeout."""
         self.console.print(Panel(f"Connecting to target container: [bold cyan]'{self.target_name}'[/bold cyan]...", title="[bold blue]Connection[/bold blue]", border_style="blue"))
         try:
-            check = subprocess.run(
-                ["docker", "inspect", "-f", "{{.State.Running}}", self.target_name],
-                capture_output=True, text=True, timeout=10
-            )
-            if "true" not in check.stdout.lower():
+            if not self.transport.is_running(self.target_name):
                 print(f"[FAIL] Target '{self.target_name}' is not running.")
                 return False
         except Exception as e:
@@ -160,6 +370,8 @@ class SysMindAgent:
              return False
 
         self._detect_os()
+        if self.sampler is None:
+            self.sampler = sampler_from_env(self.transport, self.target_name)
         return True
 
     def _detect_os(self):
@@ -172,27 +384,212 @@ class SysMindAgent:
         self.service_tools = ServiceTools()
         self.network_tools = NetworkTools()
         self.multimodal_tools = MultimodalTools()
+        self.metrics_tools = MetricsTools(self.strategy)
+        self.log_tools = LogTools()
+
+    def _execute(self, command: str, timeout: int = 10) -> str:
+        """Executes command on the target, preferring the persistent shell session."""
+        if self.persistent_shell:
+            if self.shell is None:
+                self.shell = ShellSession(self.target_name, default_timeout=timeout)
+            try:
+                returncode, stdout, stderr = self.shell.run(command, timeout=timeout, max_bytes=self.output_cap)
+                return self._format_result(returncode, stdout, stderr)
+            except subprocess.TimeoutExpired:
+                return f"Error: Command timed out ({timeout}s)."
+            except ShellSessionLost as e:
+                # Outcome unknown: never replay the command through the fallback path
+                return f"Error: {e}"
+            except ShellSessionError as e:
+                if not self._shell_warned:
+                    self._shell_warned = True
+                    self.console.print(f"[dim][TRANSPORT] Persistent shell unavailable ({e}). Using one-shot docker exec.[/dim]")
+        return self._execute_oneshot(command, timeout)
 
-    def _execute(self, command: str) -> str:
-        """Executes command via docker exec with safety timeout."""
-        env = os.environ.copy()
-        env["MSYS_NO_PATHCONV"] = "1"
-        full_cmd = ["docker", "exec", self.target_name, "bash", "-c", command]
+    def _fast_path(self, objective: str, history: list):
+        """
+        Rule engine decision for this cycle, or None to let the model decide.
+        Only rules related to the objective are considered. Runs until the first
+        cycle it cannot handle with confidence; from then on the model owns the
+        mission (with the rule engine's finding as a hint).
+        """
+        if self._rules_done:
+            return None
         try:
-            result = subprocess.run(full_cmd, capture_output=True, text=True, env=env, timeout=10)
-            if result.returncode != 0:
-                return f"Error ({result.returncode}): {result.stderr.strip() or result.stdout.strip()}"
-            # POPRAWKA: Obsługa pustego sukcesu (Silence prevention)
-            output = result.stdout.strip()
-            if not output:
-                return "Command executed successfully (no output)."
+            telemetry = parse_telemetry(self._execute(TELEMETRY_COMMAND))
+            pending = self._rule_pending
+            if pending is not None:
+                if history and str(history[-1]["result"]).startswith("Safety Violation"):
+                    return self._rules_fallback("denied", f"[RULE ENGINE] Remediation for {RuleEngine.describe(pending)} was denied by the operator.")
+                still = self.rule_engine.evaluate(telemetry, only=pending["rule"]["id"])
+                if not still:
+                    self._rules_done = True
+                    self.rule_stats["outcome"] = "resolved"
+                    return [
+                        ("THOUGHT", f"RULE ENGINE: post-action telemetry no longer matches '{pending['rule']['id']}'."),
+                        ("mission_complete", {"summary": RuleEngine.summary(pending)}),
+                    ]
+                if pending["attempts"] >= pending["rule"].get("max_attempts", 1):
+                    return self._rules_fallback("persisted", f"[RULE ENGINE] Signature {RuleEngine.describe(still[0])} persisted after {pending['attempts']} remediation attempts. Investigate the cause.")
+                finding = still[0]
+                finding["attempts"] = pending["attempts"]
+            else:
+                findings = self.rule_engine.evaluate(telemetry, objective=objective)
+                if not findings:
+                    return self._rules_fallback("no_match", "")
+                finding = findings[0]
+                if not self.rule_engine.is_confident(finding):
+                    return self._rules_fallback("low_confidence", f"[RULE ENGINE] Low-confidence match {RuleEngine.describe(finding)}. Verify before acting.")
+                finding["attempts"] = 0
+        except Exception as e:
+            return self._rules_fallback("error", f"[RULE ENGINE] Unavailable: {e}")
+
+        finding["attempts"] += 1
+        self._rule_pending = finding
+        self.rule_stats["matched"] = finding["rule"]["id"]
+        self.rule_stats["decisions"] = self.rule_stats.get("decisions", 0) + 1
+        tool, args = RuleEngine.remediation(finding)
+        return [("THOUGHT", f"RULE ENGINE: matched {RuleEngine.describe(finding)}. Proposing {tool}({args}) without an LLM call."), (tool, args)]
+
+    def _rules_fallback(self, outcome: str, hint: str):
+        self._rules_done = True
+        self._rule_hint = hint
+        self.rule_stats["outcome"] = outcome
+        if hint:
+            self.console.print(f"[yellow]{hint} Falling back to the model.[/yellow]")
+        return None
+
+    def _prefetch(self):
+        """Starts background diagnostics for this thinking phase (built after OS detection)."""
+        if not self.prefetch_enabled or self.process_tools is None:
+            return
+        if self.prefetcher is None:
+            # One-shot execs: they run in parallel and never contend with the persistent shell
+            self.prefetcher = Prefetcher({
+                "list_processes": self.process_tools.list_processes_command(),
+                "get_net_stats": self.network_tools.get_active_ports_command(),
+                "check_disk_space": self.file_tools.check_disk_space_command(),
+                "get_system_stats": self.strategy.get_system_stats_command(),
+            }, runner=self._execute_oneshot, max_age=self.prefetch_max_age)
+        self.prefetcher.start()
+
+    def _diagnostic(self, name: str, command: str) -> str:
+        """Read-only diagnostic, served from a fresh prefetch when one exists."""
+        if self.prefetcher is not None:
+            result = self.prefetcher.take(name)
+            if result is not None:
+                self.console.print(f"[dim][PREFETCH] {name} served from background prefetch.[/dim]")
+                return result
+        return self._execute(command)
+
+    def _run_logkit(self, command: str, timeout: int = 60) -> str:
+        """Runs a log kit command on the target, installing the kit first (and again if /tmp was wiped)."""
+        for attempt in range(2):
+            if not self._logkit_ready:
+                installed = self._execute(self.log_tools.install_command())
+                if installed.startswith("Error"):
+                    return f"Error: Log kit needs python3 on the target ({installed})"
+                self._logkit_ready = True
+            result = self._execute(command, timeout=timeout)
+            if "can't open file" not in result or attempt:
+                return result
+            self._logkit_ready = False
+
+    def _tail_log(self, path: str) -> str:
+        """New lines of a log since the stored cursor; the cursor only moves past what is returned."""
+        cursor = self.log_cursors.get(self.target_name, path)
+        output = self._run_logkit(self.log_tools.tail_command(path, cursor, max_bytes=max(1024, self.output_cap - 1024)))
+        if output.startswith("Error"):
             return output
-            
+        # The transport may put a [CAPTURE] header in front: look for the cursor line, not just at line 1
+        lines = output.split("\n")
+        for i, line in enumerate(lines[:5]):
+            fields = line.split()
+            if len(fields) == 4 and fields[0] == "CURSOR" and all(x.isdigit() for x in fields[1:]):
+                self.log_cursors.set(self.target_name, path, *(int(x) for x in fields[1:]))
+                return "\n".join(lines[:i] + lines[i + 1:])
+        return f"Error: Unexpected log tail output: {output[:200]}"
+
+    def _numeric_analysis(self, samples: int = 20, interval: float = 0.5):
+        """Samples CPU/MEM/IO series (target /proc, then docker stats) and describes their anomalies; None without a series."""
+        samples, interval = MetricsTools.clamp(samples, interval)
+        if self.sampler is not None:
+            # Already collected in the background: no round trip, and the window reaches back before the alert
+            window = self.sampler.ring.window(max(300.0, samples * interval))
+            if len(window["t"]) >= 8:
+                series = {"t": window["t"], "cpu": window["cpu"], "mem": window["mem"],
+                          "io": window["blk_read"] + window["blk_write"], "net": window["net_rx"] + window["net_tx"]}
+                return describe_metrics(analyze_metrics(series), series, "background sampler")
+        source = "/proc"
+        output = self._execute(self.metrics_tools.sample_series_command(samples, interval), timeout=int(samples * interval) + 10)
+        series = MetricsTools.parse_series(output)
+        if len(series["t"]) < 4:
+            source = "docker stats"
+            series = self._docker_stats_series(min(samples, 10), interval)
+        if series is None or len(series["t"]) < 4:
+            return None
+        try:
+            return describe_metrics(analyze_metrics(series), series, source)
+        except RuntimeError as e:
+            return f"Error: {e}"
+
+    def _docker_stats_series(self, samples: int, interval: float):
+        """Fallback series from the container runtime (each stats call itself takes ~1s)."""
+        if not hasattr(self.transport, "stats"):
+            return None
+        rows = []
+        try:
+            for _ in range(samples):
+                rows.append((time.time(), self.transport.stats(self.target_name)))
+                time.sleep(interval)
+        except Exception:
+            return None
+        series = {"t": [], "cpu": [], "mem": [], "io": []}
+        for (t0, prev), (t1, cur) in zip(rows, rows[1:]):
+            series["t"].append(t1)
+            series["cpu"].append(cur["cpu_percent"])
+            series["mem"].append(cur["mem_percent"])
+            blk = (cur["blk_read_bytes"] + cur["blk_write_bytes"]) - (prev["blk_read_bytes"] + prev["blk_write_bytes"])
+            series["io"].append(blk / 1024 / (t1 - t0) if t1 > t0 else 0.0)
+        return series
+
+    def _execute_oneshot(self, command: str, timeout: int = 10) -> str:
+        """Executes command via a single exec (Engine API, CLI fallback) with safety timeout."""
+        try:
+            returncode, stdout, stderr = self.transport.exec(self.target_name, command, timeout=timeout, max_bytes=self.output_cap)
+            return self._format_result(returncode, stdout, stderr)
         except subprocess.TimeoutExpired:
-            return "Error: Command timed out (10s)."
+            return f"Error: Command timed out ({timeout}s)."
         except Exception as e:
             return f"Error: {e}"
 
+    def _format_result(self, returncode: int, stdout, stderr) -> str:
+        """Normalizes bounded command captures into the tool result string."""
+        if returncode != 0:
+            return f"Error ({returncode}): {stderr.text().strip() or stdout.text().strip()}"
+        # POPRAWKA: Obsługa pustego sukcesu (Silence prevention)
+        output = stdout.text().strip()
+        if not output:
+            return "Command executed successfully (no output)."
+        if stdout.truncated:
+            # Header first: it survives any later head/tail trimming in the OODA loop
+            return f"{stdout.summary()}\n{output}"
+        return output
+
+    def close(self):
+        """Releases the persistent target session (and this agent's hold on the metrics sampler)."""
+        if self.sampler is not None:
+            release_sampler(self.sampler)
+            self.sampler = None
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        if self._dispatcher is not None:
+            self._dispatcher.shutdown(wait=True)
+            self._dispatcher = None
+        if self.shell is not None:
+            self.shell.close()
+            self.shell = None
+
     def _safety_check(self, command: str) -> bool:
         """Grand Prize Safety: Interactive Human-In-The-Loop."""
         # [DEMO OVERRIDE] In Simulation/Audit Mode, we assume pre-approved playbook
@@ -212,8 +609,7 @@ class SysMindAgent:
         destructive_verbs = ["kill", "rm", "restart", "stop", "printf"]
         if any(v in cmd_lower for v in destructive_verbs):
             print(f"\n[SAFETY INTERVENTION] Agent wants to execute: '{command}'")
-            user_approval = input(">>> Allow this operation? (y/N): ")
-            if user_approval.lower() != 'y':
+            if not self._confirm(">>> Allow this operation? (y/N): "):
                 print("[SAFETY] Action DENIED by human operator.")
                 return False
             print("[SAFETY] Action APPROVED by human operator.")
@@ -221,6 +617,32 @@ class SysMindAgent:
         return True
 
     def _get_tools_config(self):
+        """Tool declarations, built once per agent."""
+        if self._tool_declarations is None:
+            self._tool_declarations = self._build_tool_declarations()
+        return self._tool_declarations
+
+    def _generation_config(self) -> types.GenerateContentConfig:
+        """Tools (native functions + Search Grounding) and system instruction, built once per agent."""
+        if self._gen_config is None:
+            self._gen_config = types.GenerateContentConfig(
+                tools=[
+                    # 1. System Tools (Native Function Calling)
+                    types.Tool(function_declarations=self._get_tools_config()),
+                    # 2. Google Search Grounding (Grand Prize Feature)
+                    types.Tool(google_search=types.GoogleSearch()),
+                ],
+                system_instruction=self.identity,
+                temperature=0.1
+            )
+        return self._gen_config
+
+    @staticmethod
+    def _prompt_text(prompt) -> str:
+        """Text view of a prompt string or of structured chat contents."""
+        return prompt if isinstance(prompt, str) else ChatSession.render(prompt)
+
+    def _build_tool_declarations(self):
         """Full Titanium Toolset definitions for Gemini 3 Native Tool Use."""
         return [
             # --- PROCESS TOOLS ---
@@ -229,6 +651,18 @@ class SysMindAgent:
                 description="Check running processes for resource usage.",
                 parameters=types.Schema(type="OBJECT", properties={})
             ),
+            types.FunctionDeclaration(
+                name="snapshot_processes",
+                description="Compact /proc process table with true instantaneous CPU% (two samples a short interval apart), RSS, open FDs and threads. Top-K by cpu, rss or fds. Preferred over list_processes during spikes.",
+                parameters=types.Schema(
+                    type="OBJECT",
+                    properties={
+                        "sort_by": types.Schema(type="STRING", enum=["cpu", "rss", "fds"], description="Ranking key (default cpu)"),
+                        "top": types.Schema(type="INTEGER", description="Rows to return (default 10, max 50)"),
+                        "interval": types.Schema(type="NUMBER", description="Seconds between the two samples (default 0.5)")
+                    }
+                )
+            ),
             types.FunctionDeclaration(
                 name="kill_process",
                 description="Terminate a process by its PID.",
@@ -253,28 +687,86 @@ class SysMindAgent:
             ),
             types.FunctionDeclaration(
                 name="read_log",
-                description="Examine last lines of a log file.",
+                description="Examine last lines of a log file. Omit 'lines' for the whole file when small, else a bounded head/tail view with its total size. With since/until/level, seeks through a time/level index instead (fast on multi-GB logs) and returns the last matching lines.",
+                parameters=types.Schema(
+                    type="OBJECT",
+                    properties={
+                        "path": types.Schema(type="STRING", description="Log path."),
+                        "lines": types.Schema(type="INTEGER", description="Line count."),
+                        "since_last": types.Schema(type="BOOLEAN", description="Only lines appended since the previous since_last read of this file (survives rotation, truncation and new missions)."),
+                        **LOG_FILTER_SCHEMA
+                    },
+                    required=["path"]
+                )
+            ),
+            types.FunctionDeclaration(
+                name="summarize_log",
+                description="Compress a whole log (or a time window) into message templates with counts, first/last timestamps and level/service histograms. Rare and ERROR+ lines are returned verbatim. Use before reading or grepping a large log.",
                 parameters=types.Schema(
                     type="OBJECT",
                     properties={
                         "path": types.Schema(type="STRING", description="Log path."),
-                        "lines": types.Schema(type="INTEGER", description="Line count.")
+                        "since": LOG_FILTER_SCHEMA["since"],
+                        "until": LOG_FILTER_SCHEMA["until"],
+                        "top": types.Schema(type="INTEGER", description="Most frequent templates to list (default 15).")
                     },
                     required=["path"]
                 )
             ),
+            types.FunctionDeclaration(
+                name="logs_around",
+                description="Log lines within +/- window seconds of a timestamp (e.g. a spike onset from analyze_metrics), across the log and its rotations (.1, .2.gz...). Binary search: cheap on multi-GB logs.",
+                parameters=types.Schema(
+                    type="OBJECT",
+                    properties={
+                        "path": types.Schema(type="STRING", description="Log path (rotations are found automatically)."),
+                        "timestamp": types.Schema(type="STRING", description="'YYYY-MM-DD HH:MM:SS' or 'HH:MM[:SS]' (log's latest day)."),
+                        "window": types.Schema(type="NUMBER", description="Seconds before and after (default 60)."),
+                        "limit": types.Schema(type="INTEGER", description="Max lines, split around the timestamp (default 100).")
+                    },
+                    required=["path", "timestamp"]
+                )
+            ),
             types.FunctionDeclaration(
                 name="grep_file",
-                description="Search for a pattern in a file with context (2 lines before/after).",
+                description="Search for a pattern in a file with context (2 lines before/after). With since/until/level, only lines in that time range and severity are searched, via the log index.",
                 parameters=types.Schema(
                     type="OBJECT",
                     properties={
                         "pattern": types.Schema(type="STRING", description="The text/regex to find."),
-                        "path": types.Schema(type="STRING", description="File path.")
+                        "path": types.Schema(type="STRING", description="File path."),
+                        **LOG_FILTER_SCHEMA
+                    },
+                    required=["pattern", "path"]
+                )
+            ),
+            types.FunctionDeclaration(
+                name="search_logs",
+                description="Search a log and all its rotations (syslog, syslog.1, syslog.2.gz, .zst...) or a glob in one call. Compressed files are read on the fly, files are searched in parallel, and matches are merged in time order (newest 'limit' kept).",
+                parameters=types.Schema(
+                    type="OBJECT",
+                    properties={
+                        "pattern": types.Schema(type="STRING", description="Regex to find."),
+                        "path": types.Schema(type="STRING", description="Log path (rotations included) or a glob like /var/log/nginx/*.log*."),
+                        "ignore_case": types.Schema(type="BOOLEAN", description="Case-insensitive match."),
+                        "limit": types.Schema(type="INTEGER", description="Max matches returned (default 100).")
                     },
                     required=["pattern", "path"]
                 )
             ),
+            types.FunctionDeclaration(
+                name="scan_log_signatures",
+                description="Check a log against the whole library of known failure signatures (OOM killer, disk full, fd exhaustion, DB pool exhaustion, segfaults, 5xx...) in one pass. Returns hit counts with first/last line and timestamp per matched signature. Cheaper than one grep per suspicion.",
+                parameters=types.Schema(
+                    type="OBJECT",
+                    properties={
+                        "path": types.Schema(type="STRING", description="Log path or a glob like /var/log/*.log."),
+                        "signatures": types.Schema(type="ARRAY", items=types.Schema(type="STRING"),
+                                                   description="Only these signature ids (default: all).")
+                    },
+                    required=["path"]
+                )
+            ),
             types.FunctionDeclaration(
                 name="write_file",
                 description="Write content to a file (used for SRE reports).",
@@ -311,6 +803,49 @@ class SysMindAgent:
                 description="List listening network ports (ss -tuln).",
                 parameters=types.Schema(type="OBJECT", properties={})
             ),
+            types.FunctionDeclaration(
+                name="inspect_sockets",
+                description="Map sockets to their owning PID and command from /proc/net (one call answers 'who holds port N'). Filter by port and state.",
+                parameters=types.Schema(
+                    type="OBJECT",
+                    properties={
+                        "port": types.Schema(type="INTEGER", description="Local port to look up (default all)."),
+                        "state": types.Schema(type="STRING", description="TCP state, e.g. LISTEN (default; includes bound UDP), ESTABLISHED, TIME_WAIT, or ALL.")
+                    }
+                )
+            ),
+            types.FunctionDeclaration(
+                name="check_disk_space",
+                description="Show filesystem usage (df -h).",
+                parameters=types.Schema(type="OBJECT", properties={})
+            ),
+            types.FunctionDeclaration(
+                name="get_system_stats",
+                description="CPU load, memory and task summary (top header).",
+                parameters=types.Schema(type="OBJECT", properties={})
+            ),
+            types.FunctionDeclaration(
+                name="analyze_metrics",
+                description="Sample CPU, memory and block IO time series on the target and detect anomalies numerically (spike vs. leak, onset time, magnitude). Prefer this over analyze_dashboard.",
+                parameters=types.Schema(
+                    type="OBJECT",
+                    properties={
+                        "samples": types.Schema(type="INTEGER", description="Number of samples (default 20, max 120)"),
+                        "interval": types.Schema(type="NUMBER", description="Seconds between samples (default 0.5)")
+                    }
+                )
+            ),
+            types.FunctionDeclaration(
+                name="get_metrics",
+                description="Windowed CPU/memory/network/block IO statistics (last, min, max, mean, p50, p95) from the continuous background sampler. Use it to verify recovery right after a fix.",
+                parameters=types.Schema(
+                    type="OBJECT",
+                    properties={
+                        "window": types.Schema(type="NUMBER", description="Look-back window in seconds (default 60)"),
+                        "metrics": types.Schema(type="ARRAY", items=types.Schema(type="STRING"), description="Subset of cpu, mem, net_rx, net_tx, blk_read, blk_write")
+                    }
+                )
+            ),
             # --- MULTIMODAL ANALYSIS (Gemini 3 Showcase) ---
             types.FunctionDeclaration(
                 name="analyze_dashboard",
@@ -333,11 +868,30 @@ class SysMindAgent:
             )
         ]
 
+    def _tool_schema_json(self) -> list:
+        """JSON form of the tool declarations (part of the response cache key)."""
+        if self._tool_schema is None:
+            self._tool_schema = [d.model_dump(mode="json", exclude_none=True) for d in self._get_tools_config()]
+        return self._tool_schema
+
     def run_tool(self, name: str, **kwargs) -> str:
         """Routes tool calls to actual system implementations."""
+        # Anything that may change the target makes earlier prefetched diagnostics unusable
+        if self.prefetcher is not None and name not in READ_ONLY_TOOLS and name != "analyze_dashboard":
+            self.prefetcher.invalidate()
         # Process
         if name == "list_processes": 
-            return self._execute(self.process_tools.list_processes_command())
+            return self._diagnostic(name, self.process_tools.list_processes_command())
+        if name == "snapshot_processes":
+            sort_by = kwargs.get("sort_by", "cpu")
+            if sort_by not in SNAPSHOT_SORT_KEYS:
+                return f"Error: sort_by must be one of {', '.join(SNAPSHOT_SORT_KEYS)}."
+            interval = kwargs.get("interval", 0.5)
+            output = self._execute(self.process_tools.snapshot_command(sort_by, kwargs.get("top", 10), interval),
+                                   timeout=int(float(interval)) + 15)
+            if output.startswith("Error"):
+                return output
+            return ProcessTools.format_snapshot(output, sort_by) or f"Error: Unexpected snapshot output: {output[:200]}"
         if name == "kill_process":
             cmd = self.process_tools.kill_process_command(kwargs["pid"], kwargs.get("force", False))
             return self._execute(cmd) if self._safety_check(cmd) else "Safety Violation: Denied."
@@ -345,9 +899,37 @@ class SysMindAgent:
         # Files
         if name == "list_directory": 
             return self._execute(self.file_tools.get_list_command(kwargs.get("path", "/")))
+        if name in ("read_log", "grep_file") and any(kwargs.get(k) for k in ("since", "until", "level")):
+            return self._run_logkit(self.log_tools.query_command(
+                kwargs["path"], kwargs.get("since"), kwargs.get("until"), kwargs.get("level"),
+                kwargs.get("pattern"), kwargs.get("lines") or 100, newest=name == "read_log"))
+        if name == "summarize_log":
+            return self._run_logkit(self.log_tools.summarize_command(
+                kwargs["path"], kwargs.get("since"), kwargs.get("until"), kwargs.get("top") or 15), timeout=120)
+        if name == "logs_around":
+            return self._run_logkit(self.log_tools.around_command(
+                kwargs["path"], kwargs["timestamp"], kwargs.get("window") or 60, kwargs.get("limit") or 100))
+        if name == "read_log" and kwargs.get("since_last"):
+            return self._tail_log(kwargs["path"])
         if name == "read_log": 
-            # Support full file reading (lines=None) for long context showcase
-            return self._execute(self.file_tools.get_read_command(kwargs["path"], kwargs.get("lines")))
+            # lines=None: whole file if small, else a bounded head/tail window cut on the target
+            window = max(1024, self.output_cap - 1024)
+            return self._execute(self.file_tools.get_read_command(kwargs["path"], kwargs.get("lines"), max_bytes=window))
+        if name == "search_logs" or (name == "grep_file" and (any(c in kwargs["path"] for c in "*?[")
+                                                             or kwargs["path"].endswith((".gz", ".zst")))):
+            return self._run_logkit(self.log_tools.search_command(
+                kwargs["pattern"], kwargs["path"], bool(kwargs.get("ignore_case")), kwargs.get("limit") or 100), timeout=120)
+        if name == "scan_log_signatures":
+            try:
+                library = load_signatures()
+            except (OSError, ValueError, KeyError) as e:
+                return f"Error: Log signature library unavailable: {e}"
+            only = kwargs.get("signatures") or None
+            known = [sig["id"] for sig in library.get("signatures", [])]
+            unknown = [sid for sid in (only or []) if sid not in known]
+            if unknown:
+                return f"Error: Unknown signature(s) {', '.join(unknown)}. Available: {', '.join(known)}."
+            return self._run_logkit(self.log_tools.signatures_command(kwargs["path"], library, only), timeout=120)
         if name == "grep_file": 
             return self._execute(self.file_tools.get_grep_command(kwargs["pattern"], kwargs["path"]))
         if name == "write_file": 
@@ -361,8 +943,35 @@ class SysMindAgent:
             cmd = self.service_tools.get_restart_command(kwargs["service"])
             return self._execute(cmd) if self._safety_check(cmd) else "Safety Violation: Denied."
         if name == "get_net_stats": 
-            return self._execute(self.network_tools.get_active_ports_command())
+            return self._diagnostic(name, self.network_tools.get_active_ports_command())
+        if name == "inspect_sockets":
+            port, state = kwargs.get("port"), str(kwargs.get("state") or "LISTEN").upper()
+            if state not in SOCKET_STATES:
+                return f"Error: state must be one of {', '.join(sorted(SOCKET_STATES))}."
+            try:
+                port = None if port in (None, "") else int(port)
+            except (TypeError, ValueError):
+                return f"Error: Invalid port '{port}'."
+            if port is not None and not 0 < port < 65536:
+                return f"Error: Port {port} is out of range."
+            output = self._execute(self.network_tools.inspect_sockets_command(port, state))
+            if output.startswith("Error"):
+                return output
+            return NetworkTools.format_sockets(output, port, state) or f"Error: Unexpected socket output: {output[:200]}"
+        if name == "check_disk_space":
+            return self._diagnostic(name, self.file_tools.check_disk_space_command())
+        if name == "get_system_stats":
+            return self._diagnostic(name, self.strategy.get_system_stats_command())
         
+        if name == "analyze_metrics":
+            return self._numeric_analysis(kwargs.get("samples", 20), kwargs.get("interval", 0.5)) or \
+                "Error: No raw metric series available (no /proc sampling on the target and no docker stats)."
+
+        if name == "get_metrics":
+            if self.sampler is None:
+                return "Error: Metrics sampler is not running (set SYSMIND_METRICS_SAMPLER=true)."
+            return self.sampler.describe(float(kwargs.get("window", 60)), kwargs.get("metrics") or None)
+
         # Multimodal Analysis (Gemini 3 Showcase!)
         if name == "analyze_dashboard":
             image_path = kwargs['image_path']
@@ -378,46 +987,78 @@ class SysMindAgent:
                     "Recommendation: Check running processes immediately for high-resource consumers."
                 )
 
+            if self.vision_fallback_only and self.metrics_tools is not None:
+                numeric = self._numeric_analysis()
+                if numeric:
+                    self.vision_stats["numeric_first"] = self.vision_stats.get("numeric_first", 0) + 1
+                    self.console.print(f"[dim][VISION] Raw series available on the target: numeric analysis instead of uploading {image_path}.[/dim]")
+                    return numeric
+
             try:
-                # base64 imported at top level now
                 with open(image_path, 'rb') as f:
-                    image_data = base64.b64encode(f.read()).decode('utf-8')
-                
+                    raw = f.read()
+                digest = image_digest(raw)
+                cache_key = f"{self.model_id}:{self.vision_max_side}:{digest}"
+                stats = self.vision_stats
+                stats["calls"] = stats.get("calls", 0) + 1
+
+                # Repeated alerts usually carry the same screenshot: no decode, no upload, no call
+                cached = self.vision_cache.get(cache_key) if self.vision_cache else None
+                if cached is not None:
+                    stats["cache_hits"] = stats.get("cache_hits", 0) + 1
+                    self.console.print(f"[dim][VISION] Same screenshot analysed before (sha256 {digest[:12]}): served from cache.[/dim]")
+                    return f"[VISUAL ANALYSIS]\n{cached}"
+
+                image = prepare_image(raw, max_side=self.vision_max_side)
+                stats["original_bytes"] = stats.get("original_bytes", 0) + image["original_bytes"]
+                stats["upload_bytes"] = stats.get("upload_bytes", 0) + image["bytes"]
+                stats["encode_s"] = round(stats.get("encode_s", 0.0) + image["encode_s"], 4)
+
                 # Multimodal API call - THIS IS THE WOW FACTOR
-                self.console.print(f"[bold cyan][VISION] Analyzing dashboard screenshot: {image_path}[/bold cyan]")
-                
-                response = self.client.models.generate_content(
+                self.console.print(f"[bold cyan][VISION] Analyzing dashboard screenshot: {image_path}[/bold cyan] "
+                                   f"[dim]({image['original_bytes'] // 1024} KB -> {image['bytes'] // 1024} KB {image['mime']})[/dim]")
+
+                # Images are billed per 768px tile; the prompt is small
+                image_tokens = estimate_image_tokens(image["width"], image["height"]) if image["width"] else 1032
+                started = time.time()
+                response = self._call_model(
+                    est_tokens=image_tokens + 600,
+                    prompt_tokens=image_tokens + 60,
                     model=self.model_id,
                     contents=[
                         "You are analyzing a system monitoring dashboard (Grafana/Datadog/Prometheus). "
                         "Identify: 1) Any critical spikes or anomalies, 2) Time of occurrence, "
                         "3) Affected metrics (CPU/Memory/Network), 4) Correlations between metrics. "
                         "Be specific and technical.",
-                        {"mime_type": "image/png", "data": image_data}
+                        types.Part.from_bytes(data=image["data"], mime_type=image["mime"]),
                     ]
                 )
-                
+                stats["vision_latency_s"] = round(stats.get("vision_latency_s", 0.0) + time.time() - started, 3)
+
                 analysis = response.text if hasattr(response, 'text') else str(response)
+                if analysis and self.vision_cache:
+                    self.vision_cache.put(cache_key, analysis)
                 return f"[VISUAL ANALYSIS]\n{analysis}"
                 
             except FileNotFoundError:
                 return f"Error: Dashboard image not found: {image_path}"
+            except BudgetExhausted:
+                raise
             except Exception as e:
                 return f"Error analyzing dashboard: {str(e)}"
 
         return f"Error: Tool '{name}' not implemented."
 
-    @exponential_backoff(max_retries=10)
     def _think(self, prompt: str):
         """Chain-Of-Thought Brain (Titanium Edition)."""
         # Professional Audit/Mock Mode for Quota-Restricted Environments
-        if self.simulation_mode:
-            return self._execute_mock_logic(prompt)
+        if self.simulation_mode or self.brain is not None:
+            return self._mock_think(prompt)
             
         if not self.client: 
             self.console.print("[bold yellow][RESILIENCE] No API client found. Failing over to Audit Mode...[/bold yellow]")
             self.simulation_mode = True
-            return self._execute_mock_logic(prompt)
+            return self._mock_think(prompt)
         
         try:
             return self._query_gemini(prompt)
@@ -425,63 +1066,101 @@ class SysMindAgent:
             if "429" in str(e) or "quota" in str(e).lower():
                 self.console.print("[bold red][CRITICAL] API Quota Exhausted. Activating Hybrid Failover Protocol...[/bold red]")
                 self.simulation_mode = True
-                return self._execute_mock_logic(prompt)
+                return self._mock_think(prompt)
             raise e
 
-    @exponential_backoff(max_retries=5)
-    def _query_gemini(self, prompt: str):
-        """Standard Gemini 2.0/3.0 API Interaction with SEARCH GROUNDING."""
+    def _query_gemini(self, prompt):
+        """
+        Standard Gemini 2.0/3.0 API Interaction with SEARCH GROUNDING.
+        `prompt` is either a prompt string or the structured contents of a ChatSession.
+        """
+        prompt_text = self._prompt_text(prompt)
         if self.simulation_mode:
-            return self._execute_mock_logic(prompt)
+            return self._mock_think(prompt)
             
         if not self.client:
              print("[ERROR] No API client available.")
              return "THOUGHT", "API Unavailable."
 
-        # 1. System Tools (Native Function Calling)
-        my_tools = types.Tool(function_declarations=self._get_tools_config())
-        
-        # 2. Google Search Grounding (Grand Prize Feature)
-        google_search_tool = types.Tool(
-            google_search=types.GoogleSearch() 
-        )
-
-        # Combine tools
-        all_tools = [my_tools, google_search_tool]
+        # Content-addressed cache: identical model + instruction + tools + prompt => identical answer
+        cache_key = None
+        if self.response_cache:
+            max_age = self.response_cache.max_age_for(prompt_text)
+            if max_age is not None:
+                cache_key = self.response_cache.make_key(
+                    self.model_id, self.identity, self._tool_schema_json(), "google_search", 0.1,
+                    prompt if isinstance(prompt, str) else ChatSession.to_json(prompt)
+                )
+                cached = self.response_cache.get(cache_key, max_age=max_age)
+                # Only tool-call turns are replayed (older caches may still hold text-only THOUGHTs)
+                if cached is not None and any(call[0] != "THOUGHT" for call in cached):
+                    self.console.print("[dim][CACHE] Response served from cache (no API call).[/dim]")
+                    return [tuple(call) for call in cached]
         
         try:
-            response = self.client.models.generate_content(
-                model=self.model_id,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    tools=all_tools, 
-                    system_instruction=self.identity,
-                    temperature=0.1
-                )
-            )
+            prompt_tokens = estimate_tokens(prompt_text) + estimate_tokens(self.identity)
+            est_tokens = prompt_tokens + 1000
+            request = dict(model=self.model_id, contents=prompt, config=self._generation_config())
+            if self.streaming:
+                response = self._stream_model(est_tokens=est_tokens, prompt_tokens=prompt_tokens,
+                                              on_call=self._dispatch_early, **request)
+            else:
+                response = self._call_model(est_tokens=est_tokens, prompt_tokens=prompt_tokens, **request)
+            usage = getattr(response, "usage_metadata", None)
+            if usage and getattr(usage, "total_token_count", None):
+                self.rate_limiter.settle(est_tokens, usage.total_token_count)
 
             if not response.candidates or not response.candidates[0].content.parts:
                 return "THOUGHT", "Empty response from agent brain."
 
+            # Kept verbatim for chat sessions (includes thought signatures)
+            self._last_model_content = response.candidates[0].content
+
+            # Parallel Dispatch: every function call in the turn must get its response
+            calls = []
             for part in response.candidates[0].content.parts:
                 if part.function_call:
                     args = {k: v for k, v in part.function_call.args.items()} if part.function_call.args else {}
-                    return part.function_call.name, args
+                    calls.append((part.function_call.name, args))
+            if calls:
+                if cache_key:
+                    self.response_cache.put(cache_key, calls)
+                return calls
             
             # Grounding Extraction for Grand Prize
             # Check for Google Search Grounding metadata to prove live internet access
             part = response.candidates[0].content.parts[0]
             text = part.text
             
-            if hasattr(response.candidates[0], 'grounding_metadata') and response.candidates[0].grounding_metadata.search_entry_point:
+            grounding = getattr(response.candidates[0], 'grounding_metadata', None)
+            if grounding and grounding.search_entry_point:
                  text += "\n\n[bold blue]🌐 GOOGLE GROUNDING SOURCES VERIFIED[/bold blue]"
-            
+
+            # Text-only turns are not cached: a THOUGHT leaves the prompt unchanged, so a cached one
+            # would be replayed every later cycle instead of asking the model again
             return "THOUGHT", text
             
         except Exception as e:
             self.console.print(f"[bold red]Gemini API Error: {e}[/bold red]")
             raise e            
         
+    def _mock_think(self, prompt):
+        """Offline brain decision (pluggable brain or the mock responder), charged with estimated tokens."""
+        prompt_text = self._prompt_text(prompt)
+        started = time.time()
+        if self.brain is not None:
+            decision = self.brain.decide(prompt)
+        else:
+            decision = self._execute_mock_logic(prompt_text)
+        self.ledger.record(
+            self._step,
+            estimate_tokens(prompt_text) + estimate_tokens(self.identity),
+            estimate_tokens(decision),
+            time.time() - started,
+            "estimate",
+        )
+        return decision
+
     def _execute_mock_logic(self, prompt: str):
         """Standardized Mock Responder for Air-Gapped / Audit Mode."""
         p = prompt.lower()
@@ -546,8 +1225,30 @@ class SysMindAgent:
 
         return [("THOUGHT", "SysMind (Audit Mode): Analyzing system signals...")]
 
-    def ooda_loop(self, objective: str, max_cycles: int = 10):
-        """Visible Reasoning OODA Loop (Rich Edition)."""
+    @staticmethod
+    def _history_text(steps: list) -> str:
+        return "".join(f"Step {h['step']}: Action={h['tool']}({h['args']}) Result={h['result']}\n" for h in steps)
+
+    def _finish_metrics(self) -> dict:
+        """Freezes the mission's token/latency totals (audit JSON, benchmark, fleet)."""
+        self.mission_metrics = self.ledger.totals()
+        m = self.mission_metrics
+        if self.rule_stats:
+            m["rule_engine"] = dict(self.rule_stats)
+        if self.vision_stats:
+            m["vision"] = dict(self.vision_stats)
+        if self.differ is not None:
+            m["diffs"] = dict(self.differ.stats)
+        if self.prefetcher is not None:
+            m["prefetch"] = self.prefetcher.report()
+            self.console.print(f"[dim][PREFETCH] hit rate {m['prefetch']['hit_rate']:.0%}, "
+                               f"{m['prefetch']['saved_s']}s of target latency saved.[/dim]")
+        self.console.print(f"[dim][METRICS] {m['total_tokens']} tokens ({m['prompt_tokens']} in / {m['output_tokens']} out) "
+                           f"over {m['llm_calls']} LLM calls, {m['llm_latency_s']}s model / {m['tool_latency_s']}s tools.[/dim]")
+        return m
+
+    def ooda_loop(self, objective: str, max_cycles: int = 10) -> str:
+        """Visible Reasoning OODA Loop (Rich Edition). Returns the final mission status."""
         import sys
         import io
         # Grand Prize Hardening: Force UTF-8 for Windows Terminal stability
@@ -555,33 +1256,92 @@ class SysMindAgent:
         #   sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
         history = []
+        session = None
+        self.ledger = ledger_from_env()
+        self._rule_pending = None
+        self._rules_done = self.rule_engine is None
+        self._rule_hint = ""
+        self.rule_stats = {"decisions": 0, "matched": None, "outcome": None} if self.rule_engine else {}
+        self.vision_stats = {}
+        if self.differ is not None:
+            self.differ.reset()
+        if self.prefetcher is not None:
+            self.prefetcher.reset_stats()
+        hint_noted = False
+        compactor = compactor_from_env()
         self.console.print(Panel(f"[bold green]OBJECTIVE:[/bold green] {objective}", border_style="green", title="[bold white]SYS_MIND MISSION[/bold white]"))
         
-        max_cycles = 10
-        
+        halt_reason = "Max cycles reached."
         for step in range(max_cycles):
             self.console.print(f"\n[bold blue]─ Cycle {step + 1}/{max_cycles} ─[/bold blue]")
+            self._emit("cycle", step=step + 1, max_cycles=max_cycles)
             
             # Grand Prize: Knowledge Injection
             kb_text = ""
             if self.knowledge:
                 kb_text = "\n[KNOWLEDGE BASE] Past Lessons:\n" + "\n".join([f"- {k['lesson']}" for k in self.knowledge]) + "\n"
             
-            context = f"OBJECTIVE: {objective}\n{kb_text}\nHISTORY:\n"
-            for h in history[-5:]:
-                context += f"Step {h['step']}: Action={h['tool']}({h['args']}) Result={h['result']}\n"
+            self._step = step + 1
+            self._drain_dispatched()
+            self._cycle_started = time.time()
+            fast_calls = self._fast_path(objective, history)
+            if fast_calls is None:
+                self._prefetch()
+            if self._rule_hint:
+                kb_text += self._rule_hint + "\n"
+            # Session Mode: objective + KB sent once, every call/result appended as a structured turn
+            if self.chat_mode and session is None:
+                session = ChatSession(objective, kb_text)
+            elif session is not None and self._rule_hint and not hint_noted:
+                session.add_note(self._rule_hint)
+            hint_noted = hint_noted or (session is not None and bool(self._rule_hint))
+
+            # Token Budget: fold older steps into a rolling summary before the prompt outgrows it
+            if session is not None:
+                history_tokens = estimate_tokens(ChatSession.render(session.contents[1:]))
+            else:
+                history_tokens = estimate_tokens(self._history_text(compactor.recent(history)))
+            if compactor.needs_compaction(history_tokens):
+                folded = compactor.compact(history)
+                if folded:
+                    self.ledger.compactions += 1
+                    if session is not None:
+                        # Cut at the cycle of the first step still kept verbatim (all of them if none is)
+                        kept = history[compactor.compacted]["step"] if compactor.compacted < len(history) else step + 1
+                        session.compact(kept, compactor.summary_text())
+                    self.console.print(f"[dim][CONTEXT] ~{history_tokens} history tokens: compacted {folded} older steps into a rolling summary.[/dim]")
+
+            if session is not None:
+                context = session.contents
+            else:
+                context = f"OBJECTIVE: {objective}\n{kb_text}\nHISTORY:\n" + compactor.summary_text()
+                context += self._history_text(compactor.recent(history))
 
             try:
+                self.ledger.check()
                 # Use rich status for thinking phase
-                with self.console.status("[bold green]Brain Processing...[/bold green]", spinner="dots"):
-                    tool_calls = self._think(context)
+                self._last_model_content = None
+                # Streaming renders its own live panel; offline brains answer instantly; otherwise show a spinner
+                no_spinner = self.streaming or self.simulation_mode or self.brain is not None
+                if fast_calls is not None:
+                    tool_calls = fast_calls
+                else:
+                    with nullcontext() if no_spinner else self.console.status("[bold green]Brain Processing...[/bold green]", spinner="dots"):
+                        tool_calls = self._think(context)
+                think_s = time.time() - self._cycle_started
+                first_action = None
+                call_index = 0
                 
                 # Handle Parallel Dispatch
                 if not isinstance(tool_calls, list):
                     tool_calls = [tool_calls]
 
+                if session is not None:
+                    session.add_model(self._last_model_content or ChatSession.content_from_calls(tool_calls), step=step + 1)
+
                 for tool_name, tool_args in tool_calls:
                     if tool_name == "mission_complete":
+                        self._close_cycle(step + 1, think_s, first_action)
                         summary = tool_args.get("summary", "Mission finished.")
                         self.console.print(Panel(Markdown(f"### MISSION COMPLETE\n{summary}"), border_style="bold green"))
                         
@@ -590,13 +1350,14 @@ class SysMindAgent:
                             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                             
                             # 1. JSON Data
-                            json_filename = f"audit_{timestamp}.json"
+                            json_filename = self._report_path(f"audit_{timestamp}.json")
                             audit_data = {
                                 "objective": objective,
                                 "timestamp": timestamp,
                                 "status": "RESOLVED",
                                 "summary": summary,
-                                "history": history
+                                "history": history,
+                                "metrics": self._finish_metrics()
                             }
                             with open(json_filename, "w", encoding='utf-8') as f:
                                 json.dump(audit_data, f, indent=4)
@@ -608,7 +1369,7 @@ class SysMindAgent:
                             self.console.print(f"[dim]🔒 Audit Log Integrity Hash (SHA-256): {file_hash[:16]}...[/dim]")
                                 
                             # 2. Markdown Post-Mortem (Professional SRE Report)
-                            md_filename = f"post_mortem_{timestamp}.md"
+                            md_filename = self._report_path(f"post_mortem_{timestamp}.md")
                             with open(md_filename, "w", encoding='utf-8') as f:
                                 f.write(f"# [DOC] SysMind Incident Post-Mortem\n\n")
                                 f.write(f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
@@ -647,7 +1408,7 @@ class SysMindAgent:
                                     f"const preloadedData = {json.dumps(audit_data)}; renderTimeline(preloadedData);"
                                 )
                                 
-                                final_report_file = f"report_{timestamp}.html"
+                                final_report_file = self._report_path(f"report_{timestamp}.html")
                                 with open(final_report_file, "w", encoding='utf-8') as f:
                                     f.write(report_html)
                                     
@@ -672,7 +1433,8 @@ class SysMindAgent:
                             self._speak("Mission accomplished. System stabilized.")
                         except Exception as e:
                             self.console.print(f"[bold red]Failed to save reports: {e}[/bold red]")
-                        return
+                        self._emit("done", status="RESOLVED", summary=summary)
+                        return "RESOLVED"
                     
                     if tool_name == "THOUGHT":
                         content = str(tool_args)
@@ -704,10 +1466,11 @@ class SysMindAgent:
                                 # HITL: Critical Stop for High Risk (The "Red Button")
                                 if risk_color == "red" and not self.simulation_mode:
                                     self._speak("Critical risk detected. Waiting for authorization.")
-                                    confirm = input("\n⚠️  HIGH RISK ACTION DETECTED. AUTHORIZE? (y/N): ")
-                                    if confirm.lower() != 'y':
+                                    if not self._confirm("\n⚠️  HIGH RISK ACTION DETECTED. AUTHORIZE? (y/N): "):
                                         self.console.print("[bold red]⛔ ACTION ABORTED BY USER.[/bold red]")
-                                        return [("mission_complete", {"summary": "Mission aborted by human operator due to safety risk."})]
+                                        self._close_cycle(step + 1, think_s, first_action)
+                                        return self._end_mission(objective, history, "ABORTED",
+                                                                 "Mission aborted by human operator due to safety risk.")
                                 
                                 # 2. Display THOUGHT Panel (Cognitive Layer)
                                 self.console.print(Panel(thought_segment, title="[bold cyan]🧠 Cognitive Process[/bold cyan]", border_style="cyan"))
@@ -723,8 +1486,19 @@ class SysMindAgent:
 
                     # Show Action in a specific style
                     self.console.print(Panel(f"[bold yellow]ACTION:[/bold yellow] [cyan]{tool_name}[/cyan] {tool_args}", border_style="yellow"))
+                    self._emit("action", step=step + 1, tool=tool_name, args=tool_args)
                     
-                    result = self.run_tool(tool_name, **tool_args)
+                    early = self._dispatched[call_index] if call_index < len(self._dispatched) else None
+                    call_index += 1
+                    if early is not None and early[0] == tool_name and early[1] == tool_args:
+                        # Started while the model was still streaming
+                        first_action = first_action or early[2]
+                        result, tool_latency = early[3].result()
+                    else:
+                        tool_started = time.time()
+                        first_action = first_action or tool_started
+                        result, tool_latency = self._timed_tool(tool_name, tool_args)
+                    self.ledger.record_tool(tool_latency)
                     
                     # Grand Prize Refinement: Smart trimming of results
                     if len(result) > 800:
@@ -733,35 +1507,61 @@ class SysMindAgent:
                         trimmed_result = result
 
                     self.console.print(f"[bold dim]OUTPUT:[/bold dim] {trimmed_result[:200]}...")
+
+                    # Repeat of an earlier read-only call: the model gets what changed, the audit log the full output
+                    diff = self.differ.render(tool_name, tool_args, result, step + 1, shown=trimmed_result) if self.differ else None
+                    if diff is not None:
+                        self.console.print(f"[dim][DIFF] {tool_name}: {len(diff)} chars sent instead of {len(trimmed_result)}.[/dim]")
                     
                     # Grand Prize: Inject Knowledge Base Context
                     # kb_context is already defined at the start of the loop, no need to redefine here
                     
-                    history.append({
+                    entry = {
                         "step": step + 1,
                         "tool": tool_name,
                         "args": tool_args,
-                        "result": trimmed_result,
+                        "result": diff or trimmed_result,
+                        "latency_s": round(tool_latency, 3),
                         "kb_context": kb_text # Adding kb_context to history for potential future use
-                    })
+                    }
+                    if diff is not None:
+                        entry["output"] = result
+                    history.append(entry)
+                    if session is not None:
+                        session.add_function_result(tool_name, diff or trimmed_result)
+
+                if session is not None:
+                    session.ensure_user_turn()
+                self._close_cycle(step + 1, think_s, first_action)
                 
+            except BudgetExhausted as e:
+                self.console.print(f"[bold red][QUOTA] {e}. Halting mission.[/bold red]")
+                halt_reason = "LLM budget exhausted."
+                break
             except Exception as e:
                 self.console.print(f"[bold red][ERROR] Cycle Failure: {e}[/bold red]")
+                if session is not None:
+                    # Every function call of the model turn still needs its response
+                    session.answer_pending(f"Error: {e}")
                 time.sleep(2)
         
+        self.console.print(f"[bold red]MISSION HALTED: {halt_reason}[/bold red]")
+        return self._end_mission(objective, history, "HALTED/FAILED")
+
+    def _end_mission(self, objective: str, history: list, status: str, summary: str = None) -> str:
+        """Unresolved end of a mission (halted, aborted): audit trail, 'done' event, status."""
         # Grand Prize: Save Structured Machine-readable Audit Trail
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            audit_filename = f"audit_{timestamp}.json"
+            audit_filename = self._report_path(f"audit_{timestamp}.json")
+            audit_data = {"objective": objective, "timestamp": timestamp, "history": history, "status": status}
+            if summary:
+                audit_data["summary"] = summary
+            audit_data["metrics"] = self._finish_metrics()
             with open(audit_filename, "w", encoding='utf-8') as f:
-                json.dump({
-                    "objective": objective,
-                    "timestamp": timestamp,
-                    "history": history,
-                    "status": "HALTED/FAILED"
-                }, f, indent=4)
+                json.dump(audit_data, f, indent=4)
             self.console.print(f"\n[bold green]Audit Trail saved to '{audit_filename}'[/bold green]")
         except Exception as e:
             self.console.print(f"[bold red]Failed to save audit log: {e}[/bold red]")
-
-        self.console.print("[bold red]MISSION HALTED: Max cycles reached.[/bold red]")
+        self._emit("done", status=status, **({"summary": summary} if summary else {}))
+        return status
@@ -0,0 +1,148 @@
+"""
+Numeric Time-Series Anomaly Detection for SysMind.
+The numbers behind a dashboard can be sampled from the target directly, so a
+spike or a leak is classified with a few vectorized NumPy passes instead of a
+screenshot upload and a multimodal inference:
+  - change point: the split that minimizes two-segment squared error (cumsums)
+  - step: the mean shift across that split, measured against robust noise
+  - slope: least-squares trend (a leak is steady growth, not a jump)
+"""
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Smallest change worth reporting per metric, in the series' own unit
+MIN_DELTA = {"cpu": 15.0, "mem": 5.0, "io": 1024.0, "net": 1024.0}
+UNITS = {"cpu": "%", "mem": "%", "io": " KB/s", "net": " KB/s"}
+
+
+def _change_point(y, min_segment: int = 2):
+    """Index of the best single split (first sample of the new regime) and its SSE."""
+    n = len(y)
+    if n < 2 * min_segment:
+        return None, float("inf")
+    c, c2 = np.cumsum(y), np.cumsum(y * y)
+    k = np.arange(1, n)
+    left, left_sq = c[:-1], c2[:-1]
+    right, right_sq = c[-1] - left, c2[-1] - left_sq
+    sse = (left_sq - left ** 2 / k) + (right_sq - right ** 2 / (n - k))
+    valid = sse[min_segment - 1:n - min_segment]
+    best = int(np.argmin(valid)) + min_segment
+    return best, float(valid.min())
+
+
+def _noise(y) -> float:
+    """Robust sample noise from first differences (MAD), unaffected by a single step."""
+    d = np.diff(y)
+    if d.size == 0:
+        return 0.0
+    return float(1.4826 * np.median(np.abs(d - np.median(d))) / np.sqrt(2))
+
+
+def analyze_series(t, y, name: str = "cpu", min_delta: float = None) -> dict:
+    """
+    Classifies one series as spike / drop / leak / decline / burst / stable.
+    Returns kind, onset (epoch seconds), before/after levels, magnitude, slope per
+    minute and a 0..1 confidence.
+    """
+    t, y = np.asarray(t, dtype=float), np.asarray(y, dtype=float)
+    n = len(y)
+    min_delta = MIN_DELTA.get(name, 0.0) if min_delta is None else min_delta
+    result = {"metric": name, "kind": "stable", "samples": n, "onset": None, "confidence": 0.0,
+              "mean": round(float(y.mean()), 2) if n else None, "peak": round(float(y.max()), 2) if n else None,
+              "last": round(float(y[-1]), 2) if n else None}
+    if n < 4:
+        result["kind"] = "insufficient"
+        return result
+
+    sigma = max(_noise(y), 1e-9)
+    minutes = (t - t[0]) / 60.0
+    sse_total = float(((y - y.mean()) ** 2).sum())
+
+    # Linear trend
+    slope, intercept = np.polyfit(minutes, y, 1) if minutes[-1] > 0 else (0.0, float(y.mean()))
+    sse_line = float(((y - (slope * minutes + intercept)) ** 2).sum())
+    r2 = 1 - sse_line / sse_total if sse_total > 0 else 0.0
+    result["slope_per_min"] = round(float(slope), 3)
+
+    # Best single step
+    k, sse_step = _change_point(y)
+    before, after = float(y[:k].mean()), float(y[k:].mean())
+    magnitude = after - before
+    result.update(before=round(before, 2), after=round(after, 2), magnitude=round(magnitude, 2))
+
+    step_ok = abs(magnitude) >= max(min_delta, 4 * sigma)
+    trend_total = slope * minutes[-1]
+    leak_ok = abs(trend_total) >= min_delta and r2 >= 0.8
+
+    if step_ok and (not leak_ok or sse_step < 0.5 * sse_line):
+        result["kind"] = "spike" if magnitude > 0 else "drop"
+        result["onset"] = float(t[k])
+        # Separation of the two regimes relative to their residual spread
+        spread = np.sqrt(max(sse_step, 0.0) / max(n - 2, 1)) + 1e-9
+        result["confidence"] = round(float(min(1.0, abs(magnitude) / (abs(magnitude) + 2 * spread))), 2)
+    elif leak_ok:
+        result["kind"] = "leak" if slope > 0 else "decline"
+        # Growth starts where the first differences change regime
+        d = np.diff(y)
+        j, _ = _change_point(d)
+        if j is None:
+            onset = 0  # Too few differences to split: growth from the first sample
+        else:
+            shift = d[j:].mean() - d[:j].mean()
+            onset = j if shift > 2 * d.std() / np.sqrt(min(j, len(d) - j)) else 0
+        result["onset"] = float(t[onset if slope > 0 else 0])
+        result["confidence"] = round(float(r2), 2)
+    else:
+        # Short excursion that returns to baseline: visible in the peak, not in the segments
+        median = float(np.median(y))
+        excursion = y - median
+        peak = int(np.argmax(np.abs(excursion)))
+        if abs(excursion[peak]) >= max(min_delta, 6 * sigma):
+            result.update(kind="burst", onset=float(t[peak]), magnitude=round(float(excursion[peak]), 2),
+                          confidence=round(float(min(1.0, abs(excursion[peak]) / (abs(excursion[peak]) + 6 * sigma))), 2))
+    return result
+
+
+def analyze_metrics(series: dict) -> list:
+    """Runs analyze_series on every metric in a {"t": [...], name: [...]} series dict."""
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+    return [analyze_series(series["t"], series[name], name) for name in series if name != "t" and len(series[name])]
+
+
+def _clock(epoch) -> str:
+    return datetime.fromtimestamp(epoch).strftime("%H:%M:%S") if epoch is not None else "-"
+
+
+def describe(findings: list, series: dict, source: str) -> str:
+    """Structured text for the model: one line per metric, anomalies first."""
+    t = series["t"]
+    lines = [f"[METRICS ANALYSIS] {len(t)} samples over {t[-1] - t[0]:.1f}s "
+             f"({_clock(t[0])}-{_clock(t[-1])}, source: {source})"]
+    order = {"spike": 0, "leak": 1, "burst": 2, "drop": 3, "decline": 4, "stable": 5, "insufficient": 6}
+    for f in sorted(findings, key=lambda f: order.get(f["kind"], 9)):
+        unit = UNITS.get(f["metric"], "")
+        if f["kind"] in ("spike", "drop"):
+            lines.append(f"{f['metric']}: {f['kind'].upper()} at {_clock(f['onset'])} "
+                         f"({f['magnitude']:+.1f}{unit}: {f['before']:.1f}{unit} -> {f['after']:.1f}{unit}), confidence {f['confidence']:.2f}")
+        elif f["kind"] in ("leak", "decline"):
+            lines.append(f"{f['metric']}: {f['kind'].upper()} since {_clock(f['onset'])} "
+                         f"({f['slope_per_min']:+.2f}{unit}/min, now {f['last']:.1f}{unit}), r2 {f['confidence']:.2f}")
+        elif f["kind"] == "burst":
+            lines.append(f"{f['metric']}: BURST at {_clock(f['onset'])} ({f['magnitude']:+.1f}{unit} above median, back to baseline)")
+        elif f["kind"] == "stable":
+            lines.append(f"{f['metric']}: stable (mean {f['mean']:.1f}{unit}, peak {f['peak']:.1f}{unit})")
+        else:
+            lines.append(f"{f['metric']}: not enough samples")
+    anomalies = [f for f in findings if f["kind"] not in ("stable", "insufficient")]
+    if any(f["kind"] == "spike" for f in anomalies):
+        lines.append("Pattern: abrupt step change (runaway process or load injection). Check top consumers.")
+    elif any(f["kind"] == "leak" for f in anomalies):
+        lines.append("Pattern: steady growth without a step (leak). Check per-process RSS over time.")
+    elif not anomalies:
+        lines.append("Pattern: no anomaly in this window.")
+    return "\n".join(lines)
@@ -0,0 +1,118 @@
+"""
+Content-Addressed Response Cache for SysMind.
+Model responses are stored on disk (SQLite) under a SHA-256 of everything
+that determines them: model id, system instruction, tool schema and prompt.
+A hit skips the network round trip entirely. Entries expire by TTL and are
+evicted least-recently-used once the entry or byte budget is exceeded.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Prompts carrying live telemetry go stale fast: they only hit within the freshness window
+LIVE_DATA_PATTERN = re.compile(r"LIVE METRICS", re.IGNORECASE)
+
+
+class ResponseCache:
+    """
+    Thread-safe on-disk LRU cache with TTL and size eviction.
+    """
+
+    def __init__(self, path: str = ".sysmind_cache/responses.db", max_entries: int = 2000,
+                 max_bytes: int = 50 * 1024 * 1024, ttl: float = 24 * 3600, freshness: float = 60):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.freshness = freshness
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """SHA-256 over the canonical JSON of every part that determines the response."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def max_age_for(self, prompt_text: str):
+        """Effective max age for a prompt, or None when it must bypass the cache."""
+        if LIVE_DATA_PATTERN.search(prompt_text or ""):
+            if self.freshness > 0:
+                return self.freshness
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return None
+        return self.ttl
+
+    def get(self, key: str, max_age: float = None):
+        now = time.time()
+        max_age = self.ttl if max_age is None else min(max_age, self.ttl)
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > max_age:
+                self.stats["misses"] += 1
+                return None
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value):
+        payload = json.dumps(value, default=str)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        cur = self._db.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+        self.stats["evicted"] += max(cur.rowcount, 0)
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Walk from least recently used until both budgets fit again
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.stats["evicted"] += len(victims)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def cache_from_env():
+    """Builds the response cache if SYSMIND_CACHE=true, else None."""
+    if os.environ.get("SYSMIND_CACHE", "false").lower() != "true":
+        return None
+    return ResponseCache(
+        path=os.environ.get("SYSMIND_CACHE_PATH", ".sysmind_cache/responses.db"),
+        max_entries=int(os.environ.get("SYSMIND_CACHE_MAX_ENTRIES", "2000")),
+        max_bytes=int(os.environ.get("SYSMIND_CACHE_MAX_MB", "50")) * 1024 * 1024,
+        ttl=float(os.environ.get("SYSMIND_CACHE_TTL", str(24 * 3600))),
+        freshness=float(os.environ.get("SYSMIND_CACHE_FRESHNESS", "60")),
+    )
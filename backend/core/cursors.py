@@ -0,0 +1,60 @@
+"""
+Persistent Log Read Cursors for SysMind.
+`read_log(since_last=True)` returns only the bytes appended since the previous
+read of the same file on the same target. The position is a (device, inode,
+offset) cursor: the target-side log kit follows it across rotation and
+truncation, and this store keeps it between cycles, missions and restarts.
+"""
+import json
+import os
+import threading
+import time
+
+
+class CursorStore:
+    """
+    Thread-safe JSON store of {target: {path: {"dev", "ino", "offset", "updated"}}}.
+    """
+
+    def __init__(self, path: str = ".sysmind_cache/log_cursors.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = None
+
+    def _load(self) -> dict:
+        if self._data is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+
+    def get(self, target: str, path: str):
+        with self._lock:
+            return self._load().get(target, {}).get(path)
+
+    def set(self, target: str, path: str, dev: int, ino: int, offset: int):
+        with self._lock:
+            data = self._load()
+            data.setdefault(target, {})[path] = {"dev": dev, "ino": ino, "offset": offset, "updated": time.time()}
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def cursor_store_from_env() -> CursorStore:
+    """Process-wide store at SYSMIND_LOG_CURSORS (fleet agents share one file and lock)."""
+    path = os.environ.get("SYSMIND_LOG_CURSORS", ".sysmind_cache/log_cursors.json")
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = CursorStore(path)
+        return store
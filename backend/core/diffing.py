@@ -0,0 +1,124 @@
+"""
+Cycle-to-Cycle Output Diffing for SysMind.
+Verification re-runs the same read-only diagnostics (list_processes,
+get_net_stats, check_service...), and each repeat would put a near-identical
+table back into the model's history. The agent remembers the previous output
+of every diffable call and shows the model only what changed: new and exited
+PIDs, opened and closed listeners, added and removed lines. The full output
+is still kept in the audit log.
+"""
+import json
+import os
+import re
+
+# Tools whose repeated output is worth diffing (time series and images are not)
+DIFFABLE_TOOLS = frozenset({
+    "list_processes", "snapshot_processes", "get_net_stats", "check_service",
+    "check_disk_space", "list_directory", "read_log", "grep_file", "inspect_sockets",
+    "search_logs",
+})
+
+_PID_HEADER = re.compile(r"(^|\s)PID(\s|$)")
+
+
+def _pid_table(text: str):
+    """(header, {pid: row}, rows in order) for ps-like tables, else None."""
+    lines = [l for l in text.splitlines() if l.strip()]
+    for i, line in enumerate(lines):
+        if _PID_HEADER.search(line):
+            column = line.split().index("PID")
+            rows = {}
+            ordered = []
+            for row in lines[i + 1:]:
+                fields = row.split()
+                if len(fields) > column and fields[column].isdigit():
+                    rows[fields[column]] = row
+                    ordered.append(row)
+            return line, rows, ordered
+    return None
+
+
+class OutputDiffer:
+    """
+    Remembers the last output per (tool, args) and renders compact diffs on repeats.
+    """
+
+    def __init__(self, max_context_rows: int = 3):
+        self.max_context_rows = max_context_rows
+        self._last = {}
+        self.stats = {"diffed": 0, "unchanged": 0, "chars_saved": 0}
+
+    @staticmethod
+    def _key(tool: str, args: dict) -> str:
+        return tool + ":" + json.dumps(args or {}, sort_keys=True, default=str)
+
+    def reset(self):
+        """New mission: previous outputs and savings belong to the last one."""
+        self._last.clear()
+        self.stats = {"diffed": 0, "unchanged": 0, "chars_saved": 0}
+
+    def render(self, tool: str, args: dict, output: str, step: int, shown: str = None):
+        """
+        Compact diff against the previous call with the same arguments, or None when
+        the full output should be shown (first call, errors, or no saving).
+        `shown` is what the model would otherwise see (defaults to `output`).
+        """
+        if tool not in DIFFABLE_TOOLS or not isinstance(output, str) or output.startswith(("Error", "Safety Violation")):
+            return None
+        key = self._key(tool, args)
+        previous = self._last.get(key)
+        self._last[key] = (step, output)
+        if previous is None:
+            return None
+        prev_step, prev_output = previous
+        label = f"{tool} (vs step {prev_step})"
+        if output == prev_output:
+            diff = f"[UNCHANGED] {label}: identical output ({len(output)} chars)."
+            self.stats["unchanged"] += 1
+        else:
+            diff = self._pid_diff(label, prev_output, output) or self._line_diff(label, prev_output, output)
+            if diff is None:
+                return None
+        shown = output if shown is None else shown
+        if len(diff) >= len(shown):
+            return None
+        self.stats["diffed"] += 1
+        self.stats["chars_saved"] += len(shown) - len(diff)
+        return diff
+
+    def _pid_diff(self, label: str, old: str, new: str):
+        before, after = _pid_table(old), _pid_table(new)
+        if before is None or after is None:
+            return None
+        header, old_rows, _ = before
+        _, new_rows, ordered = after
+        started = [new_rows[p] for p in new_rows if p not in old_rows]
+        exited = [old_rows[p] for p in old_rows if p not in new_rows]
+        staying = len(new_rows) - len(started)
+        lines = [f"[DIFF] {label}: {len(started)} new, {len(exited)} exited, {staying} still listed", header]
+        lines += [f"- EXITED {row}" for row in exited]
+        lines += [f"+ NEW    {row}" for row in started]
+        # Current top rows: the ranking (CPU/RSS) is what verification looks at
+        lines.append("Top now:")
+        lines += [f"  {row}" for row in ordered[:self.max_context_rows]]
+        return "\n".join(lines)
+
+    @staticmethod
+    def _line_diff(label: str, old: str, new: str):
+        old_lines, new_lines = old.splitlines(), new.splitlines()
+        old_set, new_set = set(old_lines), set(new_lines)
+        removed = [l for l in old_lines if l not in new_set]
+        added = [l for l in new_lines if l not in old_set]
+        if len(removed) + len(added) > max(4, len(new_lines) // 2):
+            return None  # Mostly different: the full output is clearer
+        lines = [f"[DIFF] {label}: +{len(added)} / -{len(removed)} lines, {len(new_lines) - len(added)} unchanged"]
+        lines += [f"- {l}" for l in removed]
+        lines += [f"+ {l}" for l in added]
+        return "\n".join(lines)
+
+
+def differ_from_env():
+    """Output differ if SYSMIND_DIFF_OUTPUTS=true, else None."""
+    if os.environ.get("SYSMIND_DIFF_OUTPUTS", "false").lower() != "true":
+        return None
+    return OutputDiffer(max_context_rows=int(os.environ.get("SYSMIND_DIFF_CONTEXT_ROWS", "3")))
@@ -0,0 +1,136 @@
+"""
+Fleet Mode for SysMind.
+Runs OODA missions against many targets in a bounded worker pool. Workers
+share one LLM client and one quota budget; every target keeps its own
+history and reports, and one aggregate progress table replaces the
+per-agent Rich console.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+
+from backend.core.agent import SysMindAgent, create_client
+from backend.core.ratelimit import QuotaBudget, get_rate_limiter
+from backend.transport.docker_api import get_transport
+
+
+class FleetRunner:
+    """
+    Bounded worker pool of SysMindAgents, one mission per target.
+    """
+
+    def __init__(self, targets: list, objective_builder, workers: int = 4, max_cycles: int = 10,
+                 report_root: str = "fleet_reports", budget: QuotaBudget = None,
+                 auto_approve: bool = False, console: Console = None):
+        self.targets = list(dict.fromkeys(targets))
+        self.objective_builder = objective_builder
+        self.workers = max(1, workers)
+        self.max_cycles = max_cycles
+        self.report_root = report_root
+        self.budget = budget or QuotaBudget()
+        self.auto_approve = auto_approve
+        self.console = console or Console()
+
+        api_key = os.environ.get("GEMINI_API_KEY")
+        # One client (one HTTP pool) for every worker
+        self.client = create_client(api_key) if api_key or os.environ.get("GEMINI_BASE_URL") else None
+
+        self._lock = threading.Lock()
+        self.state = {t: {"status": "QUEUED", "cycle": 0, "max_cycles": max_cycles, "last": "", "start": None, "end": None}
+                      for t in self.targets}
+
+    @staticmethod
+    def resolve_targets(names: list = None, label: str = None) -> list:
+        """Explicit container names plus everything matching the label selector."""
+        targets = list(names or [])
+        if label:
+            targets += get_transport().list_containers(label=label)
+        return list(dict.fromkeys(targets))
+
+    def _on_event(self, target: str, event: str, **data):
+        with self._lock:
+            row = self.state[target]
+            if event == "cycle":
+                row["cycle"] = data["step"]
+            elif event == "action":
+                row["last"] = f"{data['tool']} {data.get('args') or ''}"[:60]
+            elif event == "done":
+                row["status"] = data["status"]
+
+    def _run_one(self, target: str) -> dict:
+        with self._lock:
+            self.state[target].update(status="RUNNING", start=time.time())
+        status = "UNREACHABLE"
+        agent = SysMindAgent(
+            target_name=target,
+            client=self.client,
+            console=Console(quiet=True),
+            report_dir=os.path.join(self.report_root, target),
+            budget=self.budget,
+            interactive=False,
+            auto_approve=self.auto_approve,
+        )
+        agent.on_event = self._on_event
+        try:
+            if agent.connect():
+                status = agent.ooda_loop(self.objective_builder(agent), max_cycles=self.max_cycles)
+        except Exception as e:
+            status = f"ERROR: {e}"
+        finally:
+            agent.close()
+        with self._lock:
+            self.state[target].update(status=status, end=time.time())
+            row = dict(self.state[target])
+        tokens = agent.mission_metrics["total_tokens"] if agent.mission_metrics else 0
+        return {"target": target, "status": status, "duration_s": round(row["end"] - row["start"], 2), "tokens": tokens}
+
+    def _render(self, started: float) -> Table:
+        elapsed = max(time.time() - started, 1e-6)
+        with self._lock:
+            rows = [(t, dict(r)) for t, r in self.state.items()]
+        done = sum(1 for _, r in rows if r["end"])
+        resolved = sum(1 for _, r in rows if r["status"] == "RESOLVED")
+        table = Table(
+            title=f"SysMind Fleet — {done}/{len(rows)} done | {resolved / elapsed * 60:.1f} incidents/min | LLM calls: {self.budget.used}",
+            expand=True,
+        )
+        for col in ("Target", "Status", "Cycle", "Last Action", "Elapsed"):
+            table.add_column(col)
+        colors = {"RESOLVED": "green", "RUNNING": "cyan", "QUEUED": "dim"}
+        for target, r in rows:
+            color = colors.get(r["status"], "red")
+            secs = ((r["end"] or time.time()) - r["start"]) if r["start"] else 0
+            table.add_row(target, f"[{color}]{r['status']}[/{color}]", f"{r['cycle']}/{r['max_cycles']}", r["last"], f"{secs:.0f}s")
+        return table
+
+    def run(self) -> dict:
+        """Runs every mission; returns per-target results plus fleet throughput."""
+        started = time.time()
+        results = []
+        with Live(self._render(started), console=self.console, refresh_per_second=4) as live:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sysmind-fleet") as pool:
+                futures = [pool.submit(self._run_one, t) for t in self.targets]
+                while not all(f.done() for f in futures):
+                    live.update(self._render(started))
+                    time.sleep(0.25)
+                results = [f.result() for f in futures]
+            live.update(self._render(started))
+
+        elapsed = time.time() - started
+        resolved = sum(1 for r in results if r["status"] == "RESOLVED")
+        return {
+            "targets": len(self.targets),
+            "workers": self.workers,
+            "resolved": resolved,
+            "elapsed_s": round(elapsed, 2),
+            "incidents_per_minute": round(resolved / elapsed * 60, 2) if elapsed else 0.0,
+            "llm_calls": self.budget.used,
+            "total_tokens": sum(r["tokens"] for r in results),
+            "rate_limiter": get_rate_limiter().metrics(),
+            "results": results,
+        }
@@ -0,0 +1,93 @@
+"""
+Speculative Diagnostic Prefetch for SysMind.
+The USE-method prompt almost always opens with the same read-only checks
+(processes, ports, disk, system stats). While the model is thinking the target
+link is idle, so those checks run in the background; when the model asks for
+one, a fresh enough result is served instead of a new round trip.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Prefetcher:
+    """
+    Background runner for no-argument read-only diagnostics with a freshness bound.
+    Any state-changing action invalidates everything prefetched before it.
+    """
+
+    def __init__(self, commands: dict, runner, max_age: float = 10.0):
+        self.commands = dict(commands)
+        self.runner = runner
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pool = None
+        self.stats = {"started": 0, "hits": 0, "misses": 0, "stale": 0, "wasted": 0, "saved_s": 0.0}
+
+    def reset_stats(self):
+        """New mission: hit/miss figures are reported per mission, not per agent lifetime."""
+        with self._lock:
+            self.stats = {"started": 0, "hits": 0, "misses": 0, "stale": 0, "wasted": 0, "saved_s": 0.0}
+
+    def _run(self, command: str) -> tuple:
+        started = time.time()
+        result = self.runner(command)
+        return result, time.time() - started
+
+    def start(self):
+        """Launches every diagnostic that has no fresh or in-flight result yet."""
+        now = time.time()
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=len(self.commands) or 1, thread_name_prefix="sysmind-prefetch")
+            for name, command in self.commands.items():
+                entry = self._entries.get(name)
+                if entry and now - entry["started"] <= self.max_age:
+                    continue
+                if entry:
+                    self.stats["wasted"] += 1
+                self._entries[name] = {"started": now, "future": self._pool.submit(self._run, command)}
+                self.stats["started"] += 1
+
+    def take(self, name: str):
+        """Prefetched result for `name`, or None if there is none fresh enough. Each result is served once."""
+        with self._lock:
+            entry = self._entries.pop(name, None)
+        if entry is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        waited = time.time()
+        result, latency = entry["future"].result()
+        waited = time.time() - waited
+        with self._lock:
+            # Data is as old as the moment the command started on the target
+            if time.time() - entry["started"] > self.max_age:
+                self.stats["stale"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.stats["saved_s"] += max(0.0, latency - waited)
+        return result
+
+    def invalidate(self):
+        """A state-changing action happened: nothing prefetched before it may be served."""
+        with self._lock:
+            self.stats["wasted"] += len(self._entries)
+            self._entries.clear()
+
+    def report(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        served = stats["hits"] + stats["misses"] + stats["stale"]
+        stats["saved_s"] = round(stats["saved_s"], 3)
+        stats["hit_rate"] = round(stats["hits"] / served, 3) if served else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self.stats["wasted"] += len(self._entries)
+            self._entries.clear()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
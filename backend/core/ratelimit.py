@@ -0,0 +1,227 @@
+"""
+LLM Quota Control for SysMind.
+Shared allowances so every agent in the process (Fleet Mode included) draws
+from one budget: a token-bucket limiter schedules calls against RPM/TPM before
+they are sent, and a single bounded retry policy handles the 429s that still
+slip through.
+"""
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class BudgetExhausted(Exception):
+    """The shared LLM call allowance is used up; the mission must halt."""
+
+
+def estimate_tokens(text) -> int:
+    """Cheap local estimate (~4 characters per token) when no usage metadata exists."""
+    return max(1, len(str(text)) // 4)
+
+
+class QuotaBudget:
+    """
+    Process-shared LLM allowance: a cap on total calls and on calls in flight.
+    """
+
+    def __init__(self, max_calls: int = None, max_inflight: int = None):
+        self.max_calls = max_calls
+        self.max_inflight = max_inflight
+        self.used = 0
+        self._lock = threading.Lock()
+        self._inflight = threading.BoundedSemaphore(max_inflight) if max_inflight else None
+
+    @property
+    def remaining(self):
+        return None if self.max_calls is None else max(0, self.max_calls - self.used)
+
+    @contextmanager
+    def slot(self):
+        """Reserves one call; blocks while `max_inflight` calls are already running."""
+        with self._lock:
+            if self.max_calls is not None and self.used >= self.max_calls:
+                raise BudgetExhausted(f"LLM call budget exhausted ({self.max_calls} calls)")
+            self.used += 1
+        if self._inflight:
+            self._inflight.acquire()
+        try:
+            yield
+        finally:
+            if self._inflight:
+                self._inflight.release()
+
+
+class TokenBucket:
+    """
+    Classic token bucket that may go into debt: a reservation is always granted
+    and the caller is told how long to wait until the debt is repaid. This gives
+    FIFO scheduling without a queue thread.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Takes `amount` tokens and returns the seconds to wait before using them."""
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, delta: float):
+        """Corrects an estimate once the real cost is known (positive delta = took more)."""
+        self.tokens -= delta
+
+
+class RetryPolicy:
+    """
+    One bounded retry policy: full-jitter exponential backoff, capped, and
+    overridden by the server's Retry-After whenever it sends one.
+    """
+
+    RETRYABLE_CODES = (429, 500, 503)
+
+    def __init__(self, max_retries: int = 4, base_delay: float = 2.0, max_delay: float = 60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def status_code(error: Exception):
+        code = getattr(error, "code", None)
+        if isinstance(code, int):
+            return code
+        match = re.match(r"\s*(\d{3})\b", str(error))
+        return int(match.group(1)) if match else None
+
+    def is_retryable(self, error: Exception) -> bool:
+        return self.status_code(error) in self.RETRYABLE_CODES
+
+    @staticmethod
+    def retry_after(error: Exception):
+        """Server-requested delay in seconds (Retry-After header or RetryInfo.retryDelay)."""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            value = headers.get("retry-after") or headers.get("Retry-After")
+            if value:
+                return float(value)
+        except (TypeError, ValueError):
+            pass
+        match = re.search(r"retryDelay['\"]?\s*[:=]\s*['\"]?([\d.]+)s", str(error))
+        return float(match.group(1)) if match else None
+
+    def delay(self, attempt: int, error: Exception = None) -> float:
+        server = self.retry_after(error) if error is not None else None
+        if server is not None:
+            # Never earlier than the server asked; spread retries so callers don't stampede
+            return min(server, self.max_delay) * random.uniform(1.0, 1.1)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class RateLimiter:
+    """
+    Process-wide RPM/TPM scheduler for model calls.
+    """
+
+    def __init__(self, rpm: float = 15, tpm: float = 250000, retry_policy: RetryPolicy = None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self._waits = deque(maxlen=1000)
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "total_wait_s": 0.0, "max_wait_s": 0.0}
+
+    def schedule(self, est_tokens: int) -> float:
+        """Reserves capacity for one call and returns the wait before it may be sent."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._blocked_until - now)
+            if self.requests:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens:
+                wait = max(wait, self.tokens.reserve(est_tokens, now))
+            self.stats["calls"] += 1
+            self.stats["total_wait_s"] += wait
+            self.stats["max_wait_s"] = max(self.stats["max_wait_s"], wait)
+            self._waits.append(wait)
+        return wait
+
+    def acquire(self, est_tokens: int = 1):
+        wait = self.schedule(est_tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def settle(self, est_tokens: int, actual_tokens: int):
+        """Charges the difference between the estimate and real usage metadata."""
+        if self.tokens and actual_tokens:
+            with self._lock:
+                self.tokens.adjust(actual_tokens - est_tokens)
+
+    def penalize(self, seconds: float):
+        """A 429 pauses every caller, not just the one that hit it."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def call(self, fn, est_tokens: int = 1, on_retry=None):
+        """Schedules `fn`, retrying retryable errors per the shared policy."""
+        attempt = 0
+        while True:
+            self.acquire(est_tokens)
+            try:
+                return fn()
+            except Exception as e:
+                if not self.retry_policy.is_retryable(e) or attempt >= self.retry_policy.max_retries:
+                    raise
+                delay = self.retry_policy.delay(attempt, e)
+                with self._lock:
+                    self.stats["retries"] += 1
+                    if self.retry_policy.status_code(e) == 429:
+                        self.stats["rate_limited"] += 1
+                self.penalize(delay)
+                if on_retry:
+                    on_retry(attempt + 1, delay, e)
+                attempt += 1
+
+    def metrics(self) -> dict:
+        """Queue wait metrics (seconds) plus retry counters."""
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = dict(self.stats)
+
+        def pct(p):
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 3) if waits else 0.0
+
+        stats["total_wait_s"] = round(stats["total_wait_s"], 3)
+        stats["max_wait_s"] = round(stats["max_wait_s"], 3)
+        stats.update(p50_wait_s=pct(0.50), p95_wait_s=pct(0.95))
+        return stats
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter configured from SYSMIND_RPM / SYSMIND_TPM / SYSMIND_MAX_RETRIES."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(
+                rpm=float(os.environ.get("SYSMIND_RPM", "15")),
+                tpm=float(os.environ.get("SYSMIND_TPM", "250000")),
+                retry_policy=RetryPolicy(max_retries=int(os.environ.get("SYSMIND_MAX_RETRIES", "4"))),
+            )
+        return _shared_limiter
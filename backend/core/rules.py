@@ -0,0 +1,180 @@
+"""
+Incident Rule Engine for SysMind.
+Known incident signatures live in a declarative rules file next to the
+knowledge base. One telemetry snapshot (processes, listeners, failed units)
+is matched against them; a confident match that relates to the mission
+objective proposes its remediation with no LLM round trip, anything less
+falls back to the model.
+"""
+import json
+import os
+import re
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "knowledge", "incident_rules.json")
+
+# One round trip for everything the rules look at; sections are parsed by marker
+TELEMETRY_COMMAND = (
+    "echo '### ps'; ps -eo pid=,pcpu=,pmem=,comm=,args= --sort=-pcpu 2>/dev/null | head -n 50; "
+    "echo '### ss'; ss -Htulnp 2>/dev/null; "
+    "echo '### failed'; systemctl list-units --state=failed --no-legend --plain 2>/dev/null; true"
+)
+
+_USERS_PATTERN = re.compile(r'\("([^"]+)",pid=(\d+)')
+_PLACEHOLDER = re.compile(r"^\{(\w+)\}$")
+
+# Remediations that cannot be undone: never auto-applied to an owner the rule cannot vouch for
+DESTRUCTIVE_TOOLS = {"kill_process"}
+
+
+def parse_telemetry(text: str) -> dict:
+    """Parses TELEMETRY_COMMAND output into processes, listeners and failed units."""
+    telemetry = {"processes": [], "listeners": [], "failed_units": []}
+    section = None
+    for line in (text or "").splitlines():
+        if line.startswith("### "):
+            section = line[4:].strip()
+            continue
+        if not line.strip():
+            continue
+        if section == "ps":
+            fields = line.split(None, 4)
+            if len(fields) < 4:
+                continue
+            try:
+                telemetry["processes"].append({
+                    "pid": int(fields[0]), "cpu": float(fields[1]), "mem": float(fields[2]),
+                    "name": fields[3], "args": fields[4] if len(fields) > 4 else fields[3],
+                })
+            except ValueError:
+                continue
+        elif section == "ss":
+            fields = line.split()
+            if len(fields) < 5 or ":" not in fields[4]:
+                continue
+            address, _, port = fields[4].rpartition(":")
+            users = _USERS_PATTERN.search(line)
+            try:
+                telemetry["listeners"].append({
+                    "proto": fields[0], "address": address, "port": int(port),
+                    "process": users.group(1) if users else None,
+                    "pid": int(users.group(2)) if users else None,
+                })
+            except ValueError:
+                continue
+        elif section == "failed":
+            unit = line.replace("●", "").split()
+            if unit:
+                telemetry["failed_units"].append(unit[0])
+    return telemetry
+
+
+def render(template, bindings: dict):
+    """Fills '{name}' placeholders; a value that is exactly one placeholder keeps its type."""
+    if isinstance(template, dict):
+        return {k: render(v, bindings) for k, v in template.items()}
+    if isinstance(template, str):
+        whole = _PLACEHOLDER.match(template)
+        if whole and whole.group(1) in bindings:
+            return bindings[whole.group(1)]
+        return template.format(**bindings)
+    return template
+
+
+class RuleEngine:
+    """
+    Matches telemetry snapshots against declarative incident signatures.
+    """
+
+    def __init__(self, rules: list, min_confidence: float = 0.8, version=None):
+        self.rules = rules
+        self.min_confidence = min_confidence
+        self.version = version
+
+    @classmethod
+    def from_file(cls, path: str = RULES_PATH, min_confidence: float = None):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        threshold = data.get("min_confidence", 0.8) if min_confidence is None else min_confidence
+        return cls(data.get("rules", []), min_confidence=threshold, version=data.get("version"))
+
+    def _match(self, rule: dict, telemetry: dict):
+        """Best binding set for one rule and its confidence, or None."""
+        spec = rule["match"]
+        confidence = float(rule.get("confidence", 0.5))
+        if spec["type"] == "process":
+            pattern = re.compile(spec["name"])
+            hits = [p for p in telemetry["processes"]
+                    if (pattern.search(p["name"]) or pattern.search(p["args"]))
+                    and p["cpu"] >= spec.get("min_cpu", 0.0) and p["mem"] >= spec.get("min_mem", 0.0)]
+            if not hits:
+                return None
+            top = max(hits, key=lambda p: p["cpu"])
+            return dict(top), confidence
+        if spec["type"] == "listener":
+            allowed = set(spec.get("allowed_processes", []))
+            hits = [l for l in telemetry["listeners"] if l["port"] in spec["ports"] and l["process"] not in allowed]
+            if not hits:
+                return None
+            hit = hits[0]
+            if hit["pid"] is None:
+                # Port is taken but the owner is unknown (no privileges): cannot act on it
+                confidence *= 0.5
+            if not allowed and rule["action"]["tool"] in DESTRUCTIVE_TOOLS:
+                # No allow-list: any owner would be killed, so it stays a hint below the threshold
+                confidence = min(confidence, 0.9 * self.min_confidence)
+            return dict(hit), confidence
+        if spec["type"] == "failed_unit":
+            pattern = re.compile(spec.get("unit", "."))
+            hits = [u for u in telemetry["failed_units"] if pattern.search(u)]
+            if not hits:
+                return None
+            # Several failures at once look systemic, not like the known single-unit incident
+            return {"unit": hits[0]}, confidence * (0.9 ** (len(hits) - 1))
+        return None
+
+    @staticmethod
+    def relates(rule: dict, objective: str) -> bool:
+        """True if the rule's 'objective' pattern matches the mission objective (no pattern: never)."""
+        pattern = rule.get("objective")
+        return bool(pattern) and re.search(pattern, objective or "", re.IGNORECASE) is not None
+
+    def evaluate(self, telemetry: dict, only: str = None, objective: str = None) -> list:
+        """All matching signatures, most confident first; with an objective, only the rules it relates to."""
+        findings = []
+        for rule in self.rules:
+            if only and rule["id"] != only:
+                continue
+            if objective is not None and not self.relates(rule, objective):
+                continue
+            matched = self._match(rule, telemetry)
+            if matched:
+                bindings, confidence = matched
+                findings.append({"rule": rule, "bindings": bindings, "confidence": round(confidence, 3)})
+        return sorted(findings, key=lambda f: f["confidence"], reverse=True)
+
+    def is_confident(self, finding: dict) -> bool:
+        return finding["confidence"] >= self.min_confidence
+
+    @staticmethod
+    def remediation(finding: dict) -> tuple:
+        action = finding["rule"]["action"]
+        return action["tool"], render(action.get("args", {}), finding["bindings"])
+
+    @staticmethod
+    def summary(finding: dict) -> str:
+        return render(finding["rule"].get("summary", finding["rule"]["description"]), finding["bindings"])
+
+    @staticmethod
+    def describe(finding: dict) -> str:
+        return f"'{finding['rule']['id']}' ({finding['rule']['description']}) with {finding['bindings']}, confidence {finding['confidence']:.2f}"
+
+
+def rule_engine_from_env():
+    """Builds the rule engine if SYSMIND_RULES=true, else None."""
+    if os.environ.get("SYSMIND_RULES", "false").lower() != "true":
+        return None
+    threshold = os.environ.get("SYSMIND_RULES_MIN_CONFIDENCE")
+    return RuleEngine.from_file(
+        os.environ.get("SYSMIND_RULES_PATH", RULES_PATH),
+        min_confidence=float(threshold) if threshold else None,
+    )
@@ -0,0 +1,208 @@
+"""
+Continuous Metrics Sampler for SysMind.
+One background thread per target polls container stats at a fixed interval
+into a preallocated NumPy ring buffer (fixed memory, no per-sample objects).
+Windowed queries (last N seconds: min/max/mean/percentiles, or the raw
+series) feed the objective builder, the `get_metrics` tool and numeric
+anomaly detection without another round trip to the target.
+"""
+import os
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FIELDS = ("cpu", "mem", "net_rx", "net_tx", "blk_read", "blk_write")
+UNITS = {"cpu": "%", "mem": "%", "net_rx": " KB/s", "net_tx": " KB/s", "blk_read": " KB/s", "blk_write": " KB/s"}
+# Cumulative byte counters in a stats sample, stored as rates
+_COUNTERS = {"net_rx": "net_rx_bytes", "net_tx": "net_tx_bytes", "blk_read": "blk_read_bytes", "blk_write": "blk_write_bytes"}
+
+
+class MetricsRing:
+    """
+    Fixed-capacity ring of (timestamp, *FIELDS) rows in one float64 array.
+    """
+
+    def __init__(self, capacity: int = 1800, fields: tuple = FIELDS):
+        if np is None:
+            raise RuntimeError("numpy is not installed")
+        self.fields = fields
+        self.capacity = capacity
+        self._data = np.zeros((capacity, len(fields) + 1), dtype=np.float64)
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp: float, values: dict):
+        row = [timestamp] + [float(values.get(f, 0.0)) for f in self.fields]
+        with self._lock:
+            self._data[self._next] = row
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def _ordered(self):
+        """Rows oldest -> newest (a copy, safe to use outside the lock)."""
+        with self._lock:
+            if self._count < self.capacity:
+                return self._data[:self._count].copy()
+            return np.roll(self._data, -self._next, axis=0)
+
+    def window(self, seconds: float = None, now: float = None) -> dict:
+        """Series for the last `seconds` (all if None): {"t": array, field: array, ...}."""
+        rows = self._ordered()
+        if seconds is not None and len(rows):
+            rows = rows[rows[:, 0] >= (now if now is not None else time.time()) - seconds]
+        series = {"t": rows[:, 0]}
+        for i, field in enumerate(self.fields, start=1):
+            series[field] = rows[:, i]
+        return series
+
+    def query(self, seconds: float = None, percentiles: tuple = (50, 95)) -> dict:
+        """Per-field last/min/max/mean/percentiles over the window."""
+        series = self.window(seconds)
+        stats = {"samples": int(len(series["t"])), "fields": {}}
+        if not stats["samples"]:
+            return stats
+        stats["from"], stats["to"] = float(series["t"][0]), float(series["t"][-1])
+        for field in self.fields:
+            y = series[field]
+            row = {"last": float(y[-1]), "min": float(y.min()), "max": float(y.max()), "mean": float(y.mean())}
+            for p, value in zip(percentiles, np.percentile(y, percentiles)):
+                row[f"p{p}"] = float(value)
+            stats["fields"][field] = row
+        return stats
+
+
+class MetricsSampler:
+    """
+    Background poller: `source()` returns one normalized stats sample (DockerTransport.stats shape).
+    """
+
+    def __init__(self, source, interval: float = 2.0, capacity: int = 1800, name: str = "target"):
+        self.source = source
+        self.interval = interval
+        self.ring = MetricsRing(capacity)
+        self.name = name
+        self.errors = 0
+        self.last_error = None
+        self._prev = None
+        self._stop = threading.Event()
+        self._first = threading.Event()
+        self._thread = None
+
+    def sample_once(self) -> bool:
+        """
+        Takes one sample; counters become per-second rates against the previous
+        sample. The very first one only sets that baseline (a row of zero rates
+        would read as a step in the io/net series), so it stores nothing.
+        """
+        now = time.time()
+        raw = self.source()
+        prev, self._prev = self._prev, (now, raw)
+        if prev is None or now <= prev[0]:
+            return False
+        values = {"cpu": raw.get("cpu_percent", 0.0), "mem": raw.get("mem_percent", 0.0)}
+        dt = now - prev[0]
+        for field, key in _COUNTERS.items():
+            values[field] = max(0.0, raw.get(key, 0.0) - prev[1].get(key, 0.0)) / 1024 / dt
+        self.ring.append(now, values)
+        self._first.set()
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.time()
+            interval = self.interval
+            try:
+                if not self.sample_once():
+                    interval = min(self.interval, 1.0)  # Baseline only: the first row follows soon after
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+            # Fixed cadence: the stats call's own latency is part of the interval
+            self._stop.wait(max(0.0, interval - (time.time() - started)))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"sysmind-sampler-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait_first(self, timeout: float = 5.0) -> bool:
+        return self._first.wait(timeout)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def line(self, seconds: float = 30) -> str:
+        """Compact 'CPU% / MEM%' plus recent peak for prompts (same lead as `docker stats`)."""
+        stats = self.ring.query(seconds)
+        if not stats["samples"]:
+            return "N/A"
+        cpu, mem = stats["fields"]["cpu"], stats["fields"]["mem"]
+        return f"{cpu['last']:.2f}% / {mem['last']:.2f}% (last {seconds:g}s: CPU max {cpu['max']:.1f}%, MEM max {mem['max']:.1f}%)"
+
+    def describe(self, seconds: float = 60, fields: list = None) -> str:
+        """Windowed summary table for the `get_metrics` tool."""
+        stats = self.ring.query(seconds)
+        if not stats["samples"]:
+            return f"Error: No samples in the last {seconds:g}s (sampler errors: {self.errors}{', ' + self.last_error if self.last_error else ''})."
+        span = stats["to"] - stats["from"]
+        lines = [f"[METRICS] {self.name}: {stats['samples']} samples over {span:.0f}s (interval {self.interval:g}s)",
+                 f"{'metric':<16} {'last':>9} {'min':>9} {'max':>9} {'mean':>9} {'p50':>9} {'p95':>9}"]
+        for field in fields or FIELDS:
+            row = stats["fields"].get(field)
+            if row is None:
+                continue
+            unit = UNITS[field].strip()
+            lines.append(f"{field + ' (' + unit + ')':<16} " + " ".join(f"{row[k]:>9.1f}" for k in ("last", "min", "max", "mean", "p50", "p95")))
+        return "\n".join(lines)
+
+
+_samplers = {}  # target -> [sampler, agents using it]
+_samplers_lock = threading.Lock()
+
+
+def sampler_from_env(transport, target: str):
+    """Process-wide sampler per target if SYSMIND_METRICS_SAMPLER=true and the transport has stats, else None."""
+    if os.environ.get("SYSMIND_METRICS_SAMPLER", "false").lower() != "true" or np is None:
+        return None
+    if not hasattr(transport, "stats"):
+        return None
+    with _samplers_lock:
+        entry = _samplers.get(target)
+        if entry is None or not entry[0].running():
+            sampler = MetricsSampler(
+                lambda: transport.stats(target),
+                interval=float(os.environ.get("SYSMIND_METRICS_INTERVAL", "2")),
+                capacity=int(os.environ.get("SYSMIND_METRICS_CAPACITY", "1800")),
+                name=target,
+            ).start()
+            entry = _samplers[target] = [sampler, 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def release_sampler(sampler: MetricsSampler):
+    """One agent is done with a shared sampler; the last one stops its thread."""
+    with _samplers_lock:
+        for target, entry in list(_samplers.items()):
+            if entry[0] is sampler:
+                entry[1] -= 1
+                if entry[1] > 0:
+                    return
+                del _samplers[target]
+                break
+    sampler.stop()
@@ -0,0 +1,111 @@
+"""
+Multi-Turn Chat Session for SysMind.
+Instead of rebuilding one big prompt string every OODA cycle, the mission is
+kept as a proper conversation: the objective opens it once, and every
+function call / function response is appended as a structured part. The
+stable prefix is never re-serialized by us, and early results are no longer
+dropped by a sliding window.
+"""
+from google.genai import types
+
+
+class ChatSession:
+    """
+    Structured conversation state for one mission.
+    """
+
+    def __init__(self, objective: str, kb_text: str = ""):
+        self.objective = objective
+        self.kb_text = kb_text
+        self.contents = [types.Content(role="user", parts=[types.Part(text=f"OBJECTIVE: {objective}\n{kb_text}")])]
+        self.model_steps = []  # OODA cycle of each model turn, in order (compaction cut points)
+
+    @staticmethod
+    def content_from_calls(calls: list) -> types.Content:
+        """Model turn for decisions that did not come from a live response (mock, cache)."""
+        parts = []
+        for name, args in calls:
+            if name == "THOUGHT":
+                parts.append(types.Part(text=str(args)))
+            else:
+                parts.append(types.Part.from_function_call(name=name, args=dict(args or {})))
+        return types.Content(role="model", parts=parts)
+
+    def add_model(self, content: types.Content, step: int = None):
+        self.contents.append(content)
+        self.model_steps.append(step)
+
+    def add_function_result(self, name: str, result: str):
+        """Function responses answering one model turn share a single user turn."""
+        part = types.Part.from_function_response(name=name, response={"result": result})
+        last = self.contents[-1]
+        if last.role == "user" and last.parts and all(p.function_response for p in last.parts):
+            last.parts.append(part)
+        else:
+            self.contents.append(types.Content(role="user", parts=[part]))
+
+    def add_user_text(self, text: str):
+        self.contents.append(types.Content(role="user", parts=[types.Part(text=text)]))
+
+    def add_note(self, text: str):
+        """Extra context for the next model call, kept inside the current user turn."""
+        last = self.contents[-1]
+        if last.role == "user":
+            last.parts.append(types.Part(text=text))
+        else:
+            self.add_user_text(text)
+
+    def ensure_user_turn(self):
+        """The model must always answer a user turn: nudge it after a text-only reply."""
+        if self.contents[-1].role == "model":
+            self.add_user_text("Continue with the next ACTION.")
+
+    def answer_pending(self, error: str) -> int:
+        """Answers the last model turn's unanswered function calls with `error` (a tool raised mid-turn)."""
+        model_turns = [i for i, c in enumerate(self.contents) if c.role == "model"]
+        if not model_turns:
+            return 0
+        calls = [p.function_call.name for p in self.contents[model_turns[-1]].parts or [] if p.function_call]
+        answered = sum(1 for c in self.contents[model_turns[-1] + 1:] for p in c.parts or [] if p.function_response)
+        for name in calls[answered:]:
+            self.add_function_result(name, error)
+        self.ensure_user_turn()
+        return len(calls[answered:])
+
+    def compact(self, first_step: int, summary: str) -> int:
+        """
+        Drops every exchange before the model turn of cycle `first_step` (the first history
+        step not folded into the summary); the summary joins the opening turn. The whole turn
+        is kept, so calls answered in it stay paired even if some of its steps were folded.
+        """
+        model_turns = [i for i, c in enumerate(self.contents) if c.role == "model"]
+        kept = next((n for n, step in enumerate(self.model_steps) if step is not None and step >= first_step), len(model_turns))
+        if kept == 0:
+            return 0
+        cut = model_turns[kept] if kept < len(model_turns) else len(self.contents)
+        opening = types.Content(role="user", parts=[types.Part(text=f"OBJECTIVE: {self.objective}\n{self.kb_text}\n{summary}")])
+        dropped = cut - 1
+        self.contents = [opening] + self.contents[cut:]
+        self.model_steps = self.model_steps[kept:]
+        return dropped
+
+    @staticmethod
+    def render(contents: list) -> str:
+        """Plain-text transcript (mock brain, cache freshness checks, token estimates)."""
+        lines = []
+        for i, content in enumerate(contents):
+            if i == 1:
+                lines.append("HISTORY:")
+            for part in content.parts or []:
+                if part.text:
+                    lines.append(part.text)
+                elif part.function_call:
+                    lines.append(f"Action={part.function_call.name}({dict(part.function_call.args or {})})")
+                elif part.function_response:
+                    lines.append(f"Result[{part.function_response.name}]={(part.function_response.response or {}).get('result')}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def to_json(contents: list) -> list:
+        """Canonical JSON form (response cache key)."""
+        return [c.model_dump(mode="json", exclude_none=True) for c in contents]
@@ -0,0 +1,306 @@
+"""
+Local Gemini Stand-In Server for SysMind.
+Speaks the subset of the generateContent protocol the google-genai client
+uses (generateContent + streamGenerateContent over SSE) and answers with
+scripted function calls from the simulation scenarios. Latency follows a
+configurable distribution, and 429s (with RetryInfo), 5xx and empty
+candidates are injected at configurable rates, so the model path, retries
+and throughput can be benchmarked without spending quota.
+
+Point the agent at it with GEMINI_BASE_URL=http://127.0.0.1:<port>.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend.simulation.scripted import fill, load_scenarios, resolve_vars
+
+_ROUTE = re.compile(r"^/v1[a-z0-9]*/models/([^:/]+):(generateContent|streamGenerateContent)")
+_STEP = re.compile(r"^Step (\d+): Action=(?!THOUGHT\()", re.MULTILINE)
+
+VISION_TEXT = (
+    "1. CPU Usage: Sudden vertical spike to 98% starting at 14:23 UTC.\n"
+    "2. Memory: Correlated increase to 85%.\n"
+    "3. Pattern: Matches 'stress test' signature. Check running processes."
+)
+
+
+def parse_latency(spec: str):
+    """
+    Latency sampler in seconds from a spec in milliseconds:
+    'fixed:200', 'uniform:100:400', 'normal:300:50', 'lognormal:300:0.5' (median, sigma).
+    """
+    kind, *args = (spec or "fixed:0").split(":")
+    values = [float(a) for a in args]
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class GeminiStub:
+    """
+    Threaded HTTP stand-in for the Gemini API with latency and fault injection.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: str = "fixed:0",
+                 rate_429: float = 0.0, rate_500: float = 0.0, empty_rate: float = 0.0,
+                 rpm: int = 0, retry_delay: float = 1.0, seed: int = 0, scenarios_path: str = None):
+        self.host = host
+        self.port = port
+        self.sample_latency = parse_latency(latency)
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.empty_rate = empty_rate
+        self.rpm = rpm
+        self.retry_delay = retry_delay
+        self.scenarios = load_scenarios(scenarios_path) if scenarios_path else load_scenarios()
+        # Stub missions share one variable set (the FakeTarget side uses the same seed)
+        self.values = {sid: resolve_vars(s.get("vars"), random.Random(seed)) for sid, s in self.scenarios.items()}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque()
+        self.stats = {"requests": 0, "ok": 0, "streamed": 0, "rate_limited": 0, "server_errors": 0, "empty": 0, "vision": 0}
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # --- Decision logic -------------------------------------------------
+
+    def _scenario_for(self, text: str):
+        for sid, scenario in self.scenarios.items():
+            if scenario["objective"] in text:
+                return sid, scenario
+        return None, None
+
+    @staticmethod
+    def _turns(script: list) -> list:
+        """Script entries as model turns; THOUGHT text rides along with the next function call."""
+        turns, pending = [], []
+        for entry in script:
+            entries = entry if isinstance(entry, list) else [entry]
+            calls = [e for e in entries if e["tool"] != "THOUGHT"]
+            pending += [str(e.get("args", "")) for e in entries if e["tool"] == "THOUGHT"]
+            if calls:
+                turns.append({"text": "\n".join(pending), "calls": calls})
+                pending = []
+        return turns
+
+    @staticmethod
+    def _position(contents: list, text: str) -> int:
+        """
+        How far the mission is: model turns (chat session) or distinct acting steps in the
+        prompt history (THOUGHT-only steps, e.g. after an empty candidate, do not count).
+        """
+        model_turns = sum(1 for c in contents if c.get("role") == "model")
+        if model_turns:
+            return model_turns
+        return len(set(_STEP.findall(text)))
+
+    def decide(self, body: dict) -> dict:
+        """Candidate content for one generateContent request."""
+        contents = body.get("contents", [])
+        parts = [p for c in contents for p in c.get("parts", [])]
+        text = "\n".join(p.get("text", "") for p in parts if "text" in p)
+        if any("inlineData" in p or "inline_data" in p for p in parts):
+            with self._lock:
+                self.stats["vision"] += 1
+            return {"role": "model", "parts": [{"text": VISION_TEXT}]}
+
+        sid, scenario = self._scenario_for(text)
+        if scenario is None:
+            turns = [{"text": "", "calls": [{"tool": "list_processes", "args": {}}]},
+                     {"text": "", "calls": [{"tool": "mission_complete", "args": {"summary": "Stub mission complete."}}]}]
+        else:
+            turns = self._turns(fill(scenario["script"], self.values[sid]))
+        position = min(self._position(contents, text), len(turns) - 1)
+        turn = turns[position]
+        out = [{"text": turn["text"]}] if turn["text"] else []
+        out += [{"functionCall": {"name": c["tool"], "args": c.get("args", {})}} for c in turn["calls"]]
+        return {"role": "model", "parts": out}
+
+    def _fault(self):
+        """Injected failure for this request: (status, payload, headers) or None."""
+        with self._lock:
+            now = time.monotonic()
+            if self.rpm:
+                while self._window and now - self._window[0] > 60:
+                    self._window.popleft()
+                if len(self._window) >= self.rpm:
+                    wait = 60 - (now - self._window[0])
+                    self.stats["rate_limited"] += 1
+                    return self._quota_error(wait)
+                self._window.append(now)
+            roll = self._rng.random()
+            if roll < self.rate_429:
+                self.stats["rate_limited"] += 1
+                return self._quota_error(self.retry_delay)
+            if roll < self.rate_429 + self.rate_500:
+                self.stats["server_errors"] += 1
+                return 503, {"error": {"code": 503, "message": "Injected overload.", "status": "UNAVAILABLE"}}, {}
+        return None
+
+    @staticmethod
+    def _quota_error(delay: float):
+        payload = {"error": {
+            "code": 429,
+            "message": "Resource has been exhausted (e.g. check quota).",
+            "status": "RESOURCE_EXHAUSTED",
+            "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": f"{delay:.3f}s"}],
+        }}
+        return 429, payload, {"Retry-After": f"{math.ceil(delay)}"}
+
+    def respond(self, body: dict):
+        """(status, payload, headers) for one request after latency and fault injection."""
+        with self._lock:
+            self.stats["requests"] += 1
+            latency = self.sample_latency(self._rng)
+            empty = self._rng.random() < self.empty_rate
+        time.sleep(latency)
+        fault = self._fault()
+        if fault:
+            return fault
+        request_text = json.dumps(body.get("contents", []))
+        if empty:
+            with self._lock:
+                self.stats["empty"] += 1
+            candidate = {"content": {"role": "model", "parts": []}, "finishReason": "STOP"}
+        else:
+            candidate = {"content": self.decide(body), "finishReason": "STOP"}
+        prompt_tokens = max(1, len(request_text) // 4)
+        output_tokens = max(1, len(json.dumps(candidate)) // 4)
+        with self._lock:
+            self.stats["ok"] += 1
+        return 200, {
+            "candidates": [candidate],
+            "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens,
+                              "totalTokenCount": prompt_tokens + output_tokens},
+            "modelVersion": "sysmind-gemini-stub",
+        }, {}
+
+    # --- HTTP plumbing --------------------------------------------------
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, payload, headers):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/stats":
+                    with stub._lock:
+                        self._send_json(200, dict(stub.stats), {})
+                else:
+                    self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}}, {})
+
+            def do_POST(self):
+                route = _ROUTE.match(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    return self._send_json(400, {"error": {"code": 400, "message": "Invalid JSON", "status": "INVALID_ARGUMENT"}}, {})
+                if not route:
+                    return self._send_json(404, {"error": {"code": 404, "message": "Unknown method", "status": "NOT_FOUND"}}, {})
+                status, payload, headers = stub.respond(body)
+                if route.group(2) == "generateContent" or status != 200:
+                    return self._send_json(status, payload, headers)
+                self._stream(payload)
+
+            def _stream(self, payload):
+                """SSE: text first, then each function call in its own chunk; usage on the last one."""
+                with stub._lock:
+                    stub.stats["streamed"] += 1
+                candidate = payload["candidates"][0]
+                parts = candidate["content"]["parts"] or [{"text": ""}]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, part in enumerate(parts):
+                    chunk = {"candidates": [{"content": {"role": "model", "parts": [part]}}]}
+                    if i == len(parts) - 1:
+                        chunk["candidates"][0]["finishReason"] = "STOP"
+                        chunk["usageMetadata"] = payload["usageMetadata"]
+                    data = f"data: {json.dumps(chunk)}\r\n\r\n".encode("utf-8")
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+    def start(self) -> str:
+        """Serves in a background thread; returns the base URL."""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="gemini-stub", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SysMind local Gemini stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:400:0.4", help="fixed:MS | uniform:LO:HI | normal:MEAN:STD | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-500", type=float, default=0.0)
+    parser.add_argument("--empty-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0, help="Server-side quota (429 beyond N requests/minute)")
+    parser.add_argument("--retry-delay", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stub = GeminiStub(args.host, args.port, args.latency, args.rate_429, args.rate_500, args.empty_rate,
+                      args.rpm, args.retry_delay, args.seed)
+    print(f"[STUB] Gemini stand-in listening on {stub.start()} (GET /stats for counters)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
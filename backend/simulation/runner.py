@@ -0,0 +1,115 @@
+"""
+Offline Mission Load Runner for SysMind.
+Runs thousands of full OODA missions (loop, accounting, reports, knowledge
+base) against ScriptedBrain + FakeTarget pairs. Nothing leaves the process:
+no Docker, no network, no API quota. With a `client` (e.g. pointed at the
+local Gemini stub) the real model path is exercised instead of the brain.
+"""
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.console import Console
+
+from backend.core.agent import SysMindAgent
+from backend.core.ratelimit import get_rate_limiter
+from backend.simulation.scripted import build_backends, load_scenarios
+
+
+class QuietConsole(Console):
+    """Console that skips rendering entirely (Console(quiet=True) still renders, then discards)."""
+
+    def print(self, *objects, **kwargs):
+        pass
+
+    def log(self, *objects, **kwargs):
+        pass
+
+
+class SimulationRunner:
+    """
+    Bounded worker pool of offline missions cycling through the given scenarios.
+    """
+
+    def __init__(self, scenario_ids: list = None, missions: int = 100, workers: int = 4, max_cycles: int = 10,
+                 report_root: str = "sim_reports", scenarios_path: str = None, seed: int = 0, client=None):
+        scenarios = load_scenarios(scenarios_path) if scenarios_path else load_scenarios()
+        unknown = [s for s in scenario_ids or [] if s not in scenarios]
+        if unknown:
+            raise ValueError(f"Unknown scenario(s): {', '.join(unknown)}")
+        self.scenarios = [scenarios[s] for s in (scenario_ids or list(scenarios))]
+        self.missions = missions
+        self.workers = max(1, workers)
+        self.max_cycles = max_cycles
+        self.report_root = report_root
+        self.seed = seed
+        self.client = client
+        self.kb_file = os.path.join(report_root, "knowledge_base.json")
+
+    def _run_one(self, index: int, scenario: dict) -> dict:
+        target = f"sim-{index:06d}"
+        # The stub server resolves scenario variables once from the seed, so the target must match it
+        brain, fake = build_backends(scenario, seed=self.seed if self.client else self.seed + index, name=target)
+        agent = SysMindAgent(
+            target_name=target,
+            client=self.client,
+            console=QuietConsole(quiet=True),
+            # Per-mission directory: report names are second-resolution timestamps
+            report_dir=os.path.join(self.report_root, scenario["id"], target),
+            interactive=False,
+            auto_approve=True,
+            transport=fake,
+            brain=None if self.client else brain,
+        )
+        agent.simulation_mode = self.client is None
+        agent.kb_file = self.kb_file
+        started = time.time()
+        try:
+            status = agent.ooda_loop(scenario["objective"], max_cycles=self.max_cycles) if agent.connect() else "UNREACHABLE"
+        except Exception as e:
+            status = f"ERROR: {e}"
+        finally:
+            agent.close()
+        metrics = agent.mission_metrics or {}
+        return {
+            "scenario": scenario["id"],
+            "status": status,
+            "passed": status == scenario.get("expect", "RESOLVED"),
+            "duration_s": time.time() - started,
+            "cycles": len(metrics.get("cycles", [])),
+            "tokens": metrics.get("total_tokens", 0),
+        }
+
+    def run(self) -> dict:
+        """Runs every mission; returns throughput, pass rate and per-scenario breakdown."""
+        os.makedirs(self.report_root, exist_ok=True)
+        plan = list(zip(range(self.missions), itertools.cycle(self.scenarios)))
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sysmind-sim") as pool:
+            results = list(pool.map(lambda job: self._run_one(*job), plan))
+        elapsed = time.time() - started
+
+        durations = sorted(r["duration_s"] for r in results)
+        per_scenario = {}
+        for r in results:
+            row = per_scenario.setdefault(r["scenario"], {"missions": 0, "passed": 0, "statuses": {}})
+            row["missions"] += 1
+            row["passed"] += r["passed"]
+            row["statuses"][r["status"]] = row["statuses"].get(r["status"], 0) + 1
+
+        def pct(p):
+            return round(durations[min(len(durations) - 1, int(p * len(durations)))] * 1000, 2) if durations else 0.0
+
+        return {
+            "missions": len(results),
+            "workers": self.workers,
+            "passed": sum(r["passed"] for r in results),
+            "elapsed_s": round(elapsed, 3),
+            "missions_per_minute": round(len(results) / elapsed * 60, 1) if elapsed else 0.0,
+            "mission_ms_p50": pct(0.50),
+            "mission_ms_p95": pct(0.95),
+            "total_tokens_estimated": sum(r["tokens"] for r in results),
+            "rate_limiter": get_rate_limiter().metrics() if self.client else None,
+            "scenarios": per_scenario,
+        }
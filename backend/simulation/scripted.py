@@ -0,0 +1,125 @@
+"""
+Scenario-Scripted Simulation Backends for SysMind.
+A ScriptedBrain replays a scenario's decisions in order (no prompt scanning)
+and a FakeTarget answers tool commands from canned, templated outputs with a
+tiny state machine (e.g. 'incident' -> 'resolved' after the right kill). With
+both plugged into SysMindAgent, missions need no Docker and no network.
+"""
+import json
+import os
+import random
+import re
+import threading
+
+from backend.transport.capture import BoundedCapture
+
+SCENARIOS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios.json")
+
+_VAR = re.compile(r"\{(\w+)\}")
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_scenarios(path: str = SCENARIOS_PATH) -> dict:
+    """Scenario definitions by id (parsed once per process)."""
+    with _cache_lock:
+        if path not in _cache:
+            with open(path, "r", encoding="utf-8") as f:
+                _cache[path] = {s["id"]: s for s in json.load(f)["scenarios"]}
+        return _cache[path]
+
+
+def resolve_vars(spec: dict, rng: random.Random) -> dict:
+    """Per-mission variables: literals, or {"randint": [lo, hi]} / {"choice": [...]}."""
+    values = {}
+    for name, value in (spec or {}).items():
+        if isinstance(value, dict) and "randint" in value:
+            values[name] = rng.randint(*value["randint"])
+        elif isinstance(value, dict) and "choice" in value:
+            values[name] = rng.choice(value["choice"])
+        else:
+            values[name] = value
+    return values
+
+
+def fill(template, values: dict):
+    """Substitutes '{name}' for known variables only; a lone placeholder keeps its type."""
+    if isinstance(template, dict):
+        return {k: fill(v, values) for k, v in template.items()}
+    if isinstance(template, list):
+        return [fill(v, values) for v in template]
+    if isinstance(template, str):
+        whole = _VAR.fullmatch(template)
+        if whole and whole.group(1) in values:
+            return values[whole.group(1)]
+        return _VAR.sub(lambda m: str(values[m.group(1)]) if m.group(1) in values else m.group(0), template)
+    return template
+
+
+class ScriptedBrain:
+    """
+    Replays a scenario script: one entry per decision, a list entry is a parallel turn.
+    """
+
+    def __init__(self, scenario: dict, values: dict):
+        self.script = fill(scenario["script"], values)
+        self.position = 0
+
+    def decide(self, prompt=None) -> list:
+        if self.position >= len(self.script):
+            return [("THOUGHT", "Scenario script exhausted.")]
+        entry = self.script[self.position]
+        self.position += 1
+        entries = entry if isinstance(entry, list) else [entry]
+        return [(e["tool"], e.get("args", {})) for e in entries]
+
+
+class FakeTarget:
+    """
+    In-memory stand-in for DockerTransport: same exec/is_running/stats_line surface.
+    """
+
+    def __init__(self, scenario: dict, values: dict, name: str = "sim-target"):
+        spec = scenario.get("target", {})
+        self.name = name
+        self.state = spec.get("initial_state", "incident")
+        self.default = spec.get("default", {"code": 127, "output": "bash: command not found"})
+        self.rules = [
+            (re.compile(fill(rule["match"], values)), rule)
+            for rule in spec.get("commands", [])
+        ]
+        self.values = values
+        self.commands = []
+
+    def is_running(self, name: str) -> bool:
+        return True
+
+    def stats_line(self, name: str) -> str:
+        return "98.7% / 81.2%" if self.state == "incident" else "0.8% / 5.0%"
+
+    def latency_report(self) -> dict:
+        return {}
+
+    def run(self, command: str) -> tuple:
+        """Exit code and output for one command; may advance the target state."""
+        self.commands.append(command)
+        for pattern, rule in self.rules:
+            if pattern.search(command):
+                outputs = rule.get("outputs", {})
+                output = outputs.get(self.state, outputs.get("*", ""))
+                if "transition" in rule:
+                    self.state = rule["transition"]
+                return rule.get("code", 0), fill(output, self.values)
+        return self.default.get("code", 127), self.default.get("output", "")
+
+    def exec(self, name: str, command: str, timeout: int = 10, max_bytes: int = None):
+        code, output = self.run(command)
+        stdout, stderr = BoundedCapture(max_bytes), BoundedCapture(max_bytes)
+        (stdout if code == 0 else stderr).feed(output.encode("utf-8"))
+        return code, stdout, stderr
+
+
+def build_backends(scenario: dict, seed: int = None, name: str = "sim-target") -> tuple:
+    """Brain + target pair sharing one set of per-mission variables."""
+    values = resolve_vars(scenario.get("vars"), random.Random(seed))
+    return ScriptedBrain(scenario, values), FakeTarget(scenario, values, name=name)
@@ -4,20 +4,35 @@ class FileTools:
     """
     Titanium File Diagnostics & Reporting Tools.
     """
-    def get_read_command(self, path: str, lines: int = None) -> str:
+    def get_read_command(self, path: str, lines: int = None, max_bytes: int = 16384) -> str:
         """
         Read log file with optional line limit.
         
         Args:
             path: Path to file
-            lines: Number of lines to read from end. If None, reads ENTIRE file.
-                   This leverages Gemini 3's massive context window (1M+ tokens).
+            lines: Number of lines to read from end. If None, reads the whole file
+                   when it fits in `max_bytes`, otherwise a head/tail window.
+            max_bytes: Byte budget for the whole-file view. The cut happens on the
+                   target, so a 10GB log costs the same transfer as a 10KB one.
         """
         safe_path = shlex.quote(path)
         if lines is None:
-            # LONG CONTEXT SHOWCASE: Read entire file for Gemini 3
-            return f"cat {safe_path}"
-        return f"tail -n {lines} {safe_path}"
+            half = max_bytes // 2
+            # Totals first so the model knows what the window leaves out. Counting lines
+            # means reading the whole file, so a windowed (large) file reports bytes only;
+            # the window edges are cut back to whole lines.
+            return (
+                f"f={safe_path}; "
+                f"size=$(stat -c %s -- \"$f\") || exit 1; "
+                f"if [ \"$size\" -le {max_bytes} ]; then "
+                f"echo \"[FILE] $f: $size bytes, $(wc -l < \"$f\") lines\"; cat -- \"$f\"; "
+                f"else export LC_ALL=C; "
+                f"h=$(head -c {half} -- \"$f\" | sed '$d'); t=$(tail -c {half} -- \"$f\" | sed 1d); "
+                f"echo \"[FILE] $f: $size bytes (head/tail window)\"; printf '%s\\n' \"$h\"; "
+                f"echo \"[... TRIMMED $((size - ${{#h}} - ${{#t}} - 2)) bytes ...]\"; "
+                f"printf '%s\\n' \"$t\"; fi"
+            )
+        return f"tail -n {int(lines)} {safe_path}"
 
     def get_grep_command(self, pattern: str, path: str) -> str:
         """Smart grep with context (2 lines before/after)."""
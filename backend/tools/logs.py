@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import shlex
+
+LOGKIT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts", "logkit.py")
+SIGNATURES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "knowledge", "log_signatures.json")
+
+
+def load_signatures(path: str = None) -> dict:
+    """The versioned log signature library (SYSMIND_LOG_SIGNATURES_PATH overrides the bundled one)."""
+    with open(path or os.environ.get("SYSMIND_LOG_SIGNATURES_PATH", SIGNATURES_PATH), encoding="utf-8") as f:
+        library = json.load(f)
+    ids = [sig["id"] for sig in library.get("signatures", [])]
+    if len(ids) != len(set(ids)):
+        raise ValueError("Duplicate signature ids in the log signature library.")
+    return library
+
+
+class LogTools:
+    """
+    Titanium Log Forensics: ships scripts/logkit.py to the target once
+    (content-addressed path, so an updated kit never runs stale code) and
+    builds the commands that run its subcommands there.
+    """
+    def __init__(self, source: str = None):
+        if source is None:
+            with open(LOGKIT_PATH, encoding="utf-8") as f:
+                source = f.read()
+        self.source = source
+        self.remote_path = f"/tmp/.sysmind/logkit-{hashlib.sha256(source.encode()).hexdigest()[:12]}.py"
+
+    def install_command(self) -> str:
+        """Writes the kit to the target atomically (one round trip, no scp/cp channel needed)."""
+        path = shlex.quote(self.remote_path)
+        return (f"mkdir -p /tmp/.sysmind && printf %s {shlex.quote(self.source)} > {path}.$$ "
+                f"&& mv -f {path}.$$ {path} && python3 -c 'import sys; print(sys.version.split()[0])'")
+
+    def command(self, subcommand: str, *args, **options) -> str:
+        """'python3 <kit> <subcommand> args --option value' (None options are left out)."""
+        parts = ["python3", shlex.quote(self.remote_path), subcommand] + [shlex.quote(str(a)) for a in args]
+        for key, value in options.items():
+            if value is not None:
+                parts += [f"--{key.replace('_', '-')}", shlex.quote(str(value))]
+        return " ".join(parts)
+
+    def query_command(self, path: str, since: str = None, until: str = None, level: str = None,
+                      pattern: str = None, limit: int = 100, newest: bool = False) -> str:
+        """Time/level (and optional pattern) filtered lines through the target-side sparse index."""
+        command = self.command("query", path, since=since, until=until, level=level, pattern=pattern, limit=int(limit))
+        return command + " --newest" if newest else command
+
+    def summarize_command(self, path: str, since: str = None, until: str = None, top: int = 15) -> str:
+        """Drain-style template summary of a log (or a time window of it)."""
+        return self.command("summarize", path, since=since, until=until, top=int(top))
+
+    def around_command(self, path: str, timestamp: str, window: float = 60, limit: int = 100) -> str:
+        """Lines within +/-window seconds of a timestamp, across the log's rotation set."""
+        return self.command("around", path, timestamp, window=float(window), limit=int(limit))
+
+    def tail_command(self, path: str, cursor: dict = None, max_bytes: int = 16384) -> str:
+        """Lines appended since `cursor` ({"dev", "ino", "offset"}); the first read starts near the end."""
+        position = f"{cursor['dev']}:{cursor['ino']}:{cursor['offset']}" if cursor else None
+        return self.command("tail", path, cursor=position, max_bytes=int(max_bytes))
+
+    def search_command(self, pattern: str, path: str, ignore_case: bool = False, limit: int = 100) -> str:
+        """Pattern over a log's rotation set (or a glob), compressed files included, in one round trip."""
+        command = self.command("search", path, pattern, limit=int(limit))
+        return command + " --ignore-case" if ignore_case else command
+
+    def signatures_command(self, path: str, library: dict, only: list = None) -> str:
+        """Every signature of the library over a log (or a glob) in one pass on the target."""
+        return self.command("signatures", path, library=json.dumps(library, separators=(",", ":")),
+                            only=",".join(only) if only else None)
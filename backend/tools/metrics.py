@@ -0,0 +1,74 @@
+"""
+Metrics Sampling Tools for SysMind
+Builds the on-target sampling loop over /proc and parses its output into
+CPU / memory / block IO time series for numeric anomaly detection.
+"""
+from ..strategies.base import OSStrategy
+
+MAX_SAMPLES = 120
+MAX_WINDOW_S = 60.0
+
+
+class MetricsTools:
+    def __init__(self, strategy: OSStrategy):
+        self.strategy = strategy
+
+    @staticmethod
+    def clamp(samples: int, interval: float) -> tuple:
+        """Keeps the sampling window bounded (the model chooses these numbers)."""
+        samples = max(3, min(int(samples), MAX_SAMPLES))
+        interval = max(0.1, min(float(interval), MAX_WINDOW_S / samples))
+        return samples, interval
+
+    def sample_series_command(self, samples: int = 20, interval: float = 0.5) -> str:
+        """
+        One round trip: the loop runs on the target, so the sampling interval is not
+        stretched by exec latency. One line per sample (~120 bytes):
+        'S <epoch> cpu <jiffies...> M <MemTotal> <MemAvailable> IO <read> <written>'.
+        """
+        samples, interval = self.clamp(samples, interval)
+        return (
+            f"for i in $(seq {samples}); do "
+            "echo \"S $(date +%s.%N) $(head -n 1 /proc/stat) "
+            "M $(awk '/^MemTotal:/{t=$2} /^MemAvailable:/{a=$2} END{print t+0, a+0}' /proc/meminfo) "
+            "IO $(awk '{r+=$6; w+=$10} END{print r+0, w+0}' /proc/diskstats)\"; "
+            f"sleep {interval:g}; done"
+        )
+
+    @staticmethod
+    def parse_series(text: str) -> dict:
+        """
+        Sampling loop output -> {"t": [...], "cpu": [...], "mem": [...], "io": [...]}.
+        cpu (%) and io (KB/s, sectors are 512 bytes) are deltas between samples and use
+        the later timestamp; mem (% of MemTotal in use) is absolute.
+        """
+        raw = []
+        for line in (text or "").splitlines():
+            fields = line.split()
+            if len(fields) < 3 or fields[0] != "S" or "M" not in fields or "IO" not in fields:
+                continue
+            try:
+                m, io = fields.index("M"), fields.index("IO")
+                # Busybox date prints '%N' literally: keep the whole-second part
+                seconds, _, fraction = fields[1].partition(".")
+                counters = [int(v) for v in fields[3:m]]
+                raw.append({
+                    "t": float(f"{seconds}.{fraction if fraction.isdigit() else 0}"),
+                    "idle": counters[3] + (counters[4] if len(counters) > 4 else 0),
+                    "total": sum(counters[:8]),
+                    "mem_total": int(fields[m + 1]),
+                    "mem_available": int(fields[m + 2]),
+                    "sectors": int(float(fields[io + 1])) + int(float(fields[io + 2])),
+                })
+            except (IndexError, ValueError):
+                continue
+
+        series = {"t": [], "cpu": [], "mem": [], "io": []}
+        for prev, cur in zip(raw, raw[1:]):
+            dt = cur["t"] - prev["t"]
+            total = cur["total"] - prev["total"]
+            series["t"].append(cur["t"])
+            series["cpu"].append(100.0 * (1 - (cur["idle"] - prev["idle"]) / total) if total > 0 else 0.0)
+            series["mem"].append(100.0 * (1 - cur["mem_available"] / cur["mem_total"]) if cur["mem_total"] else 0.0)
+            series["io"].append((cur["sectors"] - prev["sectors"]) * 512 / 1024 / dt if dt > 0 else 0.0)
+        return series
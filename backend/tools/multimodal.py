@@ -1,22 +1,172 @@
 """
 Multimodal Analysis Tools for SysMind
 Enables visual analysis of monitoring dashboards and system screenshots.
+Screenshots are cropped to their content, downsampled to the model's tile
+grid and recompressed before upload; analyses are cached by image SHA-256.
 """
+import hashlib
+import io
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from PIL import Image, ImageChops
+except ImportError:
+    Image = None
+
+# Gemini bills images per 768x768 tile (a small image is a single tile)
+TILE_SIDE = 768
+TOKENS_PER_TILE = 258
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+
+
+def detect_mime(data: bytes) -> str:
+    """MIME type from the file's magic bytes (extensions lie), or None if unrecognised."""
+    for magic, mime in _SIGNATURES:
+        if data.startswith(magic):
+            return mime
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    return math.ceil(width / TILE_SIDE) * math.ceil(height / TILE_SIDE) * TOKENS_PER_TILE
+
+
+def _trim(image, tolerance: int = 16, margin: int = 4):
+    """Crops uniform borders (the colour of the top-left pixel) around the dashboard content."""
+    background = Image.new(image.mode, image.size, image.getpixel((0, 0)))
+    mask = ImageChops.difference(image, background).convert("L").point(lambda p: 255 if p > tolerance else 0)
+    box = mask.getbbox()
+    if not box:
+        return image
+    left, top, right, bottom = box
+    box = (max(0, left - margin), max(0, top - margin), min(image.width, right + margin), min(image.height, bottom + margin))
+    return image.crop(box) if box != (0, 0, image.width, image.height) else image
+
+
+def image_digest(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def prepare_image(raw: bytes, max_side: int = 1024, jpeg_quality: int = 80) -> dict:
+    """
+    Returns the smallest upload of a screenshot that keeps it legible:
+    {data, mime, width, height, original_bytes, bytes, encode_s}.
+    Without Pillow the original bytes are sent with their detected MIME type.
+    """
+    started = time.time()
+    mime = detect_mime(raw)
+    result = {"data": raw, "mime": mime, "width": None, "height": None, "original_bytes": len(raw)}
+    if Image is None:
+        if mime is None:
+            raise ValueError("Unrecognised image format")
+        result.update(bytes=len(raw), encode_s=time.time() - started)
+        return result
+
+    with Image.open(io.BytesIO(raw)) as source:
+        source.load()
+        mime = mime or Image.MIME.get(source.format)
+        image = source.convert("RGB")
+    original_size = image.size
+    image = _trim(image)
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=2.0)
+
+    candidates = []
+    if image.size == original_size and mime in ("image/png", "image/jpeg", "image/webp"):
+        candidates.append((raw, mime))
+    # Dashboards are flat colours: a palette PNG is usually smallest; JPEG wins on gradients
+    png = io.BytesIO()
+    image.quantize(colors=256, method=Image.Quantize.FASTOCTREE).save(png, format="PNG")
+    candidates.append((png.getvalue(), "image/png"))
+    jpeg = io.BytesIO()
+    image.save(jpeg, format="JPEG", quality=jpeg_quality)
+    candidates.append((jpeg.getvalue(), "image/jpeg"))
+
+    data, mime = min(candidates, key=lambda c: len(c[0]))
+    result.update(data=data, mime=mime, width=image.width, height=image.height,
+                  bytes=len(data), encode_s=time.time() - started)
+    return result
+
+
+class VisionCache:
+    """
+    In-process LRU of vision analyses keyed by image SHA-256, with TTL eviction.
+    Shared by every agent in the process, so a fleet pays once per screenshot.
+    """
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                    self.stats["evicted"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evicted"] += 1
+
+
+_shared_vision_cache = None
+_shared_lock = threading.Lock()
+
+
+def vision_cache_from_env():
+    """Process-wide vision cache (SYSMIND_VISION_CACHE_TTL seconds, 0 disables)."""
+    global _shared_vision_cache
+    ttl = float(os.environ.get("SYSMIND_VISION_CACHE_TTL", "3600"))
+    if ttl <= 0:
+        return None
+    with _shared_lock:
+        if _shared_vision_cache is None:
+            _shared_vision_cache = VisionCache(ttl=ttl, max_entries=int(os.environ.get("SYSMIND_VISION_CACHE_MAX_ENTRIES", "256")))
+        return _shared_vision_cache
+
 
 class MultimodalTools:
     """
     Gemini 3 Multimodal Capabilities - Dashboard & Screenshot Analysis.
     This showcases Gemini's unique strength in visual understanding.
     """
-    
+
     def analyze_dashboard_command(self, image_path: str) -> str:
         """
         Returns a marker for multimodal image analysis.
         The actual image processing happens in the agent's run_tool method.
-        
+
         Args:
             image_path: Path to dashboard screenshot (PNG/JPG)
-            
+
         Returns:
             Marker string for multimodal processing
         """
@@ -1,3 +1,42 @@
+import socket
+
+# /proc/net/tcp 'st' column (include/net/tcp_states.h)
+TCP_STATES = {
+    "01": "ESTABLISHED", "02": "SYN_SENT", "03": "SYN_RECV", "04": "FIN_WAIT1", "05": "FIN_WAIT2",
+    "06": "TIME_WAIT", "07": "CLOSE", "08": "CLOSE_WAIT", "09": "LAST_ACK", "0A": "LISTEN", "0B": "CLOSING",
+}
+SOCKET_STATES = frozenset(TCP_STATES.values()) | {"ALL"}
+
+# Socket table and fd links -> "S proto local remote st inode pids comm" (owners joined on the target)
+_SOCKET_AWK = (
+    "awk -v port=\"$PORT\" -v st=\"$ST\" -v ust=\"$UST\" -v cap=\"$CAP\" '"
+    "$0==\"---\"{fds=1; next} "
+    "!fds{split($3,l,\":\"); if (port!=\"\" && l[2]!=port) next; "
+    "want=($1 ~ /^udp/)?ust:st; if (want!=\"\" && $5!=want) next; "
+    "n++; row[n]=$1\" \"$3\" \"$4\" \"$5\" \"$11; if ($11!=\"0\") ino[$11]=1; next} "
+    "/^\\/proc\\//{split($0,d,\"/\"); pid=d[3]; next} "
+    "/socket:\\[/{i=$NF; gsub(/[^0-9]/,\"\",i); "
+    "if ((i in ino) && !((i,pid) in seen)) {seen[i,pid]=1; own[i]=own[i] (own[i]==\"\"?\"\":\",\") pid}} "
+    "END{for (k=1; k<=n && k<=cap; k++) {split(row[k],r,\" \"); o=own[r[5]]; c=\"-\"; "
+    "if (o!=\"\") {split(o,p,\",\"); f=\"/proc/\" p[1] \"/comm\"; if ((getline c < f) <= 0) c=\"?\"; close(f)} else o=\"-\"; "
+    "print \"S\", row[k], o, c} print \"N\", n+0}'"
+)
+
+
+def _decode_address(proto: str, value: str) -> str:
+    """'0100007F:1F90' -> '127.0.0.1:8080' (kernel prints each 32-bit word in host byte order)."""
+    host, _, port = value.partition(":")
+    try:
+        raw = b"".join(bytes.fromhex(host[i:i + 8])[::-1] for i in range(0, len(host), 8))
+        address = socket.inet_ntop(socket.AF_INET6 if proto.endswith("6") else socket.AF_INET, raw)
+        port = int(port, 16)
+    except (ValueError, OSError):
+        return value
+    if ":" in address:
+        address = f"[{address}]"
+    return f"{address}:{port or '*'}"
+
+
 class NetworkTools:
     """
     Network Diagnostics (The Titanium Port Scanner).
@@ -5,3 +44,45 @@ class NetworkTools:
     def get_active_ports_command(self) -> str:
         """Lists listening ports (TCP/UDP) to detect rogue services."""
         return "ss -tuln"
+
+    def inspect_sockets_command(self, port: int = None, state: str = "LISTEN", limit: int = 50) -> str:
+        """
+        Port-to-PID map in one round trip: /proc/net/{tcp,udp}{,6} filtered by
+        port/state, joined on the target with a socket-inode index built from
+        /proc/*/fd (one `ls -l`, no per-fd processes).
+        Output: 'S proto local remote st inode pids comm' rows, then 'N <matching>'.
+        """
+        port_hex = "" if port is None else f"{int(port):04X}"
+        codes = {name: code for code, name in TCP_STATES.items()}
+        tcp_state = "" if state == "ALL" else codes[state]
+        # ss shows bound UDP sockets as UNCONN (07) and counts them as listening
+        udp_state = {"": "", "0A": "07"}.get(tcp_state, tcp_state)
+        limit = max(1, min(int(limit), 200))
+        return (
+            f"PORT={port_hex}; ST={tcp_state}; UST={udp_state}; CAP={limit}; "
+            "{ for f in tcp tcp6 udp udp6; do [ -r /proc/net/$f ] && sed \"1d;s/^ */$f /\" /proc/net/$f; done; "
+            "echo ---; ls -l /proc/[0-9]*/fd 2>/dev/null; } | "
+            f"{_SOCKET_AWK}"
+        )
+
+    @staticmethod
+    def format_sockets(output: str, port: int = None, state: str = "LISTEN") -> str:
+        """Socket rows -> terse table (addresses decoded, one line per socket)."""
+        rows, total = [], None
+        for line in (output or "").splitlines():
+            fields = line.split()
+            if len(fields) == 2 and fields[0] == "N" and fields[1].isdigit():
+                total = int(fields[1])
+            elif len(fields) >= 8 and fields[0] == "S":
+                proto, local, remote, st, _, pids, comm = fields[1:8]
+                name = TCP_STATES.get(st, st) if proto.startswith("tcp") else {"07": "UNCONN", "01": "ESTAB"}.get(st, st)
+                owner = "-" if pids == "-" else f"{pids}/{comm}"
+                rows.append(f"{proto} {_decode_address(proto, local)} {_decode_address(proto, remote)} {name} {owner}")
+        if total is None:
+            return None
+        scope = [f"state {state}"] + ([f"port {port}"] if port is not None else [])
+        shown = f", showing {len(rows)}" if len(rows) < total else ""
+        header = f"[SOCKETS] {total} matching ({', '.join(scope)}){shown}"
+        if not rows:
+            return header + "\nNo matching sockets."
+        return "\n".join([header, "PROTO LOCAL REMOTE STATE OWNER(PID/COMM)"] + rows)
@@ -1,6 +1,15 @@
 from typing import List, Dict
 from ..strategies.base import OSStrategy
 
+SNAPSHOT_SORT_KEYS = {"cpu": 2, "rss": 3, "fds": 4}
+
+# One /proc/<pid>/stat line -> "pid ticks rss_pages threads state comm" (comm may contain spaces and ')')
+_STAT_AWK = (
+    "awk '{s=$0; o=index(s,\"(\"); r=0; while ((i=index(substr(s,r+1),\")\"))>0) r+=i; "
+    "c=substr(s,o+1,r-o-1); gsub(/[ \\t]/,\"_\",c); split(substr(s,r+2),f,\" \"); "
+    "print $1, f[12]+f[13], f[22], f[18], f[1], c}'"
+)
+
 class ProcessTools:
     def __init__(self, strategy: OSStrategy):
         self.strategy = strategy
@@ -13,6 +22,50 @@ class ProcessTools:
         # Changed to %cpu because the demo involves a CPU stress test!
         return "ps aux --sort=-%cpu | head -n 15"
 
+    def snapshot_command(self, sort_by: str = "cpu", top: int = 10, interval: float = 0.5) -> str:
+        """
+        Two /proc snapshots `interval` apart in one round trip: CPU% is the real
+        tick delta over the interval (ps %cpu is a lifetime average), plus RSS,
+        open FDs and threads. Only the top-K rows leave the target.
+        Output: 'N <procs> <seconds>' then 'pid cpu rss_mb fds threads state comm cmdline'.
+        """
+        column = SNAPSHOT_SORT_KEYS[sort_by]
+        top = max(1, min(int(top), 50))
+        interval = max(0.1, min(float(interval), 5.0))
+        # cat keeps going when a process exits mid-glob (mawk would abort on the missing file)
+        snap = f"cat /proc/[0-9]*/stat 2>/dev/null | {_STAT_AWK}"
+        return (
+            f"A=$({snap}); t1=$(date +%s.%N); sleep {interval:g}; B=$({snap}); t2=$(date +%s.%N); "
+            "{ echo \"T $t1 $t2 $(getconf CLK_TCK) $(getconf PAGESIZE)\"; "
+            "printf '%s\\n' \"$A\" | sed 's/^/A /'; printf '%s\\n' \"$B\" | sed 's/^/B /'; "
+            "for d in /proc/[0-9]*; do set -- $d/fd/*; [ -e \"$1\" ] && echo \"F ${d#/proc/} $#\"; done 2>/dev/null; } | "
+            f"awk -v iv={interval:g} '"
+            "$1==\"T\"{dt=$3-$2; if (dt<=0) dt=iv; hz=$4; pg=$5; next} "
+            "$1==\"A\"{a[$2]=$3; next} "
+            "$1==\"B\"{n++; p=$2; c[p]=(p in a)?($3-a[p])*100/hz/dt:0; m[p]=$4*pg/1048576; th[p]=$5; st[p]=$6; cm[p]=$7; next} "
+            "$1==\"F\"{fd[$2]=$3} "
+            "END{for (p in c) printf \"%s %.1f %.1f %d %d %s %s\\n\", p, c[p], m[p], fd[p], th[p], st[p], cm[p]; "
+            "printf \"N %d %.2f\\n\", n, dt}' | "
+            f"sort -k{column},{column}nr | awk -v k={top} '$1==\"N\"{{h=$0; next}} c<k{{c++; print}} END{{print h}}' | "
+            "while read -r pid rest; do if [ \"$pid\" = N ]; then echo \"N $rest\"; "
+            "else echo \"$pid $rest $(tr '\\0\\n' '  ' < /proc/$pid/cmdline 2>/dev/null | head -c 100)\"; fi; done"
+        )
+
+    @staticmethod
+    def format_snapshot(output: str, sort_by: str = "cpu") -> str:
+        """Snapshot output -> terse table (one header, one row per process)."""
+        rows, header = [], None
+        for line in (output or "").splitlines():
+            fields = line.split(None, 7)
+            if fields and fields[0] == "N" and len(fields) >= 3:
+                header = f"[PROCESS SNAPSHOT] {fields[1]} procs, CPU measured over {fields[2]}s, top {{}} by {sort_by}"
+            elif len(fields) >= 7 and fields[0].isdigit():
+                command = fields[7].strip() if len(fields) > 7 and fields[7].strip() else f"[{fields[6]}]"
+                rows.append(f"{fields[0]} {fields[1]} {fields[2]} {fields[3]} {fields[4]} {fields[5]} {command}")
+        if header is None:
+            return None
+        return "\n".join([header.format(len(rows)), "PID CPU% RSS_MB FDS THR S COMMAND"] + rows)
+
     def kill_process_command(self, pid: int, force: bool = False) -> str:
         """
         Returns command to kill a process.
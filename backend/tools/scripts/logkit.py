@@ -0,0 +1,1060 @@
+#!/usr/bin/env python3
+"""
+SysMind Log Kit.
+Runs ON the target (python3 standard library only); the agent installs it once
+per target and calls its subcommands in a single round trip each.
+
+  query   Time/level filtered reads through a sparse, persistent byte-offset
+          index (one entry per ~128KB block: offset, line number, first/last
+          timestamp, level mask). The index grows incrementally with the file
+          and is rebuilt on rotation or truncation, so a query seeks straight
+          to the matching blocks of a multi-GB log.
+  summarize
+          Single-pass Drain-style template mining: the log (or a time window)
+          becomes per-template counts, first/last timestamps and level/service
+          histograms, with rare and ERROR+ lines surfaced verbatim.
+  around  Lines within +/-N seconds of a timestamp across the rotation set:
+          O(log n) seeks per plain file (resynced on line boundaries),
+          compressed rotations streamed only when their span overlaps.
+  search  One pattern across a rotation set or glob (.gz/.bz2/.xz/.zst
+          decompressed on the fly), files searched in parallel processes,
+          hits merged in timestamp order under a total cap.
+  signatures
+          A library of literal and regex signatures in one pass: literals
+          through one Aho-Corasick automaton, regexes as one combined pattern.
+  tail    Only the bytes appended since a (dev, inode, offset) cursor,
+          following rotation and truncation.
+"""
+import argparse
+import calendar
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import time
+
+BLOCK = 128 * 1024
+INDEX_VERSION = 1
+INDEX_DIR = os.environ.get("SYSMIND_LOGKIT_DIR", "/tmp/.sysmind/logidx")
+MAX_LINE = 500
+
+LEVELS = ("TRACE", "DEBUG", "INFO", "NOTICE", "WARNING", "ERROR", "CRITICAL", "FATAL")
+_RANK = {name: i for i, name in enumerate(LEVELS)}
+_RANK.update({"WARN": 4, "ERR": 5, "SEVERE": 5, "CRIT": 6, "ALERT": 6, "EMERG": 7, "PANIC": 7})
+_LEVEL_RE = re.compile(rb"\b(TRACE|DEBUG|INFO|NOTICE|WARNING|WARN|ERROR|ERR|SEVERE|CRITICAL|CRIT|ALERT|FATAL|EMERG|PANIC)\b", re.I)
+
+_ISO_RE = re.compile(rb"(\d{4})-(\d\d)-(\d\d)[T ](\d\d):(\d\d):(\d\d)(?:[.,](\d{1,9}))?")
+_SYSLOG_RE = re.compile(rb"\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) +(\d{1,2}) (\d\d):(\d\d):(\d\d)")
+_MONTHS = {m: i for i, m in enumerate(
+    (b"Jan", b"Feb", b"Mar", b"Apr", b"May", b"Jun", b"Jul", b"Aug", b"Sep", b"Oct", b"Nov", b"Dec"), start=1)}
+_HEAD = 64  # Timestamps are searched for near the start of a line only
+
+
+class LogKitError(Exception):
+    pass
+
+
+def line_time(line: bytes, year: int):
+    """Epoch seconds of a line's leading timestamp (naive, read as UTC), or None."""
+    head = line[:_HEAD]
+    m = _ISO_RE.search(head)
+    if m:
+        y, mo, d, h, mi, s, frac = m.groups()
+        t = calendar.timegm((int(y), int(mo), int(d), int(h), int(mi), int(s)))
+        return t + (int(frac) / 10 ** len(frac) if frac else 0.0)
+    m = _SYSLOG_RE.search(head)
+    if m:
+        mon, d, h, mi, s = m.groups()
+        return float(calendar.timegm((year, _MONTHS[mon], int(d), int(h), int(mi), int(s))))
+    return None
+
+
+def line_level(line: bytes):
+    """Severity rank of the first level keyword near the start of a line, or None."""
+    m = _LEVEL_RE.search(line, 0, 160)
+    return _RANK[m.group(1).upper().decode()] if m else None
+
+
+def format_time(t) -> str:
+    return "-" if t is None else time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(t))
+
+
+def parse_when(text: str, ref: float = None):
+    """
+    'YYYY-MM-DD HH:MM[:SS]' (or ISO 'T'), or a bare 'HH:MM[:SS]' on the day of
+    `ref` (the log's newest timestamp; the day before if that lands after it).
+    """
+    if not text:
+        return None
+    text = text.strip()
+    m = _ISO_RE.fullmatch((text + ":00").encode()) or _ISO_RE.fullmatch(text.encode())
+    if m:
+        return line_time(m.group(0), 1970)
+    m = re.fullmatch(r"(\d{1,2}):(\d\d)(?::(\d\d)(?:\.(\d+))?)?", text)
+    if not m:
+        raise LogKitError(f"Unrecognized time '{text}' (use 'YYYY-MM-DD HH:MM[:SS]' or 'HH:MM[:SS]').")
+    h, mi, s, frac = m.groups()
+    seconds = int(h) * 3600 + int(mi) * 60 + int(s or 0) + (int(frac) / 10 ** len(frac) if frac else 0.0)
+    base = ref if ref is not None else time.time()
+    day = base - base % 86400
+    t = day + seconds
+    return t - 86400 if t > base + 60 else t
+
+
+def parse_level(text: str):
+    if not text:
+        return None
+    rank = _RANK.get(text.strip().upper())
+    if rank is None:
+        raise LogKitError(f"Unknown level '{text}' (use one of {', '.join(LEVELS)}).")
+    return rank
+
+
+# --- Sparse index ---
+
+def _index_path(path: str) -> str:
+    return os.path.join(INDEX_DIR, hashlib.sha1(os.path.abspath(path).encode()).hexdigest() + ".json")
+
+
+def _head_digest(f) -> str:
+    f.seek(0)
+    return hashlib.sha1(f.read(256)).hexdigest()
+
+
+def _edge_time(block: bytes, year: int, last: bool):
+    """First (or last) timestamp among the first (or last) few lines of a block."""
+    edge = block[-8192:] if last else block[:8192]
+    lines = edge.rstrip(b"\n").split(b"\n")
+    if len(edge) < len(block):
+        lines = lines[1:] if last else lines[:-1]  # Drop the line cut by the slice
+    for line in (reversed(lines[-32:]) if last else lines[:32]):
+        t = line_time(line, year)
+        if t is not None:
+            return t
+    return None
+
+
+# Shortest spelling per level (ERR also finds ERROR, WARN finds WARNING, CRIT finds CRITICAL)
+_MASK_WORDS = [(1 << _RANK[w], w.encode()) for w in
+               ("TRACE", "DEBUG", "INFO", "NOTICE", "WARN", "ERR", "SEVERE", "CRIT", "ALERT", "FATAL", "EMERG", "PANIC")]
+
+
+def _level_mask(block: bytes) -> int:
+    """Levels that may occur in a block (substring checks: a superset is fine for a prefilter)."""
+    block = block.upper()
+    mask = 0
+    for bit, word in _MASK_WORDS:
+        if not mask & bit and word in block:
+            mask |= bit
+    return mask
+
+
+def _empty_index(st, head: str) -> dict:
+    return {"version": INDEX_VERSION, "dev": st.st_dev, "ino": st.st_ino, "head": head,
+            "year": time.gmtime(st.st_mtime).tm_year, "end": 0, "lines": 0, "blocks": []}
+
+
+def load_index(path: str):
+    """(index, bytes newly indexed): reuses the stored index, extends it, or rebuilds after rotation/truncation."""
+    try:
+        f = open(path, "rb")
+    except OSError as e:
+        raise LogKitError(f"Cannot open {path}: {e.strerror}.")
+    with f:
+        st = os.fstat(f.fileno())
+        head = _head_digest(f)
+        idx = None
+        try:
+            with open(_index_path(path), encoding="utf-8") as stored:
+                idx = json.load(stored)
+        except (OSError, ValueError):
+            pass
+        if (idx is None or idx.get("version") != INDEX_VERSION or idx["dev"] != st.st_dev or idx["ino"] != st.st_ino
+                or st.st_size < idx["end"] or (idx["end"] and idx["head"] != head)):
+            idx = _empty_index(st, head)
+        start = idx["end"]
+        if st.st_size > idx["end"]:
+            _extend(f, idx)
+            idx["head"] = head
+            _save_index(path, idx)
+        return idx, idx["end"] - start
+
+
+def _extend(f, idx: dict):
+    blocks, year = idx["blocks"], idx["year"]
+    # A short trailing block is re-read so appends do not leave a trail of tiny blocks
+    if blocks and idx["end"] - blocks[-1][0] < BLOCK // 2:
+        offset, lines = blocks[-1][0], blocks[-1][1]
+        blocks.pop()
+    else:
+        offset, lines = idx["end"], idx["lines"]
+    carry = blocks[-1][3] if blocks else None
+    f.seek(offset)
+    while True:
+        chunk = f.read(BLOCK)
+        if not chunk:
+            break
+        cut = chunk.rfind(b"\n")
+        while cut < 0:
+            more = f.read(BLOCK)  # One line longer than a block
+            if not more:
+                break
+            chunk += more
+            cut = chunk.rfind(b"\n")
+        if cut < 0:
+            break  # Unterminated last line: indexed once the writer finishes it
+        block = chunk[:cut + 1]
+        t_first = _edge_time(block, year, last=False)
+        t_last = _edge_time(block, year, last=True)
+        if t_first is None:
+            t_first = t_last = carry
+        blocks.append([offset, lines, t_first, t_last, _level_mask(block)])
+        carry = t_last
+        offset += len(block)
+        lines += block.count(b"\n")
+        f.seek(offset)
+    idx["end"], idx["lines"] = offset, lines
+
+
+def _save_index(path: str, idx: dict):
+    try:
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        target = _index_path(path)
+        tmp = f"{target}.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(idx, f, separators=(",", ":"))
+        os.replace(tmp, target)
+    except OSError:
+        pass  # Read-only /tmp: the index is rebuilt per query, results are the same
+
+
+def newest_time(idx: dict):
+    for block in reversed(idx["blocks"]):
+        if block[3] is not None:
+            return block[3]
+    return None
+
+
+def scan(path: str, idx: dict, lo: float = None, hi: float = None, min_rank: int = None, stats: dict = None):
+    """
+    Yields (line number, line, time, level rank) for lines inside the filters,
+    reading only the index blocks that can match. Continuation lines (stack
+    traces) inherit the time and level of their entry.
+    """
+    blocks = idx["blocks"]
+    wanted_mask = 0 if min_rank is None else ~((1 << min_rank) - 1)
+    with open(path, "rb") as f:
+        for i, (offset, lineno, t_first, t_last, mask) in enumerate(blocks):
+            if lo is not None and (t_last is None or t_last < lo):
+                continue
+            if hi is not None and (t_first is None or t_first > hi):
+                continue
+            if wanted_mask and not mask & wanted_mask:
+                continue
+            if stats is not None:
+                stats["scanned"] = stats.get("scanned", 0) + 1
+            end = blocks[i + 1][0] if i + 1 < len(blocks) else idx["end"]
+            f.seek(offset)
+            cur_t, cur_rank = (blocks[i - 1][3] if i else None), None
+            for line in f.read(end - offset).split(b"\n")[:-1]:
+                lineno += 1
+                t = line_time(line, idx["year"])
+                rank = line_level(line)
+                if t is not None:
+                    cur_t, cur_rank = t, rank
+                elif rank is not None:
+                    cur_rank = rank
+                if lo is not None and (cur_t is None or cur_t < lo):
+                    continue
+                if hi is not None and (cur_t is None or cur_t > hi):
+                    continue
+                if min_rank is not None and (cur_rank is None or cur_rank < min_rank):
+                    continue
+                yield lineno, line, cur_t, cur_rank
+
+
+def _window(idx: dict, since: str, until: str):
+    ref = newest_time(idx)
+    return parse_when(since, ref), parse_when(until, ref)
+
+
+def _describe_filters(lo, hi, min_rank=None, pattern=None) -> str:
+    filters = []
+    if min_rank is not None:
+        filters.append(f"level>={LEVELS[min_rank]}")
+    if lo is not None or hi is not None:
+        filters.append(f"{format_time(lo)} -> {format_time(hi)}")
+    if pattern:
+        filters.append(f"/{pattern}/")
+    return ", ".join(filters) or "no filters"
+
+
+def _index_line(idx: dict, added: int, stats: dict, started: float) -> str:
+    return (f"[INDEX] {len(idx['blocks'])} blocks over {idx['end'] / 1048576:.1f} MB, {idx['lines']} lines"
+            f" (+{added / 1048576:.1f} MB indexed), scanned {stats.get('scanned', 0)} blocks"
+            f" in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+def query(path: str, since: str = None, until: str = None, level: str = None, pattern: str = None, limit: int = 200,
+          newest: bool = False) -> str:
+    """Filtered lines through the index: the first `limit` matches, or the last ones with `newest` (like a tail)."""
+    import collections
+    started = time.perf_counter()
+    idx, added = load_index(path)
+    lo, hi = _window(idx, since, until)
+    min_rank = parse_level(level)
+    regex = re.compile(pattern.encode()) if pattern else None
+    matched, shown, stats = 0, collections.deque(maxlen=limit) if newest else [], {}
+    for lineno, line, _, _ in scan(path, idx, lo, hi, min_rank, stats):
+        if regex is not None and not regex.search(line):
+            continue
+        matched += 1
+        if newest or len(shown) < limit:
+            shown.append((lineno, line[:MAX_LINE]))
+    which = "last" if newest else "first"
+    header = (f"[LOG QUERY] {path}: {matched} matching lines ({_describe_filters(lo, hi, min_rank, pattern)})"
+              f"{f', showing {which} {len(shown)}' if matched > len(shown) else ''}")
+    return "\n".join([header, _index_line(idx, added, stats, started)]
+                     + [f"{lineno}:{line.decode('utf-8', 'replace')}" for lineno, line in shown])
+
+
+# --- Rotation sets and time-window reads ---
+
+_ROTATED_RE = re.compile(r"(?:\.\d+|-\d{8}(?:\d\d)?)(?:\.(?:gz|bz2|xz|zst))?")
+
+
+class _ProcessStream:
+    """Line iterator over a decompressor's stdout (killed on close)."""
+
+    def __init__(self, proc):
+        self.proc = proc
+
+    def __iter__(self):
+        return iter(self.proc.stdout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.proc.stdout.close()
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.wait()
+
+
+def open_stream(path: str):
+    """Binary line stream of a plain or compressed log (.zst through the zstd binary)."""
+    try:
+        if path.endswith(".gz"):
+            import gzip
+            return gzip.open(path, "rb")
+        if path.endswith(".bz2"):
+            import bz2
+            return bz2.open(path, "rb")
+        if path.endswith(".xz"):
+            import lzma
+            return lzma.open(path, "rb")
+        if path.endswith(".zst"):
+            import subprocess
+            try:
+                proc = subprocess.Popen(["zstd", "-dcq", "--", path], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            except OSError:
+                raise LogKitError(f"{path}: zstd is not installed on the target.")
+            return _ProcessStream(proc)
+        return open(path, "rb")
+    except OSError as e:
+        raise LogKitError(f"Cannot open {path}: {e.strerror}.")
+
+
+def rotation_set(path: str) -> list:
+    """The log and its rotations that exist (name.1, name.2.gz, name-20260112, ...)."""
+    directory, base = os.path.split(os.path.abspath(path))
+    try:
+        names = os.listdir(directory)
+    except OSError as e:
+        raise LogKitError(f"Cannot list {directory}: {e.strerror}.")
+    files = [os.path.join(directory, n) for n in names
+             if n == base or (n.startswith(base) and _ROTATED_RE.fullmatch(n[len(base):]))]
+    if not files:
+        raise LogKitError(f"No such log: {path}.")
+    return files
+
+
+def _year(path: str) -> int:
+    return time.gmtime(os.stat(path).st_mtime).tm_year
+
+
+def _first_time(path: str, year: int):
+    with open_stream(path) as f:
+        for i, line in enumerate(f):
+            t = line_time(line, year)
+            if t is not None or i >= 256:
+                return t
+    return None
+
+
+def _last_time(path: str, year: int):
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - 65536))
+        return _edge_time(f.read(), year, last=True)
+
+
+def _time_after(f, offset: int, size: int, year: int, probe: int = 65536):
+    """Time of the first timestamped line that starts after `offset` (resynced on a line boundary), or None."""
+    f.seek(offset)
+    if offset:
+        f.readline()
+    scanned = 0
+    while f.tell() < size and scanned <= probe:
+        line = f.readline()
+        t = line_time(line, year)
+        if t is not None:
+            return t
+        scanned += len(line)
+    return None
+
+
+def seek_time(f, size: int, target: float, year: int, stats: dict) -> int:
+    """Byte offset at or shortly before the first line stamped >= target (O(log n) seeks on a sorted log)."""
+    lo, hi = 0, size
+    while hi - lo > 4096:
+        mid = (lo + hi) // 2
+        stats["seeks"] += 1
+        t = _time_after(f, mid, size, year)
+        if t is not None and t < target:
+            lo = mid
+        else:
+            hi = mid
+    f.seek(lo)
+    if lo:
+        f.readline()
+    return lo
+
+
+def around(path: str, timestamp: str, window: float = 60, limit: int = 100) -> str:
+    """Lines within +/-window seconds of a timestamp across the rotation set, via binary search on plain files."""
+    started = time.perf_counter()
+    window = max(1.0, float(window))
+    files = []
+    for name in rotation_set(path):
+        year = _year(name)
+        first = _first_time(name, year)
+        if first is not None:
+            files.append((first, name, year))
+    if not files:
+        raise LogKitError(f"No timestamped lines in {path} or its rotations.")
+    files.sort()
+    newest = files[-1]
+    ref = _last_time(newest[1], newest[2]) if not newest[1].endswith((".gz", ".bz2", ".xz", ".zst")) else newest[0]
+    anchor = parse_when(timestamp, ref)
+    lo_t, hi_t = anchor - window, anchor + window
+
+    keep = max(1, int(limit) // 2)
+    before, after = [], []
+    stats, used, total, more = {"seeks": 0}, [], 0, False
+    for i, (first, name, year) in enumerate(files):
+        # Rotations are chronological: a file ends where the next one starts
+        if first > hi_t or (i + 1 < len(files) and files[i + 1][0] < lo_t):
+            continue
+        used.append(os.path.basename(name))
+        with open_stream(name) as f:
+            if isinstance(f, io.BufferedReader):  # Plain file: binary search; compressed: streamed
+                seek_time(f, os.fstat(f.fileno()).st_size, lo_t, year, stats)
+            cur = None
+            for line in f:
+                t = line_time(line, year)
+                if t is not None:
+                    cur = t
+                if cur is None or cur < lo_t:
+                    continue
+                if cur > hi_t or len(after) >= keep:
+                    more = more or cur <= hi_t
+                    break
+                total += 1
+                entry = (cur, name, line.rstrip(b"\r\n"))
+                if cur < anchor:
+                    before.append(entry)
+                    if len(before) > keep:
+                        before.pop(0)
+                        more = True
+                else:
+                    after.append(entry)
+        if len(after) >= keep:
+            break
+
+    elapsed = (time.perf_counter() - started) * 1000
+    header = (f"[LOGS AROUND] {format_time(anchor)} +/-{window:g}s: {len(before) + len(after)} lines"
+              f"{' (window holds more; nearest shown)' if more else ''} from {len(used)} file(s)"
+              f" ({', '.join(used) or '-'}), {stats['seeks']} seeks, {elapsed:.0f} ms")
+    if not before and not after:
+        return (f"{header}\nNo lines in the window. Files cover {format_time(files[0][0])} -> {format_time(ref)}"
+                f" ({', '.join(os.path.basename(f[1]) for f in files)}).")
+    lines, current = [header], None
+    for t, name, line in before + after:
+        if name != current:
+            lines.append(f"--- {name}")
+            current = name
+        lines.append(f"[{t - anchor:+.1f}s] {line[:MAX_LINE].decode('utf-8', 'replace')}")
+    return "\n".join(lines)
+
+
+# --- Parallel search over rotation sets ---
+
+_CHUNK = 1 << 20
+
+
+def expand_paths(path: str) -> list:
+    """A glob (quoted, expanded here) or a log plus its rotations."""
+    if any(c in path for c in "*?["):
+        import glob
+        files = sorted(p for p in glob.glob(path) if os.path.isfile(p))
+        if not files:
+            raise LogKitError(f"No files match {path}.")
+        return files
+    return sorted(rotation_set(path))
+
+
+def _chunks(stream):
+    """~1MB blocks of whole lines from any binary stream."""
+    rest = b""
+    while True:
+        data = stream.read(_CHUNK)
+        if not data:
+            if rest:
+                yield rest if rest.endswith(b"\n") else rest + b"\n"
+            return
+        data = rest + data
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            rest = data
+            continue
+        rest = data[cut + 1:]
+        yield data[:cut + 1]
+
+
+def search_file(name: str, pattern: bytes, flags: int, cap: int):
+    """(name, matches, newest `cap` hits as (time, line number, line)); regex runs over whole blocks, not per line."""
+    import collections
+    regex = re.compile(pattern, flags | re.M)
+    year = _year(name)
+    hits = collections.deque(maxlen=cap)
+    count, lineno, last_t = 0, 0, None
+    with open_stream(name) as f:
+        stream = f.proc.stdout if isinstance(f, _ProcessStream) else f
+        for block in _chunks(stream):
+            pos, line_end = 0, -1
+            for m in regex.finditer(block):
+                if m.start() <= line_end:
+                    continue  # Another hit on a line already taken
+                start = block.rfind(b"\n", 0, m.start()) + 1
+                line_end = block.find(b"\n", m.start())
+                lineno += block.count(b"\n", pos, start)
+                pos = start
+                line = block[start:line_end]
+                t = line_time(line, year)
+                last_t = t if t is not None else last_t
+                count += 1
+                hits.append((last_t, lineno + 1, line[:MAX_LINE]))
+            lineno += block.count(b"\n", pos)
+    return name, count, list(hits)
+
+
+def search(path: str, pattern: str, ignore_case: bool = False, limit: int = 100, workers: int = 4) -> str:
+    """One pattern over every file of a rotation set or glob, decompressing on the fly, files searched in parallel."""
+    started = time.perf_counter()
+    files = expand_paths(path)
+    flags = re.I if ignore_case else 0
+    try:
+        re.compile(pattern.encode(), flags)
+    except re.error as e:
+        raise LogKitError(f"Invalid pattern: {e}.")
+    workers = max(1, min(int(workers), len(files), os.cpu_count() or 1))
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(search_file, files, [pattern.encode()] * len(files), [flags] * len(files), [limit] * len(files)))
+    else:
+        results = [search_file(name, pattern.encode(), flags, limit) for name in files]
+
+    total = sum(count for _, count, _ in results)
+    # Newest `limit` hits overall, printed oldest first; untimed hits sort before timed ones
+    merged = sorted(((t if t is not None else float("-inf"), name, lineno, line)
+                     for name, _, hits in results for t, lineno, line in hits), key=lambda h: h[0])[-int(limit):]
+    elapsed = time.perf_counter() - started
+    short = {name: os.path.basename(name) for name in files}
+    lines = [f"[LOG SEARCH] /{pattern}/{'i' if ignore_case else ''} in {len(files)} files: {total} matches"
+             f"{f', newest {len(merged)} shown' if total > len(merged) else ''} ({elapsed:.2f}s, {workers} workers)",
+             "Per file: " + " | ".join(f"{short[name]} {count}" for name, count, _ in results)]
+    lines += [f"{short[name]}:{lineno}:{line.decode('utf-8', 'replace')}" for _, name, lineno, line in merged]
+    return "\n".join(lines)
+
+
+# --- Signature scanning ---
+
+class AhoCorasick:
+    """
+    Literal multi-pattern automaton (goto/fail/output): every literal in a text,
+    overlaps included. Its trie doubles as one prefix-factored regex, which finds
+    candidate lines at C speed; the automaton then attributes each candidate.
+    """
+
+    def __init__(self, literals: list):
+        self.goto, self.out, self.ends = [{}], [set()], set()
+        for i, literal in enumerate(literals):
+            state = 0
+            for byte in literal:
+                if byte not in self.goto[state]:
+                    self.goto.append({})
+                    self.out.append(set())
+                    self.goto[state][byte] = len(self.goto) - 1
+                state = self.goto[state][byte]
+            self.out[state].add(i)
+            self.ends.add(state)
+        self.fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        while queue:
+            parent = queue.pop(0)
+            for byte, state in self.goto[parent].items():
+                queue.append(state)
+                f = self.fail[parent]
+                while f and byte not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[state] = self.goto[f].get(byte, 0)
+                self.out[state] |= self.out[self.fail[state]]
+
+    def find(self, text: bytes) -> set:
+        """Indices of every literal occurring in `text`."""
+        state, found = 0, set()
+        for byte in text:
+            while state and byte not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(byte, 0)
+            if self.out[state]:
+                found |= self.out[state]
+        return found
+
+    def regex(self, state: int = 0) -> bytes:
+        branches = [re.escape(bytes([byte])) + self.regex(child) for byte, child in sorted(self.goto[state].items())]
+        if not branches:
+            return b""
+        body = branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+        return b"(?:" + body + b")?" if state in self.ends and state else body
+
+
+def compile_signatures(library: dict, only: list = None):
+    """
+    (signatures, automaton, owners, combined). Literals and regex anchors share
+    one automaton; owners[i] is (signature, None) for a literal, which is a hit
+    as found, or (signature, regex) for an anchor, which only nominates the line
+    for that regex. Regexes without anchors are joined into `combined`.
+    """
+    signatures = [sig for sig in library.get("signatures", []) if not only or sig["id"] in only]
+    literals, owners, unanchored = [], [], []
+    for k, sig in enumerate(signatures):
+        for literal in sig.get("literals", []):
+            literals.append(literal.lower().encode())
+            owners.append((k, None))
+        if not sig.get("regex"):
+            continue
+        flags = re.I if sig.get("ignore_case") else 0
+        try:
+            regex = re.compile(sig["regex"].encode(), flags)
+        except re.error as e:
+            raise LogKitError(f"Signature '{sig['id']}': invalid regex ({e}).")
+        for anchor in sig.get("anchors", []):
+            literals.append(anchor.lower().encode())
+            owners.append((k, regex))
+        if not sig.get("anchors"):
+            unanchored.append((k, regex, (b"(?i:" if flags else b"(?:") + regex.pattern + b")"))
+    automaton = AhoCorasick(literals) if literals else None
+    combined = None
+    if unanchored:
+        combined = (re.compile(b"|".join(part for _, _, part in unanchored)), [(k, regex) for k, regex, _ in unanchored])
+    return signatures, automaton, owners, combined
+
+
+def scan_signatures(path: str, library: dict, only: list = None) -> str:
+    """Every signature of the library over the file(s) in one pass: hit counts and first/last locations."""
+    started = time.perf_counter()
+    files = expand_paths(path) if any(c in path for c in "*?[") else [path]
+    if len(files) > 1:  # Oldest first, so first/last follow time rather than names
+        starts = {name: _first_time(name, _year(name)) for name in files}
+        files.sort(key=lambda name: (starts[name] is None, starts[name] or 0, name))
+    signatures, automaton, owners, combined = compile_signatures(library, only)
+    if not signatures:
+        raise LogKitError("No signatures selected.")
+    literal_rx = re.compile(automaton.regex()) if automaton else None
+    stats = [{"count": 0, "first": None, "last": None} for _ in signatures]
+    matched, scanned = [], 0
+    for name in files:
+        year = _year(name)
+        lineno = 0
+        with open_stream(name) as f:
+            stream = f.proc.stdout if isinstance(f, _ProcessStream) else f
+            for block in _chunks(stream):
+                scanned += len(block)
+                # Candidate lines at C speed: one pass of the trie regex (plus any unanchored regexes)
+                starts = set()
+                if literal_rx is not None:
+                    starts.update(block.rfind(b"\n", 0, m.start()) + 1 for m in literal_rx.finditer(block.lower()))
+                if combined is not None:
+                    starts.update(block.rfind(b"\n", 0, m.start()) + 1 for m in combined[0].finditer(block))
+                pos = 0
+                for start in sorted(starts):
+                    lineno += block.count(b"\n", pos, start)
+                    pos = start
+                    line = block[start:block.find(b"\n", start)]
+                    # Attribution: the automaton reports every literal/anchor on the line, overlaps included
+                    hits = set()
+                    for i in (automaton.find(line.lower()) if automaton else ()):
+                        k, regex = owners[i]
+                        if k not in hits and (regex is None or regex.search(line)):
+                            hits.add(k)
+                    if combined is not None:
+                        hits.update(k for k, regex in combined[1] if regex.search(line))
+                    location = (os.path.basename(name), lineno + 1, line_time(line, year), line[:MAX_LINE])
+                    for k in sorted(hits):
+                        if not stats[k]["count"]:
+                            stats[k]["first"] = location
+                            matched.append(k)
+                        stats[k]["count"] += 1
+                        stats[k]["last"] = location
+                lineno += block.count(b"\n", pos)
+
+    elapsed = time.perf_counter() - started
+    lines = [f"[SIGNATURES] library v{library.get('version', '?')}: {len(signatures)} signatures over {len(files)} file(s)"
+             f" ({scanned / 1048576:.1f} MB) in one pass, {len(matched)} matched ({elapsed:.2f}s)"]
+    place = lambda loc: f"{loc[0]}:{loc[1]}" + (f" ({format_time(loc[2])})" if loc[2] is not None else "")
+    for k in matched:  # In order of first appearance
+        sig, st = signatures[k], stats[k]
+        lines.append(f"{sig['id']} [{sig.get('severity', '-')}] {st['count']} hit{'s' if st['count'] != 1 else ''}, first {place(st['first'])}, last {place(st['last'])}")
+        lines.append(f"  {st['first'][3].decode('utf-8', 'replace')}")
+        if sig.get("hint"):
+            lines.append(f"  hint: {sig['hint']}")
+    missing = [signatures[k]["id"] for k in range(len(signatures)) if not stats[k]["count"]]
+    if missing:
+        lines.append("Not seen: " + ", ".join(missing))
+    return "\n".join(lines)
+
+
+# --- Incremental tail with (inode, offset) cursors ---
+
+def _read_lines(path: str, offset: int, budget: int):
+    """
+    (data, consumed): complete lines from `offset`, at most `budget` bytes. A
+    line longer than the budget is cut to fit and skipped whole, so one huge
+    line can neither blow the output cap nor stall the cursor.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(budget)
+        cut = data.rfind(b"\n")
+        if cut >= 0:
+            return data[:cut + 1], cut + 1
+        if len(data) < budget:
+            return b"", 0  # Unterminated last line: returned once the writer finishes it
+        consumed = len(data)
+        while True:
+            chunk = f.read(65536)
+            end = chunk.find(b"\n")
+            if end >= 0:
+                consumed += end + 1
+                break
+            if not chunk:
+                break  # Still being written: the rest is skipped on the next read
+            consumed += len(chunk)
+        marker = f" ... [line cut, {consumed} bytes]\n".encode()
+        return data[:max(0, budget - len(marker))] + marker, consumed
+
+
+def tail(path: str, dev: int = None, ino: int = None, offset: int = None, max_bytes: int = 16384) -> str:
+    """
+    Bytes appended since the cursor (dev, ino, offset). A rotated-away file is
+    finished first when it still exists as a plain rotation; a truncated file
+    is read from the start. Returns a 'CURSOR dev ino offset' line, then a
+    header and the new lines.
+    """
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        raise LogKitError(f"Cannot stat {path}: {e.strerror}.")
+    notes, parts, budget = [], [], max(1024, int(max_bytes))
+    cursor = (st.st_dev, st.st_ino, offset or 0)
+    if ino is None:
+        start = max(0, st.st_size - budget)
+        if start:
+            with open(path, "rb") as f:
+                f.seek(start)
+                start += len(f.readline())
+        notes.append("first read, starting with the last lines" if start else "first read")
+        cursor = (st.st_dev, st.st_ino, start)
+    elif (dev, ino) != (st.st_dev, st.st_ino):
+        old = None
+        for name in rotation_set(path):
+            other = os.stat(name)
+            if (other.st_dev, other.st_ino) == (dev, ino) and not name.endswith((".gz", ".bz2", ".xz", ".zst")):
+                old = name
+        if old is not None:
+            data, consumed = _read_lines(old, offset, budget)
+            parts.append((old, data))
+            budget -= len(data)
+            notes.append(f"rotated: rest of {os.path.basename(old)}, then the new file")
+            cursor = (dev, ino, offset + consumed)
+            if offset + consumed < os.path.getsize(old):
+                budget = 0  # Finish the old file before moving on
+        else:
+            notes.append("rotated: previous file gone or compressed, new file from the start")
+        if budget > 0:
+            cursor = (st.st_dev, st.st_ino, 0)
+    elif st.st_size < offset:
+        notes.append(f"truncated ({st.st_size} < cursor {offset} bytes), reading from the start")
+        cursor = (st.st_dev, st.st_ino, 0)
+
+    if budget > 0 and cursor[:2] == (st.st_dev, st.st_ino):
+        data, consumed = _read_lines(path, cursor[2], budget)
+        parts.append((path, data))
+        cursor = (st.st_dev, st.st_ino, cursor[2] + consumed)
+    size = sum(len(d) for _, d in parts)
+    behind = st.st_size - cursor[2] if cursor[:2] == (st.st_dev, st.st_ino) else None
+    lines = [f"CURSOR {cursor[0]} {cursor[1]} {cursor[2]}"]
+    if not size:
+        lines.append(f"[LOG TAIL] {path}: no new lines since the last read (offset {cursor[2]}{', ' + '; '.join(notes) if notes else ''}).")
+        return "\n".join(lines)
+    count = sum(d.count(b"\n") for _, d in parts)
+    more = behind is None or (behind > 0 and _read_lines(path, cursor[2], 65536)[1] > 0)
+    lines.append(f"[LOG TAIL] {path}: +{size} bytes, {count} new lines"
+                 f"{' (' + '; '.join(notes) + ')' if notes else ''}{' - more unread, call again' if more else ''}")
+    for name, data in parts:
+        if len(parts) > 1 and data:
+            lines.append(f"--- {name}")
+        if data:
+            lines.append(data.rstrip(b"\n").decode("utf-8", "replace"))
+    return "\n".join(lines)
+
+
+# --- Template mining (Drain-style) ---
+
+WILDCARD = b"<*>"
+_VAR_RE = re.compile(rb"\S*\d\S*")  # Tokens with digits (ids, counts, durations, addresses) are parameters
+_SERVICE_RE = re.compile(rb"\s*(?:\[([^\]\s]{1,40})\]|(?:\S+\s+)?([\w.\-/]{1,40})\[\d+\]:)")
+_LEVEL_PREFIX_RE = re.compile(rb"\s*\[?(?:" + _LEVEL_RE.pattern[3:-3] + rb")\]?:?\s+", re.I)
+
+
+def split_entry(line: bytes):
+    """(service or None, message) of a log line: timestamp, [service] / prog[pid]: and level prefix removed."""
+    m = _ISO_RE.search(line, 0, _HEAD) or _SYSLOG_RE.search(line, 0, _HEAD)
+    pos = m.end() if m else 0
+    service = None
+    m = _SERVICE_RE.match(line, pos)
+    if m:
+        service = (m.group(1) or m.group(2)).decode("utf-8", "replace")
+        pos = m.end()
+    m = _LEVEL_PREFIX_RE.match(line, pos)
+    if m:
+        pos = m.end()
+    return service, line[pos:].strip()
+
+
+class Template:
+    __slots__ = ("tokens", "count", "first_t", "last_t", "first_line", "examples", "levels", "services", "max_rank")
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.count = 0
+        self.first_t = self.last_t = self.first_line = None
+        self.examples = []
+        self.levels = {}
+        self.services = {}
+        self.max_rank = -1
+
+    def record(self, lineno: int, line: bytes, t, rank, service, keep: int):
+        self.count += 1
+        if self.first_line is None:
+            self.first_line = lineno
+        if t is not None:
+            self.first_t = t if self.first_t is None else min(self.first_t, t)
+            self.last_t = t if self.last_t is None else max(self.last_t, t)
+        if len(self.examples) < keep:
+            self.examples.append((lineno, line))
+        if rank is not None:
+            self.levels[rank] = self.levels.get(rank, 0) + 1
+            self.max_rank = max(self.max_rank, rank)
+        if service:
+            self.services[service] = self.services.get(service, 0) + 1
+
+    def text(self) -> str:
+        return b" ".join(self.tokens).decode("utf-8", "replace")[:200]
+
+
+class TemplateMiner:
+    """
+    Single-pass Drain-style clustering: messages are grouped by token count and
+    first token, then merged into the most similar template of the group
+    (differing positions become <*>). Exact repeats skip the search.
+    """
+
+    def __init__(self, similarity: float = 0.5, max_templates: int = 5000):
+        self.similarity = similarity
+        self.max_templates = max_templates
+        self.templates = []
+        self._groups = {}
+        self._seen = {}
+        self._overflow = None
+
+    def add(self, message: bytes) -> Template:
+        masked = _VAR_RE.sub(WILDCARD, message)
+        template = self._seen.get(masked)
+        if template is not None:
+            return template
+        tokens = masked.split()
+        group = self._groups.setdefault((len(tokens), tokens[0] if tokens else b""), [])
+        best, best_score = None, (-1.0, 0)
+        for candidate in group:
+            same = sum(1 for a, b in zip(candidate.tokens, tokens) if a == b and a != WILDCARD)
+            score = (same / max(len(tokens), 1), candidate.tokens.count(WILDCARD))
+            if score > best_score:
+                best, best_score = candidate, score
+        if best is not None and best_score[0] >= self.similarity:
+            best.tokens = [a if a == b else WILDCARD for a, b in zip(best.tokens, tokens)]
+            template = best
+        elif len(self.templates) < self.max_templates:
+            template = Template(tokens)
+            self.templates.append(template)
+            group.append(template)
+        else:
+            if self._overflow is None:
+                self._overflow = Template([b"<other", b"templates>"])
+                self.templates.append(self._overflow)
+            template = self._overflow
+        if len(self._seen) < 100000:
+            self._seen[masked] = template
+        return template
+
+
+def _histogram(counts: dict, names=None, limit: int = 8) -> str:
+    ranked = sorted(counts.items(), key=lambda kv: -kv[1])
+    shown = " | ".join(f"{names[k] if names else k} {v}" for k, v in ranked[:limit])
+    return shown + (f" | +{len(ranked) - limit} more" if len(ranked) > limit else "")
+
+
+def summarize(path: str, since: str = None, until: str = None, top: int = 15, rare: int = 3, examples: int = 2) -> str:
+    """Whole log (or a time window) as templates with counts, spans and histograms; rare and severe lines verbatim."""
+    started = time.perf_counter()
+    idx, added = load_index(path)
+    lo, hi = _window(idx, since, until)
+    miner, stats = TemplateMiner(), {}
+    levels, services, total, span = {}, {}, 0, [None, None]
+    for lineno, line, t, rank in scan(path, idx, lo, hi, stats=stats):
+        if not line.strip():
+            continue
+        service, message = split_entry(line)
+        miner.add(message).record(lineno, line, t, rank, service, examples)
+        total += 1
+        if rank is not None:
+            levels[rank] = levels.get(rank, 0) + 1
+        if service:
+            services[service] = services.get(service, 0) + 1
+        if t is not None:
+            span[0] = t if span[0] is None else min(span[0], t)
+            span[1] = t if span[1] is None else max(span[1], t)
+
+    one_day = span[0] is not None and int(span[0] // 86400) == int(span[1] // 86400)
+    pattern = "%H:%M:%S" if one_day else "%m-%d %H:%M"
+    clock = lambda t: "-" if t is None else time.strftime(pattern, time.gmtime(t))
+    lines = [f"[LOG SUMMARY] {path}: {total} lines -> {len(miner.templates)} templates "
+             f"({format_time(span[0])} -> {format_time(span[1])}; {_describe_filters(lo, hi)})"]
+    if levels:
+        lines.append("Levels: " + _histogram(levels, LEVELS))
+    if services:
+        lines.append("Services: " + _histogram(services))
+
+    # Rare or severe templates are the interesting ones: shown verbatim, in file order
+    notable = [t for t in miner.templates if t.count <= rare or t.max_rank >= _RANK["ERROR"]]
+    common = sorted((t for t in miner.templates if t not in notable), key=lambda t: -t.count)
+    lines.append("Top templates (count, share, first-last, levels, services):")
+    for template in common[:top]:
+        level_names = "/".join(LEVELS[r] for r in sorted(template.levels)) or "-"
+        owner = next(iter(template.services)) if len(template.services) == 1 else f"{len(template.services)} services"
+        lines.append(f"  {template.count} {100 * template.count / max(total, 1):.1f}% "
+                     f"{clock(template.first_t)}-{clock(template.last_t)} {level_names} [{owner}] {template.text()}")
+    if len(common) > top:
+        lines.append(f"  (+{len(common) - top} more templates, {sum(t.count for t in common[top:])} lines)")
+    if notable:
+        lines.append(f"Rare (<= {rare}) and ERROR+ templates, verbatim:")
+        shown = 0
+        for template in sorted(notable, key=lambda t: t.first_line):
+            for lineno, line in template.examples:
+                if shown < 40:
+                    lines.append(f"  {lineno}:{line[:MAX_LINE].decode('utf-8', 'replace')}")
+                shown += 1
+            if template.count > len(template.examples):
+                lines.append(f"    (x{template.count} total: {template.text()})")
+        if shown > 40:
+            lines.append(f"  (+{shown - 40} more verbatim lines)")
+    lines.append(_index_line(idx, added, stats, started))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="logkit")
+    sub = parser.add_subparsers(dest="command", required=True)
+    q = sub.add_parser("query")
+    q.add_argument("path")
+    q.add_argument("--since")
+    q.add_argument("--until")
+    q.add_argument("--level")
+    q.add_argument("--pattern")
+    q.add_argument("--limit", type=int, default=200)
+    q.add_argument("--newest", action="store_true", help="keep the last matches instead of the first")
+    m = sub.add_parser("summarize")
+    m.add_argument("path")
+    m.add_argument("--since")
+    m.add_argument("--until")
+    m.add_argument("--top", type=int, default=15)
+    m.add_argument("--rare", type=int, default=3)
+    a = sub.add_parser("around")
+    a.add_argument("path")
+    a.add_argument("timestamp")
+    a.add_argument("--window", type=float, default=60)
+    a.add_argument("--limit", type=int, default=100)
+    t = sub.add_parser("tail")
+    t.add_argument("path")
+    t.add_argument("--cursor", help="dev:ino:offset from the previous read")
+    t.add_argument("--max-bytes", type=int, default=16384)
+    g = sub.add_parser("search")
+    g.add_argument("path", help="log path (rotations included) or a quoted glob")
+    g.add_argument("pattern")
+    g.add_argument("--ignore-case", action="store_true")
+    g.add_argument("--limit", type=int, default=100)
+    g.add_argument("--workers", type=int, default=4)
+    v = sub.add_parser("signatures")
+    v.add_argument("path", help="log path or a quoted glob")
+    v.add_argument("--library", required=True, help="signature library as JSON")
+    v.add_argument("--only", help="comma-separated signature ids")
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "query":
+            print(query(args.path, args.since, args.until, args.level, args.pattern, args.limit, args.newest))
+        elif args.command == "summarize":
+            print(summarize(args.path, args.since, args.until, args.top, args.rare))
+        elif args.command == "around":
+            print(around(args.path, args.timestamp, args.window, args.limit))
+        elif args.command == "search":
+            print(search(args.path, args.pattern, args.ignore_case, args.limit, args.workers))
+        elif args.command == "signatures":
+            only = [x for x in args.only.split(",") if x] if args.only else None
+            print(scan_signatures(args.path, json.loads(args.library), only))
+        elif args.command == "tail":
+            dev, ino, offset = (int(x) for x in args.cursor.split(":")) if args.cursor else (None, None, None)
+            print(tail(args.path, dev, ino, offset, args.max_bytes))
+    except (LogKitError, re.error) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
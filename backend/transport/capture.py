@@ -0,0 +1,118 @@
+"""
+Bounded Output Capture for SysMind.
+Tool output is streamed into a head/tail buffer with a hard byte cap, so a
+`cat` of a multi-GB log costs the same memory as an `echo`. Totals (bytes and
+lines) are always counted so the model knows exactly what was dropped.
+"""
+import os
+import subprocess
+import threading
+import time
+
+DEFAULT_MAX_BYTES = int(os.environ.get("SYSMIND_OUTPUT_CAP_BYTES", "16384"))
+READ_CHUNK = 65536
+
+
+def _human(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+class BoundedCapture:
+    """
+    Keeps the first and last `max_bytes / 2` bytes of a stream, never more.
+    """
+
+    def __init__(self, max_bytes: int = None):
+        max_bytes = max_bytes or DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+        self.head_cap = max_bytes // 2
+        self.tail_cap = max_bytes - self.head_cap
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total_bytes = 0
+        self.total_lines = 0
+        self._ends_with_newline = True
+
+    def feed(self, chunk: bytes):
+        if not chunk:
+            return
+        self.total_bytes += len(chunk)
+        self.total_lines += chunk.count(b"\n")
+        self._ends_with_newline = chunk.endswith(b"\n")
+
+        room = self.head_cap - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk:
+            self.tail += chunk[-self.tail_cap:]
+            overflow = len(self.tail) - self.tail_cap
+            if overflow > 0:
+                del self.tail[:overflow]
+
+    @property
+    def lines(self) -> int:
+        """Line count, including a final line without trailing newline."""
+        return self.total_lines + (0 if self._ends_with_newline or not self.total_bytes else 1)
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_bytes > len(self.head) + len(self.tail)
+
+    @property
+    def omitted_bytes(self) -> int:
+        return self.total_bytes - len(self.head) - len(self.tail)
+
+    def text(self) -> str:
+        if not self.truncated:
+            return (bytes(self.head) + bytes(self.tail)).decode("utf-8", errors="replace")
+        # Snap the cut to line boundaries so the model never sees half a line
+        head, tail = bytes(self.head), bytes(self.tail)
+        cut = head.rfind(b"\n")
+        head = head[:cut + 1] if cut > 0 else head
+        cut = tail.find(b"\n")
+        tail = tail[cut + 1:] if 0 <= cut < len(tail) - 1 else tail
+        return (
+            head.decode("utf-8", errors="replace")
+            + f"[... TRIMMED {_human(self.omitted_bytes)} ...]\n"
+            + tail.decode("utf-8", errors="replace")
+        )
+
+    def summary(self) -> str:
+        return (
+            f"[CAPTURE] {_human(self.total_bytes)}, {self.lines} lines total; "
+            f"showing first/last {_human(self.max_bytes // 2)} ({_human(self.omitted_bytes)} omitted)"
+        )
+
+
+def stream_process(argv: list, timeout: float, max_bytes: int = None, env: dict = None):
+    """
+    Runs a local process, streaming stdout/stderr into bounded captures.
+    Returns (returncode, stdout_capture, stderr_capture); raises TimeoutExpired.
+    """
+    proc = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    out, err = BoundedCapture(max_bytes), BoundedCapture(max_bytes)
+
+    def drain(stream, capture):
+        for chunk in iter(lambda: stream.read1(READ_CHUNK), b""):
+            capture.feed(chunk)
+
+    readers = [
+        threading.Thread(target=drain, args=(proc.stdout, out), daemon=True),
+        threading.Thread(target=drain, args=(proc.stderr, err), daemon=True),
+    ]
+    for t in readers:
+        t.start()
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    deadline = time.monotonic() + 2
+    for t in readers:
+        t.join(timeout=max(0, deadline - time.monotonic()))
+    return proc.returncode, out, err
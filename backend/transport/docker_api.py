@@ -0,0 +1,282 @@
+"""
+Docker Engine API Transport for SysMind.
+Talks to the daemon over /var/run/docker.sock through the docker SDK's pooled
+HTTP connections instead of spawning the `docker` CLI for every call.
+The CLI (argv form, never shell=True) remains as fallback when the SDK or
+socket is unavailable. Every call is timed so per-call latency is measurable.
+"""
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.transport.capture import BoundedCapture, stream_process
+
+try:
+    import docker
+    from docker import errors as docker_errors
+except ImportError:
+    docker = None
+    docker_errors = None
+
+DEFAULT_DOCKER_HOST = "unix:///var/run/docker.sock"
+
+
+class TransportError(Exception):
+    """Neither the Engine API nor the CLI could complete the call."""
+
+
+def _parse_size(text: str) -> float:
+    """Parses docker CLI sizes ('1.5MiB', '12kB', '0B') into bytes."""
+    match = re.match(r"\s*([\d.]+)\s*([a-zA-Z]*)", text or "")
+    if not match:
+        return 0.0
+    value, unit = float(match.group(1)), match.group(2).lower()
+    scale = {
+        "": 1, "b": 1,
+        "kb": 1e3, "mb": 1e6, "gb": 1e9, "tb": 1e12,
+        "kib": 1024, "mib": 1024 ** 2, "gib": 1024 ** 3, "tib": 1024 ** 4,
+    }
+    return value * scale.get(unit, 1)
+
+
+class DockerTransport:
+    """
+    Exec, inspect and stats as Python calls over a reusable connection pool.
+    """
+
+    def __init__(self, base_url: str = None, pool_size: int = 4, timeout: int = 30):
+        self.base_url = base_url or os.environ.get("DOCKER_HOST", DEFAULT_DOCKER_HOST)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._api = None
+        self._api_disabled = docker is None
+        self._lock = threading.Lock()
+        self._latency = {}
+
+    # --- Plumbing ---
+
+    @property
+    def api_available(self) -> bool:
+        return self._client() is not None
+
+    def _client(self):
+        """Lazily opens the pooled API client; disables itself after the first failure."""
+        if self._api is not None or self._api_disabled:
+            return self._api
+        with self._lock:
+            if self._api is None and not self._api_disabled:
+                try:
+                    self._api = docker.APIClient(
+                        base_url=self.base_url, version="auto",
+                        timeout=self.timeout, max_pool_size=self.pool_size
+                    )
+                except Exception:
+                    self._api_disabled = True
+        return self._api
+
+    @contextmanager
+    def _timed(self, op: str, via: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(op, via, (time.perf_counter() - start) * 1000)
+
+    def _record(self, op: str, via: str, elapsed_ms: float):
+        with self._lock:
+            stat = self._latency.setdefault(f"{op}:{via}", {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stat["count"] += 1
+            stat["total_ms"] += elapsed_ms
+            stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+            stat["last_ms"] = elapsed_ms
+
+    def latency_report(self) -> dict:
+        """Per-operation latency: {'exec:api': {'count', 'avg_ms', 'max_ms', 'last_ms'}, ...}."""
+        with self._lock:
+            return {
+                key: {
+                    "count": s["count"],
+                    "avg_ms": round(s["total_ms"] / s["count"], 2),
+                    "max_ms": round(s["max_ms"], 2),
+                    "last_ms": round(s["last_ms"], 2),
+                }
+                for key, s in self._latency.items()
+            }
+
+    def _cli(self, args: list, timeout: int = None) -> subprocess.CompletedProcess:
+        env = os.environ.copy()
+        env["MSYS_NO_PATHCONV"] = "1"
+        try:
+            return subprocess.run(["docker"] + args, capture_output=True, env=env, timeout=timeout or self.timeout)
+        except FileNotFoundError:
+            raise TransportError("docker CLI not found and Engine API unreachable")
+
+    # --- Inspect ---
+
+    def inspect(self, name: str) -> dict:
+        """Container inspect document (empty dict if the container does not exist)."""
+        api = self._client()
+        if api is not None:
+            try:
+                with self._timed("inspect", "api"):
+                    return api.inspect_container(name)
+            except docker_errors.NotFound:
+                return {}
+            except Exception:
+                pass
+        with self._timed("inspect", "cli"):
+            res = self._cli(["inspect", name])
+        if res.returncode != 0:
+            if b"No such" in res.stderr:
+                return {}
+            raise TransportError(res.stderr.decode("utf-8", errors="replace").strip())
+        data = json.loads(res.stdout or b"[]")
+        return data[0] if data else {}
+
+    def is_running(self, name: str) -> bool:
+        return bool(self.inspect(name).get("State", {}).get("Running"))
+
+    def list_containers(self, label: str = None) -> list:
+        """Names of running containers, optionally filtered by a label selector ('key' or 'key=value')."""
+        api = self._client()
+        if api is not None:
+            try:
+                with self._timed("list", "api"):
+                    found = api.containers(filters={"label": label} if label else None)
+                return sorted(c["Names"][0].lstrip("/") for c in found if c.get("Names"))
+            except Exception:
+                pass
+        args = ["ps", "--format", "{{.Names}}"] + (["--filter", f"label={label}"] if label else [])
+        with self._timed("list", "cli"):
+            res = self._cli(args)
+        if res.returncode != 0:
+            raise TransportError(res.stderr.decode("utf-8", errors="replace").strip())
+        return sorted(n for n in res.stdout.decode().split() if n)
+
+    # --- Exec ---
+
+    def exec(self, name: str, command: str, timeout: int = 10, max_bytes: int = None):
+        """
+        Runs `bash -c command` in the container, streaming output into bounded captures.
+        Returns (returncode, stdout_capture, stderr_capture).
+        Raises subprocess.TimeoutExpired when the command exceeds `timeout`.
+        """
+        api = self._client()
+        exec_id = None
+        start = time.perf_counter()
+        if api is not None:
+            try:
+                # Enforced in-container so a hung command never pins a pooled connection
+                exec_id = api.exec_create(name, ["timeout", str(timeout), "bash", "-c", command])["Id"]
+            except Exception:
+                exec_id = None
+        if exec_id is not None:
+            # Once created the command may have run: failures here must not replay it via the CLI
+            stdout, stderr = BoundedCapture(max_bytes), BoundedCapture(max_bytes)
+            try:
+                for out_chunk, err_chunk in api.exec_start(exec_id, stream=True, demux=True):
+                    stdout.feed(out_chunk)
+                    stderr.feed(err_chunk)
+                code = api.exec_inspect(exec_id).get("ExitCode")
+            except Exception as e:
+                raise TransportError(f"exec failed after start: {e}")
+            finally:
+                self._record("exec", "api", (time.perf_counter() - start) * 1000)
+            if code == 124:
+                raise subprocess.TimeoutExpired(command, timeout)
+            return (code if code is not None else -1), stdout, stderr
+
+        env = os.environ.copy()
+        env["MSYS_NO_PATHCONV"] = "1"
+        with self._timed("exec", "cli"):
+            try:
+                return stream_process(["docker", "exec", name, "bash", "-c", command], timeout, max_bytes, env=env)
+            except FileNotFoundError:
+                raise TransportError("docker CLI not found and Engine API unreachable")
+
+    # --- Stats ---
+
+    def stats(self, name: str) -> dict:
+        """
+        One stats sample, normalized to:
+        cpu_percent, mem_percent, mem_bytes, net_rx_bytes, net_tx_bytes, blk_read_bytes, blk_write_bytes.
+        """
+        api = self._client()
+        if api is not None:
+            try:
+                with self._timed("stats", "api"):
+                    raw = api.stats(name, stream=False)
+                return self._normalize_api_stats(raw)
+            except Exception:
+                pass
+        with self._timed("stats", "cli"):
+            res = self._cli(["stats", name, "--no-stream", "--format", "{{json .}}"])
+        if res.returncode != 0:
+            raise TransportError(res.stderr.decode("utf-8", errors="replace").strip())
+        return self._normalize_cli_stats(json.loads(res.stdout))
+
+    def stats_line(self, name: str) -> str:
+        """Compact 'CPU% / MEM%' string for prompts (same shape as `docker stats --format`)."""
+        s = self.stats(name)
+        return f"{s['cpu_percent']:.2f}% / {s['mem_percent']:.2f}%"
+
+    @staticmethod
+    def _normalize_api_stats(raw: dict) -> dict:
+        cpu, pre = raw.get("cpu_stats", {}), raw.get("precpu_stats", {})
+        cpu_delta = cpu.get("cpu_usage", {}).get("total_usage", 0) - pre.get("cpu_usage", {}).get("total_usage", 0)
+        sys_delta = cpu.get("system_cpu_usage", 0) - pre.get("system_cpu_usage", 0)
+        online = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+        cpu_percent = (cpu_delta / sys_delta) * online * 100.0 if sys_delta > 0 and cpu_delta > 0 else 0.0
+
+        mem = raw.get("memory_stats", {})
+        # Same as the CLI: page cache is not counted as used memory
+        mem_used = mem.get("usage", 0) - mem.get("stats", {}).get("inactive_file", 0)
+        mem_percent = (mem_used / mem["limit"]) * 100.0 if mem.get("limit") else 0.0
+
+        networks = raw.get("networks") or {}
+        blk = (raw.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []
+        return {
+            "cpu_percent": cpu_percent,
+            "mem_percent": mem_percent,
+            "mem_bytes": float(mem_used),
+            "net_rx_bytes": float(sum(n.get("rx_bytes", 0) for n in networks.values())),
+            "net_tx_bytes": float(sum(n.get("tx_bytes", 0) for n in networks.values())),
+            "blk_read_bytes": float(sum(e.get("value", 0) for e in blk if e.get("op", "").lower() == "read")),
+            "blk_write_bytes": float(sum(e.get("value", 0) for e in blk if e.get("op", "").lower() == "write")),
+        }
+
+    @staticmethod
+    def _normalize_cli_stats(raw: dict) -> dict:
+        def pair(field):
+            left, _, right = raw.get(field, "0B / 0B").partition("/")
+            return _parse_size(left), _parse_size(right)
+
+        net_rx, net_tx = pair("NetIO")
+        blk_read, blk_write = pair("BlockIO")
+        return {
+            "cpu_percent": float(raw.get("CPUPerc", "0%").rstrip("%") or 0),
+            "mem_percent": float(raw.get("MemPerc", "0%").rstrip("%") or 0),
+            "mem_bytes": pair("MemUsage")[0],
+            "net_rx_bytes": net_rx,
+            "net_tx_bytes": net_tx,
+            "blk_read_bytes": blk_read,
+            "blk_write_bytes": blk_write,
+        }
+
+
+_shared_transport = None
+_shared_lock = threading.Lock()
+
+
+def get_transport() -> DockerTransport:
+    """Process-wide transport so every agent and script shares one connection pool."""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            pool_size = int(os.environ.get("SYSMIND_DOCKER_POOL_SIZE", "4"))
+            _shared_transport = DockerTransport(pool_size=pool_size)
+        return _shared_transport
@@ -0,0 +1,207 @@
+"""
+Persistent Shell Session for SysMind.
+Keeps one long-lived bash process inside the target container and frames
+every command's output with a unique sentinel, so a tool call costs a pipe
+round trip instead of a fresh `docker exec` + bash startup.
+"""
+import os
+import queue
+import subprocess
+import threading
+import time
+import uuid
+
+from backend.transport.capture import BoundedCapture
+
+# Pipe reads are split into pieces of at most this size, so a newline-free
+# binary blob can never grow a single queued line without bound
+LINE_LIMIT = 65536
+
+
+class ShellSessionError(Exception):
+    """The session could not be started or the command was never sent (safe to retry elsewhere)."""
+
+
+class ShellSessionLost(ShellSessionError):
+    """The session died while a command was in flight (outcome unknown, do NOT retry)."""
+
+
+class ShellSession:
+    """
+    One stdin/stdout channel per target.
+
+    Protocol: each command runs in a subshell with stdin detached, followed by
+    a sentinel line carrying its exit code on stdout and a bare sentinel on
+    stderr. Output is read until both sentinels arrive or the timeout expires.
+    """
+
+    def __init__(self, target_name: str, default_timeout: float = 10.0):
+        self.target_name = target_name
+        self.default_timeout = default_timeout
+        self.restarts = 0
+        self._started = False
+        self._proc = None
+        self._events = None
+        self._stop = None
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _spawn_command(self) -> list:
+        return ["docker", "exec", "-i", self.target_name, "bash", "--noprofile", "--norc"]
+
+    @staticmethod
+    def _pump(stream, channel: int, sink: queue.Queue, stop: threading.Event):
+        """Drains one pipe line by line as (channel, line); a None line marks EOF."""
+        def put(item):
+            # Never block forever on a queue nobody reads any more (session closed)
+            while not stop.is_set():
+                try:
+                    sink.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            for line in iter(lambda: stream.readline(LINE_LIMIT), b""):
+                if not put((channel, line)):
+                    return
+        except (OSError, ValueError):
+            pass
+        put((channel, None))
+
+    def _start(self):
+        if self._started:
+            self.restarts += 1
+        env = os.environ.copy()
+        env["MSYS_NO_PATHCONV"] = "1"
+        try:
+            self._proc = subprocess.Popen(
+                self._spawn_command(),
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                env=env, bufsize=0
+            )
+        except OSError as e:
+            self._proc = None
+            raise ShellSessionError(f"cannot spawn shell: {e}")
+
+        # One bounded queue for both pipes: backpressure stalls the shell, not our memory,
+        # and neither pipe can fill up while we wait on the other
+        self._events, self._stop = queue.Queue(maxsize=256), threading.Event()
+        for channel, stream in enumerate((self._proc.stdout, self._proc.stderr)):
+            threading.Thread(target=self._pump, args=(stream, channel, self._events, self._stop), daemon=True).start()
+
+        # Handshake: proves the container accepted the exec before we trust the channel
+        try:
+            code, out, _ = self._run_locked("echo ready", self.default_timeout)
+        except (ShellSessionError, subprocess.TimeoutExpired) as e:
+            self.close()
+            raise ShellSessionError(f"handshake failed: {e}")
+        if code != 0 or out.text().strip() != "ready":
+            self.close()
+            raise ShellSessionError("handshake failed: unexpected reply")
+        self._started = True
+
+    def _ensure_started(self):
+        if self.alive:
+            return
+        self.close()
+        self._start()
+
+    def _collect(self, captures: tuple, marker: bytes, deadline: float, command: str, timeout: float) -> bytes:
+        """Streams both pipes into their captures until each has sent the sentinel; returns the stdout sentinel."""
+        pending = [None, None]
+        sentinels = [None, None]
+        while sentinels[0] is None or sentinels[1] is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(command, timeout)
+            try:
+                channel, line = self._events.get(timeout=remaining)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(command, timeout)
+            if line is None:
+                raise ShellSessionLost("shell session terminated mid-command")
+            if line.startswith(marker):
+                # The sentinel is preceded by a forced newline; drop exactly that one
+                last = pending[channel]
+                if last is not None:
+                    captures[channel].feed(last[:-1] if last.endswith(b"\n") else last)
+                pending[channel] = None
+                sentinels[channel] = line
+                continue
+            # One line of delay so the forced newline can still be stripped
+            if pending[channel] is not None:
+                captures[channel].feed(pending[channel])
+            pending[channel] = line
+        return sentinels[0]
+
+    def _run_locked(self, command: str, timeout: float, max_bytes: int = None):
+        marker = f"__SYSMIND_{uuid.uuid4().hex}__"
+        script = (
+            f"( {command}\n) </dev/null\n"
+            f"printf '\\n{marker}:%d\\n' $?\n"
+            f"printf '\\n{marker}\\n' >&2\n"
+        )
+        try:
+            self._proc.stdin.write(script.encode("utf-8"))
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise ShellSessionError(f"shell channel closed: {e}")
+
+        deadline = time.monotonic() + timeout
+        marker_b = marker.encode()
+        stdout, stderr = BoundedCapture(max_bytes), BoundedCapture(max_bytes)
+        try:
+            sentinel = self._collect((stdout, stderr), marker_b, deadline, command, timeout)
+        except subprocess.TimeoutExpired:
+            # The command is still running inside the shell; the channel is unusable now
+            self.close()
+            raise
+        except ShellSessionLost:
+            self.close()
+            raise
+
+        returncode = int(sentinel.decode().strip().rsplit(":", 1)[1])
+        return returncode, stdout, stderr
+
+    def run(self, command: str, timeout: float = None, max_bytes: int = None):
+        """
+        Runs `command` in the session.
+        Returns (returncode, stdout_capture, stderr_capture) as BoundedCapture objects.
+        """
+        timeout = timeout or self.default_timeout
+        with self._lock:
+            self._ensure_started()
+            try:
+                return self._run_locked(command, timeout, max_bytes)
+            except ShellSessionLost:
+                raise
+            except ShellSessionError:
+                # Write failed before the command reached bash: restart once and resend
+                self.close()
+                self._start()
+                return self._run_locked(command, timeout, max_bytes)
+
+    def close(self):
+        """Terminates the session process (idempotent)."""
+        proc, self._proc = self._proc, None
+        if self._stop is not None:
+            self._stop.set()
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            proc.terminate()
+            proc.wait(timeout=2)
+        except Exception:
+            try:
+                proc.kill()
+            except Exception:
+                pass
@@ -11,9 +11,17 @@ import time
 import json
 from datetime import datetime
 
+from rich.console import Console
+
+# Gemini 3 Flash list price (USD per 1k tokens)
+INPUT_COST_PER_1K = 0.000075
+OUTPUT_COST_PER_1K = 0.0003
+
 class SysMindBenchmark:
-    def __init__(self):
+    def __init__(self, max_cycles=10, report_dir="benchmark_reports"):
         self.results = []
+        self.max_cycles = max_cycles
+        self.report_dir = report_dir
     
     def run_scenario(self, name, objective, expected_outcome):
         """
@@ -24,28 +32,41 @@ class SysMindBenchmark:
         
         # Import here to measure cold start
         from backend.core.agent import SysMindAgent
-        agent = SysMindAgent(target_name="sysmind-target")
+        agent = SysMindAgent(
+            target_name="sysmind-target",
+            console=Console(quiet=True),
+            report_dir=self.report_dir,
+            interactive=False,
+        )
         
         # Execute the scenario
         try:
-            # In a real benchmark, this would call agent.run(objective)
-            # For demo purposes, we simulate metrics
+            status = agent.ooda_loop(objective, max_cycles=self.max_cycles)
             elapsed = time.time() - start_time
+            metrics = agent.mission_metrics or {}
             
             result = {
                 "scenario": name,
                 "time_to_recovery_seconds": round(elapsed, 2),
                 "expected_outcome": expected_outcome,
-                "actual_outcome": "SIMULATED_SUCCESS",
-                "accuracy": "100%",  # Manual verification required
+                "actual_outcome": status,
+                "mode": "simulation" if agent.simulation_mode else "live",
+                "llm_calls": metrics.get("llm_calls", 0),
+                "prompt_tokens": metrics.get("prompt_tokens", 0),
+                "output_tokens": metrics.get("output_tokens", 0),
+                "total_tokens": metrics.get("total_tokens", 0),
+                "estimated_token_calls": metrics.get("estimated_calls", 0),
+                "llm_latency_seconds": metrics.get("llm_latency_s", 0.0),
                 "timestamp": datetime.now().isoformat()
             }
             
             self.results.append(result)
-            print(f"   ✓ TTR: {result['time_to_recovery_seconds']}s")
+            print(f"   ✓ {status} | TTR: {result['time_to_recovery_seconds']}s | Tokens: {result['total_tokens']} over {result['llm_calls']} calls")
             
         except Exception as e:
             print(f"   ✗ Error: {e}")
+        finally:
+            agent.close()
     
     def generate_report(self):
         """
@@ -56,16 +77,25 @@ class SysMindBenchmark:
             return
         
         avg_ttr = sum(r["time_to_recovery_seconds"] for r in self.results) / len(self.results)
+        n = len(self.results)
+        calls = sum(r["llm_calls"] for r in self.results)
+        prompt_tokens = sum(r["prompt_tokens"] for r in self.results)
+        output_tokens = sum(r["output_tokens"] for r in self.results)
+        cost = (prompt_tokens * INPUT_COST_PER_1K + output_tokens * OUTPUT_COST_PER_1K) / 1000
+        resolved = sum(1 for r in self.results if r["actual_outcome"] == "RESOLVED")
         
         report = {
             "benchmark_date": datetime.now().isoformat(),
             "scenarios_tested": len(self.results),
             "average_ttr_seconds": round(avg_ttr, 2),
+            "resolved": f"{resolved}/{n}",
             "results": self.results,
             "cost_estimation": {
-                "avg_tokens_per_request": "~1500 tokens",
-                "gemini_3_flash_cost_per_1k": "$0.000075 (input) + $0.0003 (output)",
-                "estimated_cost_per_incident": "$0.0005 - $0.001"
+                # Measured from usage metadata (or the local estimator in simulation), not hand-written
+                "avg_tokens_per_request": round((prompt_tokens + output_tokens) / calls, 1) if calls else 0,
+                "avg_tokens_per_incident": round((prompt_tokens + output_tokens) / n, 1),
+                "gemini_3_flash_cost_per_1k": f"${INPUT_COST_PER_1K} (input) + ${OUTPUT_COST_PER_1K} (output)",
+                "estimated_cost_per_incident": f"${cost / n:.6f}"
             }
         }
         
@@ -75,7 +105,8 @@ class SysMindBenchmark:
         
         print(f"\n📈 Benchmark Report Generated: {filename}")
         print(f"   Average TTR: {report['average_ttr_seconds']}s")
-        print(f"   Scenarios: {report['scenarios_tested']}")
+        print(f"   Scenarios: {report['scenarios_tested']} ({report['resolved']} resolved)")
+        print(f"   Avg Tokens/Incident: {report['cost_estimation']['avg_tokens_per_incident']}")
         print(f"   Est. Cost/Incident: {report['cost_estimation']['estimated_cost_per_incident']}")
 
 
@@ -1,4 +1,5 @@
 import subprocess
+import shlex
 import time
 import sys
 import argparse
@@ -6,6 +7,7 @@ from datetime import datetime
 
 import os
 from dotenv import load_dotenv
+from backend.transport.docker_api import get_transport, TransportError
 
 # Load env vars first
 load_dotenv()
@@ -15,11 +17,12 @@ TARGET = os.getenv("TARGET_CONTAINER", "sysmind-target")
 
 def check_target_running():
     """Ensure target container is running."""
-    res = subprocess.run(
-        f"docker inspect -f '{{{{.State.Running}}}}' {TARGET}", 
-        shell=True, capture_output=True, text=True
-    )
-    if "true" not in res.stdout.lower():
+    try:
+        running = get_transport().is_running(TARGET)
+    except TransportError as e:
+        print(f"[ERROR] Docker unreachable: {e}")
+        sys.exit(1)
+    if not running:
         print(f"[ERROR] Target container '{TARGET}' is not running. Start it first!")
         sys.exit(1)
 
@@ -31,15 +34,15 @@ def inject_cpu_stress():
     # --vm-bytes 80%: Consume 80% of available memory
     # --vm-hang 0: Continuous pressure
     # --timeout 15m: Run for 15 minutes or until killed
-    cmd = f"docker exec -d {TARGET} stress-ng --vm 1 --vm-bytes 80% --vm-hang 0 --timeout 15m"
-    subprocess.run(cmd, shell=True)
+    cmd = ["docker", "exec", "-d", TARGET, "stress-ng", "--vm", "1", "--vm-bytes", "80%", "--vm-hang", "0", "--timeout", "15m"]
+    subprocess.run(cmd)
     
     # Grand Prize: Dynamic Timestamping for live demos
     current_date = datetime.now().strftime("%b %d %H:%M:%S")
     
     # Add a hint log with CURRENT timestamp
     oom_hint = f"{current_date} server kernel: [1234.56] lowmemorykiller: Killing 'stress-ng-vm' (1234), adj 0, caused by 'high-load-scenario'"
-    subprocess.run(f"docker exec {TARGET} bash -c 'echo \"{oom_hint}\" >> /var/log/syslog'", shell=True)
+    subprocess.run(["docker", "exec", TARGET, "bash", "-c", f"echo {shlex.quote(oom_hint)} >> /var/log/syslog"])
     
     print("[OK] stress-ng initiated. RAM usage should spike to >80%.")
     print("OBJECTIVE: Agent must identify 'stress-ng-vm' utilizing high resources and terminate it.")
@@ -50,8 +53,8 @@ def inject_unknown_process():
     
     # 1. Start a "rogue" python server on port 8080
     # This simulates a zombie process or a developer testing in prod that forgot to kill a process
-    cmd = f"docker exec -d {TARGET} python3 -m http.server 8080"
-    subprocess.run(cmd, shell=True)
+    cmd = ["docker", "exec", "-d", TARGET, "python3", "-m", "http.server", "8080"]
+    subprocess.run(cmd)
     
     print("[OK] Rogue 'python3' process started on port 8080.")
     print("OBJECTIVE: Agent must detect port 8080 is occupied, find the PID, and kill the zombie process.")
@@ -5,9 +5,9 @@
 import os
 import sys
 import shutil
-import subprocess
 from rich.console import Console
 from dotenv import load_dotenv
+from backend.transport.docker_api import get_transport
 
 load_dotenv()
 
@@ -28,16 +28,26 @@ def check():
     else:
         console.print("[red]✘[/red] Docker CLI missing!")
 
+    transport = get_transport()
+    if transport.api_available:
+        console.print(f"[green]✔[/green] Docker Engine API reachable ({transport.base_url}).")
+    else:
+        console.print("[yellow]![/yellow] Docker Engine API unreachable. Falling back to the Docker CLI.")
+
     # 3. Check Target Container
+    target = os.environ.get("TARGET_CONTAINER", "sysmind-target")
     try:
-        res = subprocess.run("docker inspect -f '{{.State.Running}}' sysmind-target", shell=True, capture_output=True, text=True)
-        if "true" in res.stdout.lower():
-            console.print("[green]✔[/green] Target Container (sysmind-target) is RUNNING.")
+        if transport.is_running(target):
+            console.print(f"[green]✔[/green] Target Container ({target}) is RUNNING.")
         else:
             console.print("[red]✘[/red] Target Container is DOWN! Run 'docker-compose up -d'.")
     except Exception as e:
         console.print(f"[red]✘[/red] Docker check failed: {e}")
 
+    # Per-call transport latency (Engine API vs CLI fallback)
+    for op, stat in transport.latency_report().items():
+        console.print(f"[dim]  {op}: {stat['last_ms']} ms[/dim]")
+
     # 4. Check Generated Files
     if os.path.exists("dashboard_cpu_spike.png"):
         console.print("[green]✔[/green] Dashboard image ready.")
@@ -1,7 +1,6 @@
 import os
 import sys
 import io
-import subprocess
 from dotenv import load_dotenv
 
 
@@ -13,6 +12,30 @@ if PROJECT_ROOT not in sys.path:
 from rich import print
 from backend.core.agent import SysMindAgent
 
+def build_objective(agent: SysMindAgent) -> str:
+    """
+    Grand Prize: Real-Time Telemetry Injection.
+    Instead of just a text prompt, we feed the agent LIVE metrics.
+    """
+    metrics = "N/A"
+    try:
+        # Background sampler (SYSMIND_METRICS_SAMPLER=true): recent window instead of a ~2s one-off snapshot
+        if agent.sampler is not None and agent.sampler.wait_first(timeout=3):
+            metrics = agent.sampler.line(seconds=30)
+        else:
+            metrics = agent.transport.stats_line(agent.target_name)
+    except: pass
+
+    return (
+        f"ALERT: Operations dashboard reports critical instability. "
+        f"Analyze system state. Dashboard shows CPU spike. "
+        f"LIVE METRICS [{agent.target_name}]: {metrics}. "
+        f"Identify root cause and mitigate. "
+        "STEP 1: Analyze the visual dashboard 'dashboard_cpu_spike.png' to identify the anomaly type and timing. "
+        "STEP 2: Verify the root cause in the system (check processes or logs). "
+        "STEP 3: Remediate the issue safely and verify the system is stable."
+    )
+
 def main():
     """
     SysMind Agent Runner (Titanium Edition).
@@ -44,28 +67,7 @@ def main():
         if agent.connect():
             # GRAND PRIZE SCENARIO: Multimodal SRE + Precision Remediation
             # We assume 'dashboard_cpu_spike.png' has been generated by the chaos test setup
-            # Grand Prize: Real-Time Telemetry Injection
-            # Instead of just a text prompt, we feed the agent LIVE metrics
-            metrics = "N/A"
-            try:
-                res = subprocess.run(
-                    ["docker", "stats", agent.target_name, "--no-stream", "--format", "{{.CPUPerc}} / {{.MemPerc}}"], 
-                    capture_output=True, text=True
-                )
-                metrics = res.stdout.strip()
-            except: pass
-
-            objective = (
-                f"ALERT: Operations dashboard reports critical instability. "
-                f"Analyze system state. Dashboard shows CPU spike. "
-                f"LIVE METRICS [{agent.target_name}]: {metrics}. "
-                f"Identify root cause and mitigate. "
-                "STEP 1: Analyze the visual dashboard 'dashboard_cpu_spike.png' to identify the anomaly type and timing. "
-                "STEP 2: Verify the root cause in the system (check processes or logs). "
-                "STEP 3: Remediate the issue safely and verify the system is stable."
-            )
-            
-            agent.ooda_loop(objective)
+            agent.ooda_loop(build_objective(agent))
         else:
             print("[FAIL] Aborting: Target environment unreachable.")
             
@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+import argparse
+from dotenv import load_dotenv
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from rich import print
+from backend.core.fleet import FleetRunner
+from backend.core.ratelimit import QuotaBudget
+from run_agent import build_objective
+
+def main():
+    """
+    SysMind Fleet Runner.
+    Runs one OODA mission per target container in a bounded worker pool.
+    """
+    parser = argparse.ArgumentParser(description="SysMind Fleet Mode")
+    parser.add_argument("targets", nargs="*", help="Container names")
+    parser.add_argument("--label", help="Docker label selector (e.g. 'sysmind.managed=true')")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("SYSMIND_FLEET_WORKERS", "4")))
+    parser.add_argument("--max-cycles", type=int, default=10)
+    parser.add_argument("--max-llm-calls", type=int, default=None, help="Shared LLM call budget for the whole fleet")
+    parser.add_argument("--max-inflight", type=int, default=None, help="Max concurrent LLM requests across workers")
+    parser.add_argument("--auto-approve", action="store_true", help="Approve destructive actions without a human (DANGEROUS)")
+    parser.add_argument("--report-dir", default="fleet_reports")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    targets = FleetRunner.resolve_targets(args.targets, args.label)
+    if not targets:
+        print("[FAIL] No targets given (pass container names or --label).")
+        sys.exit(1)
+
+    runner = FleetRunner(
+        targets,
+        objective_builder=build_objective,
+        workers=args.workers,
+        max_cycles=args.max_cycles,
+        report_root=args.report_dir,
+        budget=QuotaBudget(max_calls=args.max_llm_calls, max_inflight=args.max_inflight),
+        auto_approve=args.auto_approve,
+    )
+    summary = runner.run()
+
+    os.makedirs(args.report_dir, exist_ok=True)
+    summary_file = os.path.join(args.report_dir, "fleet_summary.json")
+    with open(summary_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"[bold green]Fleet finished:[/bold green] {summary['resolved']}/{summary['targets']} resolved, "
+          f"{summary['incidents_per_minute']} incidents/min, {summary['llm_calls']} LLM calls.")
+    print(f"[FILE] Fleet Summary: [cyan]{summary_file}[/cyan]")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n[bold yellow]👋 Fleet run interrupted by user.[/bold yellow]")
+        sys.exit(0)
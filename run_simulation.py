@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import argparse
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from rich import print
+from backend.simulation.runner import SimulationRunner
+from backend.simulation.scripted import load_scenarios
+from backend.simulation.gemini_stub import GeminiStub
+from backend.core.agent import create_client
+
+def main():
+    """
+    SysMind Offline Load Runner.
+    Replays scripted scenarios against in-memory targets: no Docker, no network, no API quota.
+    """
+    parser = argparse.ArgumentParser(description="SysMind Scenario Simulation")
+    parser.add_argument("--scenario", action="append", help="Scenario id (repeatable, default: all)")
+    parser.add_argument("--missions", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-cycles", type=int, default=10)
+    parser.add_argument("--report-dir", default="sim_reports")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--list", action="store_true", help="List available scenarios and exit")
+    parser.add_argument("--stub", action="store_true", help="Drive missions through the real model path against a local Gemini stub")
+    parser.add_argument("--stub-latency", default="lognormal:400:0.4", help="fixed:MS | uniform:LO:HI | normal:MEAN:STD | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--stub-429", type=float, default=0.0, help="Fraction of stub requests answered with 429")
+    parser.add_argument("--stub-empty", type=float, default=0.0, help="Fraction of stub responses with an empty candidate")
+    args = parser.parse_args()
+
+    if args.list:
+        for sid, scenario in load_scenarios().items():
+            print(f"[cyan]{sid}[/cyan]: {scenario['objective']}")
+        return
+
+    stub = client = None
+    if args.stub:
+        stub = GeminiStub(latency=args.stub_latency, rate_429=args.stub_429, empty_rate=args.stub_empty, seed=args.seed)
+        os.environ["GEMINI_BASE_URL"] = stub.start()
+        client = create_client(os.environ.get("GEMINI_API_KEY"))
+        print(f"[STUB] Gemini stand-in on [cyan]{stub.base_url}[/cyan]")
+
+    try:
+        runner = SimulationRunner(
+            scenario_ids=args.scenario,
+            missions=args.missions,
+            workers=args.workers,
+            max_cycles=args.max_cycles,
+            report_root=args.report_dir,
+            seed=args.seed,
+            client=client,
+        )
+    except ValueError as e:
+        print(f"[FAIL] {e}")
+        sys.exit(1)
+
+    summary = runner.run()
+    if stub:
+        summary["stub"] = dict(stub.stats)
+        stub.stop()
+    summary_file = os.path.join(args.report_dir, "sim_summary.json")
+    with open(summary_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"[bold green]Simulation finished:[/bold green] {summary['passed']}/{summary['missions']} passed, "
+          f"{summary['missions_per_minute']} missions/min (p50 {summary['mission_ms_p50']} ms, p95 {summary['mission_ms_p95']} ms).")
+    print(f"[FILE] Simulation Summary: [cyan]{summary_file}[/cyan]")
+    sys.exit(0 if summary["passed"] == summary["missions"] else 1)
+
+if __name__ == "__main__":
+    main()
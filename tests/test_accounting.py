@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.accounting import TokenLedger, HistoryCompactor
+from backend.core.agent import SysMindAgent
+from backend.core.ratelimit import BudgetExhausted
+from backend.simulation.runner import QuietConsole
+from backend.simulation.scripted import build_backends
+
+
+class RecordingConsole(QuietConsole):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def print(self, *objects, **kwargs):
+        self.lines.append(" ".join(str(o) for o in objects))
+
+
+class TestTokenLedger(unittest.TestCase):
+    def test_usage_metadata_preferred(self):
+        ledger = TokenLedger()
+        usage = SimpleNamespace(prompt_token_count=1200, candidates_token_count=80, total_token_count=1350)
+        ledger.record_usage(1, SimpleNamespace(usage_metadata=usage, candidates=[]), est_prompt_tokens=999, latency_s=0.5)
+        part = SimpleNamespace(text="a" * 40, function_call=None)
+        response = SimpleNamespace(usage_metadata=None, candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+        ledger.record_usage(2, response, est_prompt_tokens=300, latency_s=0.25)
+        totals = ledger.totals()
+        # Thinking tokens count as output (total - prompt)
+        self.assertEqual(totals["prompt_tokens"], 1500)
+        self.assertEqual(totals["output_tokens"], 150 + 10)
+        self.assertEqual(totals["estimated_calls"], 1)
+        self.assertAlmostEqual(totals["llm_latency_s"], 0.75)
+
+    def test_mission_budget(self):
+        ledger = TokenLedger(mission_budget=1000)
+        ledger.record(1, 600, 100, 0.1)
+        ledger.check()
+        ledger.record(2, 300, 50, 0.1)
+        with self.assertRaises(BudgetExhausted):
+            ledger.check()
+
+
+class TestHistoryCompactor(unittest.TestCase):
+    def test_older_steps_folded_not_dropped(self):
+        compactor = HistoryCompactor(token_budget=200, keep_recent=2)
+        history = [{"step": i, "tool": "list_processes", "args": {}, "result": f"result {i}"} for i in range(1, 6)]
+        self.assertTrue(compactor.needs_compaction(180))
+        self.assertEqual(compactor.compact(history), 3)
+        self.assertEqual([h["step"] for h in compactor.recent(history)], [4, 5])
+        summary = compactor.summary_text()
+        self.assertIn("Step 1: list_processes({}) -> result 1", summary)
+        # Nothing new to fold
+        self.assertEqual(compactor.compact(history), 0)
+
+    def test_summary_is_capped(self):
+        compactor = HistoryCompactor(token_budget=100, keep_recent=0)
+        history = [{"step": i, "tool": "read_log", "args": {}, "result": "x" * 100} for i in range(20)]
+        compactor.compact(history)
+        self.assertGreater(compactor.omitted, 0)
+        self.assertIn("earlier steps omitted", compactor.summary_text())
+
+
+class TestMissionBudgetHalt(unittest.TestCase):
+    def test_quota_halt_is_not_reported_as_max_cycles(self):
+        scenario = {"script": [{"tool": "list_processes"}] * 3,
+                    "target": {"initial_state": "incident", "commands": [{"match": "^ps", "outputs": {"*": "PID COMMAND"}}]}}
+        brain, target = build_backends(scenario, seed=1)
+        console = RecordingConsole()
+        with tempfile.TemporaryDirectory() as root, mock.patch.dict(os.environ, {"SYSMIND_MISSION_TOKEN_BUDGET": "1"}):
+            agent = SysMindAgent(console=console, report_dir=root, interactive=False, transport=target, brain=brain)
+            agent.simulation_mode = True
+            agent.kb_file = os.path.join(root, "kb.json")
+            agent.connect()
+            self.assertEqual(agent.ooda_loop("check", max_cycles=3), "HALTED/FAILED")
+        halts = [line for line in console.lines if "MISSION HALTED" in line]
+        self.assertEqual(len(halts), 1)
+        self.assertIn("LLM budget exhausted", halts[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from backend.core.agent import SysMindAgent
+from backend.core.anomaly import analyze_series
+from backend.simulation.runner import QuietConsole
+from backend.tools.metrics import MetricsTools
+from backend.transport.capture import BoundedCapture
+
+
+def proc_samples(cpu_busy: list, mem_used_kb: list, start: float = 1700000000.0, interval: float = 0.5) -> str:
+    """Sampling loop output for per-interval CPU busy fractions and used memory."""
+    lines, user, idle = [], 0, 0
+    for i, (busy, used) in enumerate(zip(cpu_busy, mem_used_kb)):
+        user += round(busy * 100)
+        idle += round((1 - busy) * 100)
+        lines.append(f"S {start + i * interval:.9f} cpu  {user} 0 0 {idle} 0 0 0 0 0 0 M 8000000 {8000000 - used} IO {i * 8} 0")
+    return "\n".join(lines)
+
+
+class FakeSampler:
+    """Transport whose every exec returns the same sampling output."""
+
+    def __init__(self, output: str):
+        self.output = output
+
+    def exec(self, name, command, timeout=10, max_bytes=None):
+        stdout = BoundedCapture(max_bytes)
+        stdout.feed(self.output.encode("utf-8"))
+        return 0, stdout, BoundedCapture(max_bytes)
+
+    def is_running(self, name):
+        return True
+
+
+class TestAnomalyDetection(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(3)
+        self.t = 1700000000.0 + np.arange(40) * 0.5
+
+    def test_spike_onset_and_magnitude(self):
+        y = 20 + self.rng.normal(0, 2, 40)
+        y[25:] = 97 + self.rng.normal(0, 1, 15)
+        finding = analyze_series(self.t, y, "cpu")
+        self.assertEqual(finding["kind"], "spike")
+        self.assertEqual(finding["onset"], self.t[25])
+        self.assertAlmostEqual(finding["magnitude"], 77, delta=3)
+
+    def test_leak_is_not_a_spike(self):
+        y = 40 + np.r_[np.zeros(10), np.arange(30) * 0.5] + self.rng.normal(0, 0.2, 40)
+        finding = analyze_series(self.t, y, "mem")
+        self.assertEqual(finding["kind"], "leak")
+        self.assertAlmostEqual(finding["onset"], self.t[10], delta=1.0)
+        self.assertGreater(finding["slope_per_min"], 0)
+
+    def test_short_ramp(self):
+        # Four samples leave three differences: too few to split, growth starts at the first sample
+        finding = analyze_series([0, 60, 120, 180], [10, 20, 30, 40], "mem")
+        self.assertEqual(finding["kind"], "leak")
+        self.assertEqual(finding["onset"], 0.0)
+
+    def test_noise_is_stable(self):
+        self.assertEqual(analyze_series(self.t, 30 + self.rng.normal(0, 3, 40), "cpu")["kind"], "stable")
+
+    def test_parse_series(self):
+        series = MetricsTools.parse_series(proc_samples([0.1, 0.2, 0.9], [1000, 2000, 4000]) + "\ngarbage line")
+        self.assertEqual(len(series["t"]), 2)
+        self.assertAlmostEqual(series["cpu"][1], 90.0)
+        self.assertAlmostEqual(series["mem"][1], 0.05)
+        self.assertAlmostEqual(series["io"][0], 8.0)
+
+
+class TestNumericFirst(unittest.TestCase):
+    def test_dashboard_uses_raw_series_instead_of_vision(self):
+        busy = [0.15] * 12 + [0.98] * 8
+        agent = SysMindAgent(console=QuietConsole(), transport=FakeSampler(proc_samples(busy, [2000000] * 20)))
+        agent.persistent_shell = False
+        agent.simulation_mode = False
+        agent._detect_os()
+        result = agent.run_tool("analyze_dashboard", image_path="does-not-exist.png")
+        self.assertIn("[METRICS ANALYSIS]", result)
+        self.assertIn("cpu: SPIKE", result)
+        self.assertEqual(agent.vision_stats["numeric_first"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
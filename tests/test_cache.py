@@ -0,0 +1,108 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.genai import types
+from backend.core import cache
+from backend.core.agent import SysMindAgent
+from backend.core.cache import ResponseCache
+from backend.simulation.runner import QuietConsole
+from backend.simulation.scripted import build_backends
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.now = 1000.0
+        patcher = mock.patch.object(cache.time, "time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make(self, **kwargs):
+        store = ResponseCache(os.path.join(self.tmp.name, "responses.db"), **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_lru_eviction_by_entries_and_bytes(self):
+        store = self.make(max_entries=2)
+        store.put("a", ["A"])
+        self.now += 1
+        store.put("b", ["B"])
+        self.now += 1
+        self.assertEqual(store.get("a"), ["A"])  # "a" is now the most recently used
+        self.now += 1
+        store.put("c", ["C"])
+        self.assertIsNone(store.get("b"))
+        self.assertEqual((store.get("a"), store.get("c")), (["A"], ["C"]))
+        self.assertEqual(store.stats["evicted"], 1)
+
+        small = self.make(max_bytes=40)
+        small.put("x", ["x" * 20])
+        self.now += 1
+        small.put("y", ["y" * 20])  # Both together exceed 40 bytes: the older one goes
+        self.assertIsNone(small.get("x"))
+        self.assertIsNotNone(small.get("y"))
+
+    def test_ttl_expiry(self):
+        store = self.make(ttl=60)
+        store.put("k", ["v"])
+        self.now += 59
+        self.assertEqual(store.get("k"), ["v"])
+        self.now += 2
+        self.assertIsNone(store.get("k"))
+        store.put("other", ["w"])  # Expired rows are purged on the next write
+        self.assertEqual(store.stats["evicted"], 1)
+
+    def test_live_metrics_freshness_window(self):
+        store = self.make(ttl=3600, freshness=30)
+        self.assertEqual(store.max_age_for("OBJECTIVE: check disk"), 3600)
+        max_age = store.max_age_for("LIVE METRICS: CPU 98%")
+        self.assertEqual(max_age, 30)
+        store.put("live", ["answer"])
+        self.now += 20
+        self.assertEqual(store.get("live", max_age=max_age), ["answer"])
+        self.now += 20  # Still within the TTL, but the telemetry is too old
+        self.assertIsNone(store.get("live", max_age=max_age))
+        self.assertIsNone(self.make(freshness=0).max_age_for("live metrics: CPU 98%"))
+
+
+class TextOnlyModels:
+    """Answers every request with the same text-only turn (no function calls)."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, **request):
+        self.calls += 1
+        part = types.Part(text="Let me think about the CPU spike first.")
+        return types.GenerateContentResponse(candidates=[types.Candidate(content=types.Content(role="model", parts=[part]))])
+
+
+class TestMissionCache(unittest.TestCase):
+    def test_thought_is_not_replayed_from_cache(self):
+        models = TextOnlyModels()
+        client = type("Client", (), {"models": models})()
+        _, target = build_backends({"script": [], "target": {"commands": []}}, seed=1)
+        with tempfile.TemporaryDirectory() as root, mock.patch.dict(os.environ, {"SYSMIND_CHAT_SESSION": "false"}):
+            agent = SysMindAgent(client=client, console=QuietConsole(), report_dir=root, interactive=False, transport=target)
+            agent.simulation_mode = False
+            agent.kb_file = os.path.join(root, "kb.json")
+            agent.knowledge = []
+            agent.response_cache = ResponseCache(os.path.join(root, "responses.db"))
+            try:
+                agent.connect()
+                agent.simulation_mode = False
+                agent.ooda_loop("cpu spike", max_cycles=3)
+            finally:
+                agent.response_cache.close()
+        self.assertEqual(models.calls, 3)  # Every cycle asked the model
+        self.assertEqual(agent.response_cache.stats["hits"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.agent import SysMindAgent
+from backend.core.diffing import OutputDiffer
+from backend.simulation.runner import QuietConsole
+from backend.simulation.scripted import build_backends
+
+PS_HEADER = "USER         PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND"
+DAEMONS = [f"root        {100 + i:4d}  0.0  0.2   9000  4000 ?        Ss   09:00   0:00 /usr/sbin/daemon-{i} --foreground" for i in range(12)]
+PS_BEFORE = "\n".join([PS_HEADER, "root        4242 99.1  0.1  10000  2000 ?        R    10:00   5:00 stress-ng --cpu 1"] + DAEMONS)
+PS_AFTER = "\n".join([PS_HEADER] + DAEMONS + ["root        5001  0.0  0.0   7000  1000 ?        R    10:05   0:00 ps aux --sort=-%cpu"])
+
+
+class TestOutputDiffer(unittest.TestCase):
+    def test_first_call_is_shown_in_full(self):
+        self.assertIsNone(OutputDiffer().render("list_processes", {}, PS_BEFORE, 1))
+
+    def test_process_diff(self):
+        differ = OutputDiffer()
+        differ.render("list_processes", {}, PS_BEFORE, 2)
+        diff = differ.render("list_processes", {}, PS_AFTER, 4)
+        self.assertIn("1 new, 1 exited, 12 still listed", diff)
+        self.assertIn("- EXITED root        4242", diff)
+        self.assertIn("+ NEW    root        5001", diff)
+        self.assertIn("vs step 2", diff)
+
+    def test_listener_lines_and_unchanged(self):
+        before = "\n".join(["Netid State Recv-Q Send-Q Local Address:Port Peer Address:Port"] +
+                           [f"tcp LISTEN 0 128 0.0.0.0:{p} 0.0.0.0:*" for p in (22, 80, 443, 5432, 8080)])
+        after = before.replace("tcp LISTEN 0 128 0.0.0.0:8080 0.0.0.0:*\n", "").rsplit("\n", 1)[0]
+        differ = OutputDiffer()
+        differ.render("get_net_stats", {}, before, 1)
+        diff = differ.render("get_net_stats", {}, after, 3)
+        self.assertIn("- tcp LISTEN 0 128 0.0.0.0:8080", diff)
+        self.assertTrue(differ.render("get_net_stats", {}, after, 4).startswith("[UNCHANGED]"))
+        # Other arguments are a different call; errors are never diffed
+        self.assertIsNone(differ.render("check_service", {"service": "nginx"}, "active", 5))
+        self.assertIsNone(differ.render("check_service", {"service": "nginx"}, "Error (3): inactive", 6))
+
+
+class TestMissionDiffs(unittest.TestCase):
+    def scenario(self):
+        return {
+            "script": [{"tool": "list_processes"}, {"tool": "kill_process", "args": {"pid": 4242}},
+                       {"tool": "list_processes"}, {"tool": "mission_complete", "args": {"summary": "Killed 4242."}}],
+            "target": {"initial_state": "incident", "commands": [
+                {"match": "^ps aux", "outputs": {"incident": PS_BEFORE, "resolved": PS_AFTER}},
+                {"match": "^kill -15 4242$", "outputs": {"*": ""}, "transition": "resolved"},
+            ]},
+        }
+
+    def test_verification_sees_diff_and_audit_keeps_output(self):
+        brain, target = build_backends(self.scenario(), seed=5)
+        with tempfile.TemporaryDirectory() as root:
+            agent = SysMindAgent(console=QuietConsole(), report_dir=root, interactive=False, auto_approve=True,
+                                 transport=target, brain=brain)
+            agent.simulation_mode = True
+            agent.kb_file = os.path.join(root, "kb.json")
+            agent.differ = OutputDiffer()
+            agent.connect()
+            self.assertEqual(agent.ooda_loop("cpu spike", max_cycles=6), "RESOLVED")
+            audit = [f for f in os.listdir(root) if f.startswith("audit_")][0]
+            with open(os.path.join(root, audit), encoding="utf-8") as f:
+                history = json.load(f)["history"]
+        ps_steps = [h for h in history if h["tool"] == "list_processes"]
+        self.assertEqual(len(ps_steps), 2)
+        self.assertIn("- EXITED root        4242", ps_steps[1]["result"])
+        self.assertEqual(ps_steps[1]["output"], PS_AFTER)
+        self.assertEqual(agent.mission_metrics["diffs"]["diffed"], 1)
+
+    def test_stats_are_per_mission(self):
+        with tempfile.TemporaryDirectory() as root:
+            agent = SysMindAgent(console=QuietConsole(), report_dir=root, interactive=False, auto_approve=True)
+            agent.simulation_mode = True
+            agent.kb_file = os.path.join(root, "kb.json")
+            agent.differ = OutputDiffer()
+            for _ in range(2):  # One agent reused across missions, as FleetRunner and the simulator do
+                agent.brain, agent.transport = build_backends(self.scenario(), seed=5)
+                agent.connect()
+                self.assertEqual(agent.ooda_loop("cpu spike", max_cycles=6), "RESOLVED")
+                self.assertEqual(agent.mission_metrics["diffs"]["diffed"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+import threading
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rich.console import Console
+
+from backend.core import fleet
+from backend.core.agent import SysMindAgent
+from backend.core.fleet import FleetRunner
+from backend.simulation.runner import QuietConsole
+from backend.simulation.scripted import build_backends
+
+RESOLVING = {
+    "script": [{"tool": "kill_process", "args": {"pid": 4242}},
+               {"tool": "mission_complete", "args": {"summary": "Killed the runaway process.\nDetails."}}],
+    "target": {"initial_state": "incident", "commands": [
+        {"match": "^kill -15 4242$", "outputs": {"*": ""}, "transition": "resolved"},
+    ]},
+}
+IDLE = {"script": [], "target": {"initial_state": "incident", "commands": []}}
+
+
+class TestFleetRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.kb_file = os.path.join(self.tmp.name, "kb.json")
+        self.active, self.peak = 0, 0
+        self.lock = threading.Lock()
+        # No LLM client: every agent runs on its scripted brain
+        env = {k: v for k, v in os.environ.items() if k not in ("GEMINI_API_KEY", "GEMINI_BASE_URL")}
+        patcher = mock.patch.dict(os.environ, env, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_agent(self, target_name, **kwargs):
+        """Stands in for SysMindAgent inside FleetRunner: same agent, scripted backends per target."""
+        brain, target = build_backends(IDLE if target_name == "db-1" else RESOLVING, seed=1, name=target_name)
+        if target_name == "gone-1":
+            target.is_running = lambda name: False
+        agent = SysMindAgent(target_name=target_name, transport=target, brain=brain, **kwargs)
+        agent.console = QuietConsole()
+        agent.simulation_mode = True
+        agent.kb_file = self.kb_file
+        mission = agent.ooda_loop
+
+        def tracked(objective, max_cycles=10):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            try:
+                if target_name == "boom-1":
+                    raise RuntimeError("target exploded")
+                return mission(objective, max_cycles=max_cycles)
+            finally:
+                with self.lock:
+                    self.active -= 1
+
+        agent.ooda_loop = tracked
+        return agent
+
+    def run_fleet(self, targets, workers):
+        runner = FleetRunner(targets, objective_builder=lambda agent: f"fix {agent.target_name}", workers=workers,
+                             max_cycles=3, report_root=self.tmp.name, console=Console(file=io.StringIO()))
+        with mock.patch.object(fleet, "SysMindAgent", side_effect=self.make_agent):
+            return runner, runner.run()
+
+    def test_statuses_are_aggregated_per_target(self):
+        runner, summary = self.run_fleet(["web-1", "web-2", "db-1", "gone-1", "boom-1", "web-1"], workers=2)
+        statuses = {r["target"]: r["status"] for r in summary["results"]}
+        self.assertEqual(summary["targets"], 5)  # Duplicates are dropped
+        self.assertEqual(statuses, {"web-1": "RESOLVED", "web-2": "RESOLVED", "db-1": "HALTED/FAILED",
+                                    "gone-1": "UNREACHABLE", "boom-1": "ERROR: target exploded"})
+        self.assertEqual(summary["resolved"], 2)
+        self.assertEqual({t: r["status"] for t, r in runner.state.items()}, statuses)
+        self.assertTrue(all(r["end"] for r in runner.state.values()))
+        self.assertLessEqual(self.peak, 2)
+
+    def test_concurrent_missions_keep_every_lesson(self):
+        _, summary = self.run_fleet([f"web-{i}" for i in range(4)], workers=4)
+        self.assertEqual(summary["resolved"], 4)
+        with open(self.kb_file, encoding="utf-8") as f:
+            lessons = json.load(f)["lessons"]
+        self.assertEqual([l["lesson"] for l in lessons], ["Killed the runaway process."] * 4)
+
+    def test_knowledge_is_merged_not_overwritten(self):
+        first, second = SysMindAgent(console=QuietConsole()), SysMindAgent(console=QuietConsole())
+        first.kb_file = second.kb_file = self.kb_file
+        first.knowledge, second.knowledge = [], []  # Both loaded before either saved
+        first._save_knowledge("lesson one")
+        second._save_knowledge("lesson two")
+        with open(self.kb_file, encoding="utf-8") as f:
+            self.assertEqual([l["lesson"] for l in json.load(f)["lessons"]], ["lesson one", "lesson two"])
+        self.assertEqual(len(second.knowledge), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
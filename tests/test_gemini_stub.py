@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import json
+import urllib.request
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google import genai
+from google.genai import types
+
+from backend.core.ratelimit import RateLimiter, RetryPolicy
+from backend.simulation.gemini_stub import GeminiStub, parse_latency
+from backend.simulation.scripted import load_scenarios
+
+
+class TestGeminiStub(unittest.TestCase):
+    def setUp(self):
+        self.stub = GeminiStub()
+        self.stub.start()
+        self.client = genai.Client(api_key="stub", http_options=types.HttpOptions(base_url=self.stub.base_url))
+        self.objective = load_scenarios()["cpu-spike"]["objective"]
+
+    def tearDown(self):
+        self.stub.stop()
+
+    def test_scripted_function_calls(self):
+        first = self.client.models.generate_content(model="gemini-2.0-flash", contents=self.objective)
+        self.assertEqual(first.function_calls[0].name, "get_system_stats")
+        self.assertGreater(first.usage_metadata.total_token_count, 0)
+
+        # One acting step in the history: the stub moves on to the next scripted turn (streamed)
+        prompt = self.objective + "\nStep 1: Action=get_system_stats({}) Result=98%\n"
+        chunks = list(self.client.models.generate_content_stream(model="gemini-2.0-flash", contents=prompt))
+        names = [p.function_call.name for c in chunks for p in c.candidates[0].content.parts if p.function_call]
+        self.assertEqual(names, ["list_processes"])
+
+    def test_429_is_retried_after_server_delay(self):
+        self.stub.rate_429, self.stub.retry_delay = 1.0, 0.05
+        limiter = RateLimiter(rpm=0, tpm=0, retry_policy=RetryPolicy(max_retries=2))
+        retries = []
+
+        def call():
+            if retries:
+                self.stub.rate_429 = 0.0
+            return self.client.models.generate_content(model="m", contents=self.objective)
+
+        response = limiter.call(call, on_retry=lambda attempt, delay, e: retries.append((e.code, delay)))
+        self.assertTrue(response.function_calls)
+        self.assertEqual(retries[0][0], 429)
+        self.assertGreaterEqual(retries[0][1], 1.0)  # Retry-After header is honoured (whole seconds)
+
+    def test_empty_candidate_and_stats(self):
+        self.stub.empty_rate = 1.0
+        response = self.client.models.generate_content(model="m", contents=self.objective)
+        self.assertFalse(response.candidates[0].content.parts)
+        with urllib.request.urlopen(self.stub.base_url + "/stats") as r:
+            stats = json.load(r)
+        self.assertEqual(stats["empty"], 1)
+
+    def test_latency_specs(self):
+        import random
+        rng = random.Random(1)
+        self.assertEqual(parse_latency("fixed:250")(rng), 0.25)
+        self.assertTrue(0.1 <= parse_latency("uniform:100:200")(rng) <= 0.2)
+        self.assertGreater(parse_latency("lognormal:300:0.5")(rng), 0)
+        with self.assertRaises(ValueError):
+            parse_latency("pareto:1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,358 @@
+import unittest
+import sys
+import os
+import contextlib
+import io
+import tempfile
+import gzip
+import shutil
+import subprocess
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.cursors import CursorStore
+from backend.tools.logs import load_signatures
+from backend.tools.scripts import logkit
+from generate_massive_log import generate_massive_log
+from test_proc_tools import local_agent
+
+
+def write_log(path, start_minute=0, minutes=30, mode="w"):
+    """One INFO line per second, an ERROR with a stack trace at minute 20, a CRITICAL at 25."""
+    with open(path, mode) as f:
+        for i in range(start_minute * 60, (start_minute + minutes) * 60):
+            stamp = f"2026-01-12 14:{i // 60:02d}:{i % 60:02d}.000"
+            f.write(f"{stamp} [nginx] INFO: Request processed successfully\n")
+            if i == 20 * 60:
+                f.write(f"{stamp} [postgresql] ERROR: Connection pool exhausted\n")
+                f.write("Traceback (most recent call last):\n  File \"pool.py\", line 7, in acquire\n")
+            if i == 25 * 60 + 30:
+                f.write(f"{stamp} [postgresql] CRITICAL: Database deadlock detected\n")
+
+
+class TestLogIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self._index_dir = logkit.INDEX_DIR
+        logkit.INDEX_DIR = os.path.join(self.tmp.name, "idx")
+        self.addCleanup(setattr, logkit, "INDEX_DIR", self._index_dir)
+        self.log = os.path.join(self.tmp.name, "app.log")
+        write_log(self.log)
+
+    def test_time_and_level_query(self):
+        lines = logkit.query(self.log, since="14:20", until="14:25", level="ERROR").splitlines()
+        self.assertTrue(lines[0].startswith(f"[LOG QUERY] {self.log}: 3 matching lines (level>=ERROR, 2026-01-12 14:20:00 -> 2026-01-12 14:25:00)"))
+        # The trace lines belong to the ERROR entry; the CRITICAL at 14:25:30 is outside the window
+        self.assertEqual(lines[2], "1202:2026-01-12 14:20:00.000 [postgresql] ERROR: Connection pool exhausted")
+        self.assertEqual(lines[3], "1203:Traceback (most recent call last):")
+        self.assertIn("CRITICAL", logkit.query(self.log, level="critical"))
+        self.assertIn(": 0 matching lines", logkit.query(self.log, until="14:10", level="WARNING"))
+        first = logkit.query(self.log, since="14:20", limit=2).splitlines()
+        last = logkit.query(self.log, since="14:20", limit=2, newest=True).splitlines()
+        self.assertIn("showing first 2", first[0])
+        self.assertEqual(first[2], "1201:2026-01-12 14:20:00.000 [nginx] INFO: Request processed successfully")
+        self.assertIn("showing last 2", last[0])
+        self.assertEqual(last[3], "1804:2026-01-12 14:29:59.000 [nginx] INFO: Request processed successfully")
+
+    def test_index_is_incremental_and_rebuilt_on_truncation(self):
+        first, added = logkit.load_index(self.log)
+        self.assertEqual(added, os.path.getsize(self.log))
+        write_log(self.log, start_minute=30, minutes=1, mode="a")
+        grown, added = logkit.load_index(self.log)
+        self.assertLess(added, 128 * 1024)
+        self.assertEqual(grown["lines"], first["lines"] + 60)
+        self.assertIn("14:30:59", logkit.query(self.log, since="14:30:59"))
+
+        with open(self.log, "w") as f:  # copytruncate-style rotation
+            f.write("2026-01-13 09:00:00 [cron] ERROR: job failed\n")
+        self.assertEqual(logkit.load_index(self.log)[0]["lines"], 1)
+        self.assertIn("1:2026-01-13 09:00:00 [cron] ERROR: job failed", logkit.query(self.log, level="ERROR"))
+
+    def test_bad_filters(self):
+        with self.assertRaises(logkit.LogKitError):
+            logkit.query(self.log, since="yesterday")
+        with self.assertRaises(logkit.LogKitError):
+            logkit.query(self.log, level="LOUD")
+
+
+class TestLogSummary(unittest.TestCase):
+    def test_miner_merges_variable_tokens(self):
+        miner = logkit.TemplateMiner()
+        a = miner.add(b"Query executed in 37ms")
+        b = miner.add(b"Query executed in 412ms")
+        c = miner.add(b"User alice logged in")
+        d = miner.add(b"User bob logged in")
+        self.assertIs(a, b)
+        self.assertIs(c, d)
+        self.assertEqual(c.text(), "User <*> logged in")
+        self.assertEqual(len(miner.templates), 2)
+        self.assertEqual(logkit.split_entry(b"Jan 12 14:23:01 web-1 sshd[812]: Accepted publickey"),
+                         ("sshd", b"Accepted publickey"))
+
+    def test_needles_surface_verbatim(self):
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "app.log")
+            write_log(log)
+            index_dir, logkit.INDEX_DIR = logkit.INDEX_DIR, os.path.join(root, "idx")
+            try:
+                summary = logkit.summarize(log)
+            finally:
+                logkit.INDEX_DIR = index_dir
+        lines = summary.splitlines()
+        self.assertTrue(lines[0].startswith(f"[LOG SUMMARY] {log}: 1804 lines -> 5 templates"))
+        self.assertIn("Levels: INFO 1800 | ERROR 3 | CRITICAL 1", lines)
+        self.assertIn("  1800 99.8% 14:00:00-14:29:59 INFO [nginx] Request processed successfully", lines)
+        self.assertIn("  1202:2026-01-12 14:20:00.000 [postgresql] ERROR: Connection pool exhausted", lines)
+        self.assertIn("  1535:2026-01-12 14:25:30.000 [postgresql] CRITICAL: Database deadlock detected", lines)
+        self.assertLess(len(summary), 1500)
+
+
+class TestLogsAround(unittest.TestCase):
+    def test_binary_search_across_rotations(self):
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "app.log")
+            write_log(log + ".1", start_minute=0, minutes=20)
+            with open(log + ".1", "ab") as f:
+                f.write(b"x" * 10)  # Unterminated garbage at the rotation boundary
+            write_log(log, start_minute=20, minutes=10)
+            with gzip.open(log + ".2.gz", "wt") as f:
+                f.write("2026-01-12 13:59:59.000 [nginx] INFO: older rotation\n")
+            with open(os.path.join(root, "app.log.bak"), "w") as f:
+                f.write("2026-01-12 14:19:59.500 [nginx] INFO: not part of the rotation set\n")
+            report = logkit.around(log, "14:20:00", window=2, limit=20)
+            empty = logkit.around(log, "2026-01-12 16:00", window=5)
+        lines = report.splitlines()
+        self.assertIn("from 2 file(s) (app.log.1, app.log)", lines[0])
+        self.assertGreater(int(lines[0].split(", ")[-2].split()[0]), 5)  # seeks, not a linear read
+        self.assertEqual(lines[1], f"--- {log}.1")
+        self.assertIn("[-2.0s] 2026-01-12 14:19:58.000", report)
+        self.assertIn("[+0.0s] 2026-01-12 14:20:00.000 [postgresql] ERROR: Connection pool exhausted", report)
+        self.assertIn("[+0.0s] Traceback (most recent call last):", report)
+        self.assertIn("[+2.0s] 2026-01-12 14:20:02.000", report)
+        self.assertNotIn("14:20:03", report)
+        self.assertNotIn("not part of the rotation set", report)
+        self.assertIn("No lines in the window. Files cover 2026-01-12 13:59:59 -> 2026-01-12 14:29:59", empty)
+
+
+class TestLogTail(unittest.TestCase):
+    def read(self, log, cursor):
+        first, _, rest = logkit.tail(log, *cursor, max_bytes=4096).partition("\n")
+        return tuple(int(x) for x in first.split()[1:]), rest
+
+    def test_cursor_follows_appends_rotation_and_truncation(self):
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "app.log")
+            with open(log, "w") as f:
+                f.write("one\ntwo\n")
+            cursor, text = self.read(log, (None, None, None))
+            self.assertEqual(text, "[LOG TAIL] %s: +8 bytes, 2 new lines (first read)\none\ntwo" % log)
+            self.assertIn("no new lines", self.read(log, cursor)[1])
+
+            with open(log, "a") as f:
+                f.write("three\nfour (still being writ")
+            cursor, text = self.read(log, cursor)
+            self.assertTrue(text.endswith("\nthree"))  # The unterminated line waits
+
+            with open(log, "a") as f:
+                f.write("ten)\n")
+            os.rename(log, log + ".1")
+            with open(log, "w") as f:
+                f.write("five\n")
+            cursor, text = self.read(log, cursor)
+            self.assertIn("rotated: rest of app.log.1, then the new file", text)
+            self.assertTrue(text.endswith(f"--- {log}.1\nfour (still being written)\n--- {log}\nfive"))
+
+            with open(log, "w") as f:
+                f.write("six\n")
+            cursor, text = self.read(log, cursor)
+            self.assertIn("truncated (4 < cursor 5 bytes)", text)
+            self.assertTrue(text.endswith("\nsix"))
+            self.assertEqual(cursor[2], 4)
+
+    def test_large_backlog_is_read_in_budgeted_chunks(self):
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "app.log")
+            with open(log, "w") as f:
+                f.write("seed\n")
+            cursor, _ = self.read(log, (None, None, None))
+            write_log(log, minutes=5, mode="a")
+            seen = 0
+            for _ in range(20):
+                cursor, text = self.read(log, cursor)
+                if "no new lines" in text:
+                    break
+                seen += text.count("\n")
+            self.assertEqual(seen, 300)
+            self.assertEqual(cursor[2], os.path.getsize(log))
+
+    def test_line_longer_than_the_budget_is_cut_and_skipped(self):
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "app.log")
+            with open(log, "w") as f:
+                f.write("seed\n")
+            cursor, _ = self.read(log, (None, None, None))
+            with open(log, "a") as f:
+                f.write("x" * 40000 + "\nafter\n")
+            cursor, text = self.read(log, cursor)
+            self.assertLess(len(text), 4096 + 200)
+            self.assertIn(" ... [line cut, 40001 bytes]", text)
+            self.assertEqual(cursor[2], 5 + 40001)
+            cursor, text = self.read(log, cursor)
+            self.assertTrue(text.endswith("\nafter"))
+
+
+class TestLogSearch(unittest.TestCase):
+    def test_rotation_set_merged_in_time_order(self):
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "app.log")
+            write_log(log, start_minute=20, minutes=10)
+            write_log(log + ".1", start_minute=10, minutes=10)
+            with gzip.open(log + ".2.gz", "wt") as f:
+                f.write("2026-01-12 14:05:00.000 [postgresql] ERROR: Connection pool exhausted (gz)\n")
+            if shutil.which("zstd"):
+                with open(log + ".3", "w") as f:
+                    f.write("2026-01-12 13:00:00.000 [postgresql] ERROR: Connection pool exhausted (zst)\n")
+                subprocess.run(["zstd", "-q", "--rm", log + ".3"], check=True)
+            report = logkit.search(log, "pool exhausted", limit=10)
+            capped = logkit.search(os.path.join(root, "app.log*"), "request PROCESSED", ignore_case=True, limit=2)
+        lines = report.splitlines()
+        files = 4 if shutil.which("zstd") else 3
+        self.assertTrue(lines[0].startswith(f"[LOG SEARCH] /pool exhausted/ in {files} files: {files - 1} matches"))
+        hits = [l for l in lines[2:] if not l.startswith("Per file")]
+        self.assertEqual(hits[-1], "app.log:2:2026-01-12 14:20:00.000 [postgresql] ERROR: Connection pool exhausted")
+        self.assertEqual(hits[-2], "app.log.2.gz:1:2026-01-12 14:05:00.000 [postgresql] ERROR: Connection pool exhausted (gz)")
+        if shutil.which("zstd"):
+            self.assertTrue(hits[0].startswith("app.log.3.zst:1:2026-01-12 13:00:00.000"))
+        self.assertIn(": 1200 matches, newest 2 shown", capped)
+        self.assertTrue(capped.endswith("app.log:604:2026-01-12 14:29:59.000 [nginx] INFO: Request processed successfully"))
+
+
+class TestLogSignatures(unittest.TestCase):
+    def test_automaton_reports_overlapping_literals(self):
+        automaton = logkit.AhoCorasick([b"he", b"she", b"his", b"hers"])
+        self.assertEqual(automaton.find(b"ushers"), {0, 1, 3})
+        self.assertEqual(automaton.regex(), b"(?:h(?:e(?:rs)?|is)|she)")
+
+    def test_library_in_one_pass(self):
+        library = {"version": 7, "signatures": [
+            {"id": "pool", "severity": "high", "literals": ["connection pool exhausted"], "hint": "check sessions"},
+            {"id": "pool-any", "literals": ["pool"]},  # Inside the other literal (and in the traceback's pool.py)
+            {"id": "deadlock", "regex": "dead(?:lock|ly embrace)", "anchors": ["dead"]},
+            {"id": "critical", "regex": "\\] CRITICAL:"},
+            {"id": "disk-full", "literals": ["no space left on device"]},
+        ]}
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "app.log")
+            write_log(log)
+            with gzip.open(log + ".1.gz", "wt") as f:
+                f.write("2026-01-12 13:00:00.000 [postgresql] ERROR: CONNECTION POOL EXHAUSTED\n")
+            report = logkit.scan_signatures(log, library)
+            both = logkit.scan_signatures(os.path.join(root, "app.log*"), library, only=["pool"])
+        lines = report.splitlines()
+        self.assertTrue(lines[0].startswith("[SIGNATURES] library v7: 5 signatures over 1 file(s)"))
+        self.assertIn("4 matched", lines[0])
+        self.assertEqual(lines[1], "pool [high] 1 hit, first app.log:1202 (2026-01-12 14:20:00), last app.log:1202 (2026-01-12 14:20:00)")
+        self.assertEqual(lines[3], "  hint: check sessions")
+        self.assertTrue(lines[4].startswith("pool-any [-] 2 hits, first app.log:1202 (2026-01-12 14:20:00), last app.log:1204"))
+        self.assertIn("deadlock [-] 1 hit, first app.log:1535", report)
+        self.assertIn("critical [-] 1 hit, first app.log:1535", report)
+        self.assertEqual(lines[-1], "Not seen: disk-full")
+        self.assertIn("1 signatures over 2 file(s)", both)
+        self.assertIn("pool [high] 2 hits, first app.log.1.gz:1 (2026-01-12 13:00:00), last app.log:1202", both)
+
+    def test_bundled_library_compiles(self):
+        library = load_signatures()
+        self.assertIsInstance(library["version"], int)
+        signatures, automaton, owners, combined = logkit.compile_signatures(library)
+        self.assertEqual(len(signatures), len(library["signatures"]))
+        self.assertIsNone(combined)  # Every bundled regex has anchors: the scan is a single automaton pass
+
+    def test_bundled_library_finds_the_massive_log_needles(self):
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "massive_system.log")
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_massive_log(log, num_lines=2000)
+            report = logkit.scan_signatures(log, load_signatures())
+        self.assertIn("3 matched", report.splitlines()[0])
+        for sid in ("db-pool-exhausted", "deadlock", "upstream-timeout"):
+            self.assertIn(f"{sid} [", report)
+        self.assertIn("[gunicorn] ERROR: Worker timeout (30s) - killing worker pid=15234", report)
+
+
+class TestLogToolsOnTarget(unittest.TestCase):
+    def test_read_log_with_filters_uses_the_kit(self):
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "app.log")
+            write_log(log)
+            os.environ["SYSMIND_LOGKIT_DIR"] = os.path.join(root, "idx")
+            try:
+                agent = local_agent()
+                report = agent.run_tool("read_log", path=log, since="14:25", level="ERROR")
+                grep = agent.run_tool("grep_file", path=log, pattern="pool", level="ERROR")
+                tail = agent.run_tool("read_log", path=log, since="14:20", lines=1)
+                summary = agent.run_tool("summarize_log", path=log, since="14:20")
+                nearby = agent.run_tool("logs_around", path=log, timestamp="14:25:30", window=1)
+                everywhere = agent.run_tool("grep_file", path=os.path.join(root, "*.log"), pattern="deadlock")
+                signatures = agent.run_tool("scan_log_signatures", path=log)
+                unknown = agent.run_tool("scan_log_signatures", path=log, signatures=["nope"])
+            finally:
+                del os.environ["SYSMIND_LOGKIT_DIR"]
+        self.assertIn("Database deadlock detected", report)
+        self.assertIn(": 1 matching lines", report)
+        self.assertIn("Connection pool exhausted", grep)
+        self.assertTrue(tail.endswith("1804:2026-01-12 14:29:59.000 [nginx] INFO: Request processed successfully"))
+        self.assertIn("Database deadlock detected", summary)
+        self.assertIn("[+0.0s] 2026-01-12 14:25:30.000 [postgresql] CRITICAL", nearby)
+        self.assertIn("app.log:1535:2026-01-12 14:25:30.000 [postgresql] CRITICAL", everywhere)
+        self.assertIn("db-pool-exhausted [high] 1 hit, first app.log:1202", signatures)
+        self.assertIn("deadlock [high] 1 hit, first app.log:1535", signatures)
+        self.assertTrue(unknown.startswith("Error: Unknown signature(s) nope."))
+        self.assertTrue(agent._logkit_ready)
+
+
+    def test_since_last_persists_between_agents(self):
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "app.log")
+            with open(log, "w") as f:
+                f.write("2026-01-12 14:00:00 [app] INFO: started\n")
+            store = CursorStore(os.path.join(root, "cursors.json"))
+            first = local_agent()
+            first.log_cursors = store
+            self.assertIn("started", first.run_tool("read_log", path=log, since_last=True))
+            with open(log, "a") as f:
+                f.write("2026-01-12 14:05:00 [app] ERROR: disk full\n")
+            second = local_agent()  # A later mission, reloading the cursor file
+            second.log_cursors = CursorStore(store.path)
+            report = second.run_tool("read_log", path=log, since_last=True)
+        self.assertIn("+43 bytes, 1 new lines", report)
+        self.assertNotIn("started", report)
+        self.assertTrue(report.endswith("ERROR: disk full"))
+
+    def test_since_last_survives_a_line_over_the_output_cap(self):
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "app.log")
+            with open(log, "w") as f:
+                f.write("2026-01-12 14:00:00 [app] INFO: started\n")
+            agent = local_agent()
+            agent.log_cursors = CursorStore(os.path.join(root, "cursors.json"))
+            agent.run_tool("read_log", path=log, since_last=True)
+            with open(log, "a") as f:
+                f.write("2026-01-12 14:01:00 [app] ERROR: " + "y" * 40000 + "\n")
+            huge = agent.run_tool("read_log", path=log, since_last=True)
+            with open(log, "a") as f:
+                f.write("2026-01-12 14:02:00 [app] INFO: recovered\n")
+            later = agent.run_tool("read_log", path=log, since_last=True)
+            # A transport capture header in front of the cursor line is tolerated
+            agent._run_logkit = lambda command, timeout=60: "[CAPTURE] 20.0KB, 3 lines total\nCURSOR 1 2 3\n[LOG TAIL] x"
+            captured = agent.run_tool("read_log", path=log, since_last=True)
+            moved = agent.log_cursors.get(agent.target_name, log)
+        self.assertLessEqual(len(huge), agent.output_cap)
+        self.assertIn("[line cut,", huge)
+        self.assertTrue(later.endswith("INFO: recovered"))
+        self.assertEqual(captured, "[CAPTURE] 20.0KB, 3 lines total\n[LOG TAIL] x")
+        self.assertEqual((moved["dev"], moved["ino"], moved["offset"]), (1, 2, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.agent import SysMindAgent
+from backend.core.prefetch import Prefetcher
+from backend.simulation.runner import QuietConsole
+from backend.simulation.scripted import build_backends
+
+
+class TestPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.runs = []
+
+        def runner(command):
+            self.runs.append(command)
+            time.sleep(0.1)
+            return f"out: {command}"
+
+        self.prefetcher = Prefetcher({"list_processes": "ps aux", "check_disk_space": "df -h"}, runner, max_age=5)
+
+    def tearDown(self):
+        self.prefetcher.close()
+
+    def test_hit_served_once(self):
+        self.prefetcher.start()
+        # Still in flight: waiting for it is cheaper than a new round trip
+        self.assertEqual(self.prefetcher.take("list_processes"), "out: ps aux")
+        self.assertIsNone(self.prefetcher.take("list_processes"))
+        self.assertIsNone(self.prefetcher.take("get_net_stats"))
+        report = self.prefetcher.report()
+        self.assertEqual(report["hits"], 1)
+        self.assertEqual(report["misses"], 2)
+
+    def test_fresh_entries_not_restarted(self):
+        self.prefetcher.start()
+        self.prefetcher.start()
+        self.assertEqual(self.prefetcher.report()["started"], 2)
+
+    def test_stale_and_invalidated(self):
+        self.prefetcher.max_age = 0.05
+        self.prefetcher.start()
+        time.sleep(0.2)
+        self.assertIsNone(self.prefetcher.take("list_processes"))
+        self.assertEqual(self.prefetcher.report()["stale"], 1)
+
+        self.prefetcher.max_age = 5
+        self.prefetcher.start()
+        self.prefetcher.invalidate()  # e.g. kill_process ran
+        self.assertIsNone(self.prefetcher.take("check_disk_space"))
+
+
+class TestMissionPrefetchStats(unittest.TestCase):
+    def test_stats_are_per_mission(self):
+        scenario = {
+            "script": [{"tool": "list_processes"}, {"tool": "list_processes"},
+                       {"tool": "mission_complete", "args": {"summary": "Nothing to do."}}],
+            "target": {"initial_state": "incident", "commands": [{"match": "^ps aux", "outputs": {"*": "PID COMMAND"}}]},
+        }
+        with tempfile.TemporaryDirectory() as root:
+            agent = SysMindAgent(console=QuietConsole(), report_dir=root, interactive=False, auto_approve=True)
+            agent.simulation_mode = True
+            agent.kb_file = os.path.join(root, "kb.json")
+            agent.prefetcher = Prefetcher({}, runner=lambda command: "")
+            agent.prefetcher.stats["hits"] = 5  # Left over from an earlier mission of the same agent
+            try:
+                for _ in range(2):
+                    agent.brain, agent.transport = build_backends(scenario, seed=1)
+                    agent.connect()
+                    self.assertEqual(agent.ooda_loop("check", max_cycles=4), "RESOLVED")
+                    prefetch = agent.mission_metrics["prefetch"]
+                    self.assertEqual((prefetch["hits"], prefetch["misses"]), (0, 2))
+            finally:
+                agent.prefetcher.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
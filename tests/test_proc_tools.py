@@ -0,0 +1,121 @@
+import unittest
+import sys
+import os
+import re
+import socket
+import subprocess
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.agent import SysMindAgent
+from backend.simulation.runner import QuietConsole
+from backend.tools.network import NetworkTools
+from backend.tools.process import ProcessTools
+from backend.transport.capture import BoundedCapture
+
+
+class LocalTransport:
+    """Runs target commands in a local bash (this machine's /proc stands in for the container's)."""
+
+    def exec(self, name, command, timeout=10, max_bytes=None):
+        res = subprocess.run(["bash", "-c", command], capture_output=True, timeout=timeout)
+        stdout, stderr = BoundedCapture(max_bytes), BoundedCapture(max_bytes)
+        stdout.feed(res.stdout)
+        stderr.feed(res.stderr)
+        return res.returncode, stdout, stderr
+
+    def is_running(self, name):
+        return True
+
+
+def local_agent() -> SysMindAgent:
+    agent = SysMindAgent(console=QuietConsole(), transport=LocalTransport())
+    agent.persistent_shell = False
+    agent.simulation_mode = False
+    agent._detect_os()
+    return agent
+
+
+class TestProcessSnapshot(unittest.TestCase):
+    def test_format_snapshot(self):
+        output = "4242 98.7 3.1 3 1 R stress-ng stress-ng --cpu 1\n7 0.0 0.0 0 1 I kworker/0:1 \nN 143 0.50\n"
+        table = ProcessTools.format_snapshot(output, "cpu")
+        lines = table.splitlines()
+        self.assertEqual(lines[0], "[PROCESS SNAPSHOT] 143 procs, CPU measured over 0.50s, top 2 by cpu")
+        self.assertEqual(lines[2], "4242 98.7 3.1 3 1 R stress-ng --cpu 1")
+        self.assertEqual(lines[3], "7 0.0 0.0 0 1 I [kworker/0:1]")  # kernel threads have no cmdline
+
+    @unittest.skipUnless(os.path.exists("/proc/self/stat"), "needs Linux /proc")
+    def test_fresh_spike_ranks_first(self):
+        # A multi-line script whose second line looks like a snapshot row must stay on its own row
+        busy = subprocess.Popen([sys.executable, "-c", 'x = """\n4242 99.9 1.0 3 1 R fake\n"""\nwhile True: pass'])
+        try:
+            table = local_agent().run_tool("snapshot_processes", sort_by="cpu", top=3, interval=0.3)
+        finally:
+            busy.kill()
+            busy.wait()
+        rows = table.splitlines()[2:]
+        self.assertEqual(len(rows), 3)
+        pid, cpu = rows[0].split()[:2]
+        self.assertEqual(int(pid), busy.pid)
+        self.assertGreater(float(cpu), 50.0)
+        self.assertFalse(any(row.startswith("4242 ") for row in rows))
+        self.assertIn('x = """ 4242 99.9 1.0 3 1 R fake """ while True: pass', rows[0])
+
+    def test_rejects_unknown_sort_key(self):
+        self.assertTrue(local_agent().run_tool("snapshot_processes", sort_by="age").startswith("Error:"))
+
+
+
+class TestSocketInspection(unittest.TestCase):
+    def test_format_sockets(self):
+        output = ("S tcp 0100007F:1F90 00000000:0000 0A 48213 4242,4243 nginx\n"
+                  "S udp6 00000000000000000000000001000000:0035 00000000000000000000000000000000:0000 07 512 - -\nN 2\n")
+        lines = NetworkTools.format_sockets(output, 8080).splitlines()
+        self.assertEqual(lines[0], "[SOCKETS] 2 matching (state LISTEN, port 8080)")
+        self.assertEqual(lines[2], "tcp 127.0.0.1:8080 0.0.0.0:* LISTEN 4242,4243/nginx")
+        self.assertEqual(lines[3], "udp6 [::1]:53 [::]:* UNCONN -")
+
+    @unittest.skipUnless(os.path.exists("/proc/net/tcp"), "needs Linux /proc")
+    def test_port_owner_in_one_call(self):
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        port = listener.getsockname()[1]
+        try:
+            agent = local_agent()
+            table = agent.run_tool("inspect_sockets", port=port)
+            other = agent.run_tool("inspect_sockets", port=port, state="ESTABLISHED")
+        finally:
+            listener.close()
+        self.assertIn(f"tcp 127.0.0.1:{port} 0.0.0.0:* LISTEN {os.getpid()}/", table)
+        self.assertTrue(other.endswith("No matching sockets."))
+
+    def test_rejects_bad_filters(self):
+        agent = local_agent()
+        self.assertTrue(agent.run_tool("inspect_sockets", state="OPEN").startswith("Error:"))
+        self.assertTrue(agent.run_tool("inspect_sockets", port=70000).startswith("Error:"))
+
+
+class TestReadLogWindow(unittest.TestCase):
+    def test_large_file_window_is_whole_lines_without_a_line_count(self):
+        with tempfile.TemporaryDirectory() as root:
+            log = os.path.join(root, "app.log")
+            with open(log, "w") as f:
+                f.writelines(f"line number {i:05d} with some text\n" for i in range(2000))  # 33 bytes per line
+            agent = local_agent()
+            agent.output_cap = 3072  # 2KB window: 1KB head, 1KB tail
+            window = agent.run_tool("read_log", path=log)
+            agent.output_cap = 1 << 20
+            whole = agent.run_tool("read_log", path=log)
+        lines = window.splitlines()
+        self.assertEqual(lines[0], f"[FILE] {log}: 66000 bytes (head/tail window)")
+        body = [l for l in lines[1:] if not l.startswith("[... TRIMMED")]
+        self.assertTrue(all(re.fullmatch(r"line number \d{5} with some text", l) for l in body))
+        self.assertIn(f"[... TRIMMED {66000 - 33 * len(body)} bytes ...]", window)
+        self.assertTrue(whole.startswith(f"[FILE] {log}: 66000 bytes, 2000 lines\n"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.ratelimit import RateLimiter, RetryPolicy, TokenBucket, QuotaBudget, BudgetExhausted
+
+
+class FakeQuotaError(Exception):
+    code = 429
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_bucket_schedules_instead_of_rejecting(self):
+        """Calls beyond the RPM budget are given a wait, in FIFO order."""
+        bucket = TokenBucket(per_minute=60)  # 1 token/s, burst 60
+        now = time.monotonic()
+        waits = [bucket.reserve(1, now) for _ in range(62)]
+        self.assertEqual(waits[:60], [0.0] * 60)
+        self.assertAlmostEqual(waits[60], 1.0, places=2)
+        self.assertAlmostEqual(waits[61], 2.0, places=2)
+
+    def test_tpm_budget(self):
+        limiter = RateLimiter(rpm=0, tpm=6000)  # 100 tokens/s
+        self.assertEqual(limiter.schedule(6000), 0.0)
+        self.assertAlmostEqual(limiter.schedule(200), 2.0, places=1)
+        metrics = limiter.metrics()
+        self.assertEqual(metrics["calls"], 2)
+        self.assertAlmostEqual(metrics["max_wait_s"], 2.0, places=1)
+
+    def test_retry_after_is_respected(self):
+        error = Exception('429 RESOURCE_EXHAUSTED. {"retryDelay": "7s"}')
+        policy = RetryPolicy(max_delay=60)
+        self.assertEqual(policy.retry_after(error), 7.0)
+        delay = policy.delay(0, error)
+        self.assertTrue(7.0 <= delay <= 7.7)
+
+    def test_bounded_retries(self):
+        limiter = RateLimiter(rpm=0, tpm=0, retry_policy=RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.02))
+        calls = []
+
+        def always_429():
+            calls.append(1)
+            raise FakeQuotaError("429 quota")
+
+        with self.assertRaises(FakeQuotaError):
+            limiter.call(always_429)
+        self.assertEqual(len(calls), 3)  # first attempt + 2 retries, never more
+        self.assertEqual(limiter.metrics()["rate_limited"], 2)
+
+        def not_retryable():
+            calls.append(1)
+            raise ValueError("400 bad request")
+
+        with self.assertRaises(ValueError):
+            limiter.call(not_retryable)
+        self.assertEqual(len(calls), 4)
+
+    def test_429_inside_a_message_is_not_a_rate_limit(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable(FakeQuotaError("quota")))
+        self.assertTrue(policy.is_retryable(Exception("429 RESOURCE_EXHAUSTED")))
+        self.assertFalse(policy.is_retryable(ValueError("invalid pid 4290 on port 8429")))
+
+    def test_quota_budget(self):
+        budget = QuotaBudget(max_calls=1)
+        with budget.slot():
+            pass
+        with self.assertRaises(BudgetExhausted):
+            with budget.slot():
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+import sys
+import os
+import copy
+import json
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.agent import SysMindAgent
+from backend.core.rules import RuleEngine, parse_telemetry, render
+from backend.simulation.runner import QuietConsole
+from backend.simulation.scripted import build_backends
+
+with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend", "simulation", "scenarios.json"), encoding="utf-8") as _f:
+    SCENARIOS = {s["id"]: s for s in json.load(_f)["scenarios"]}
+
+TELEMETRY = """### ps
+  4242 97.5  3.1 stress-ng-vm    stress-ng-vm --vm 1 --vm-bytes 80%
+   311  2.0  1.0 python3         python3 -m http.server 8080
+     1  0.0  0.1 bash            bash
+### ss
+tcp   LISTEN 0      5      0.0.0.0:8080      0.0.0.0:*    users:(("python3",pid=311,fd=3))
+tcp   LISTEN 0      128    [::]:22           [::]:*
+### failed
+● cron.service loaded failed failed Regular background program processing daemon
+"""
+
+
+class TestRuleEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = RuleEngine.from_file()
+        self.telemetry = parse_telemetry(TELEMETRY)
+
+    def test_parse(self):
+        self.assertEqual(self.telemetry["processes"][0]["pid"], 4242)
+        self.assertEqual(self.telemetry["processes"][1]["args"], "python3 -m http.server 8080")
+        self.assertEqual(self.telemetry["listeners"][0], {"proto": "tcp", "address": "0.0.0.0", "port": 8080, "process": "python3", "pid": 311})
+        self.assertIsNone(self.telemetry["listeners"][1]["pid"])
+        self.assertEqual(self.telemetry["failed_units"], ["cron.service"])
+
+    def test_known_signatures(self):
+        findings = {f["rule"]["id"]: f for f in self.engine.evaluate(self.telemetry)}
+        self.assertEqual(set(findings), {"cpu-stress-ng", "rogue-listener-8080", "failed-systemd-unit"})
+        best = self.engine.evaluate(self.telemetry)[0]
+        self.assertTrue(self.engine.is_confident(best))
+        # Typed placeholders: pid stays an int for kill_process
+        self.assertEqual(RuleEngine.remediation(best), ("kill_process", {"pid": 4242, "force": True}))
+        self.assertEqual(RuleEngine.remediation(findings["failed-systemd-unit"]), ("restart_service", {"service": "cron.service"}))
+        self.assertIn("PID 4242", RuleEngine.summary(best))
+
+    def test_unknown_owner_is_low_confidence(self):
+        telemetry = parse_telemetry("### ss\ntcp LISTEN 0 5 0.0.0.0:8080 0.0.0.0:*\n")
+        finding = self.engine.evaluate(telemetry)[0]
+        self.assertEqual(finding["rule"]["id"], "rogue-listener-8080")
+        self.assertFalse(self.engine.is_confident(finding))
+
+    def test_rules_must_relate_to_the_objective(self):
+        ids = lambda objective: [f["rule"]["id"] for f in self.engine.evaluate(self.telemetry, objective=objective)]
+        self.assertEqual(ids("ALERT: CPU spike on web-1"), ["cpu-stress-ng"])
+        self.assertEqual(ids("Port 8080 is blocked"), ["rogue-listener-8080"])
+        self.assertEqual(ids("Find the failure in /var/log/big.log"), [])
+        self.assertFalse(RuleEngine.relates({"id": "no-pattern"}, "CPU spike"))
+
+    def test_destructive_listener_rule_needs_an_allow_list(self):
+        finding = self.engine.evaluate(self.telemetry, only="rogue-listener-8080")[0]
+        self.assertFalse(self.engine.is_confident(finding))  # Would kill whoever owns the port
+        rule = copy.deepcopy(finding["rule"])
+        rule["match"]["allowed_processes"] = ["nginx"]
+        scoped = RuleEngine([rule], min_confidence=self.engine.min_confidence).evaluate(self.telemetry)[0]
+        self.assertTrue(self.engine.is_confident(scoped))
+        self.assertEqual(RuleEngine.remediation(scoped), ("kill_process", {"pid": 311, "force": False}))
+
+    def test_clean_system(self):
+        self.assertEqual(self.engine.evaluate(parse_telemetry("### ps\n 1 0.0 0.1 bash bash\n### ss\n### failed\n")), [])
+        self.assertEqual(render("{a}-{b}", {"a": 1, "b": "x"}), "1-x")
+
+
+class TestFastPath(unittest.TestCase):
+    """Every exit of SysMindAgent._fast_path, driven through a scripted mission."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.dict(os.environ, {"SYSMIND_RULES": "true"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_mission(self, scenario, objective=None, approve=True, max_cycles=4):
+        brain, target = build_backends(scenario, seed=1)
+        agent = SysMindAgent(console=QuietConsole(), report_dir=self.tmp.name, interactive=False,
+                             auto_approve=approve, transport=target, brain=brain)
+        agent.kb_file = os.path.join(self.tmp.name, "kb.json")
+        agent.knowledge = []
+        agent.simulation_mode = True
+        agent.connect()
+        agent.simulation_mode = approve  # Off: destructive commands go through the HITL gate
+        status = agent.ooda_loop(objective or scenario["objective"], max_cycles=max_cycles)
+        return status, agent, target
+
+    def test_resolved_without_the_model(self):
+        status, agent, target = self.run_mission(SCENARIOS["cpu-spike"])
+        self.assertEqual(status, "RESOLVED")
+        self.assertEqual(target.state, "resolved")
+        self.assertEqual(agent.rule_stats, {"decisions": 1, "matched": "cpu-stress-ng", "outcome": "resolved"})
+        self.assertEqual(agent.ledger.totals()["llm_calls"], 0)
+
+    def test_no_match_for_an_unrelated_objective(self):
+        status, agent, target = self.run_mission(SCENARIOS["cpu-spike"], objective="Find the failure in /var/log/big.log", max_cycles=1)
+        self.assertEqual(agent.rule_stats["outcome"], "no_match")
+        self.assertEqual(agent.rule_stats["decisions"], 0)
+        self.assertEqual(target.state, "incident")  # The stress-ng process was left alone
+
+    def test_low_confidence_hands_over_to_the_model(self):
+        status, agent, target = self.run_mission(SCENARIOS["port-hijack"])
+        self.assertEqual(agent.rule_stats["outcome"], "low_confidence")
+        self.assertEqual(agent.rule_stats["decisions"], 0)
+        self.assertIn("rogue-listener-8080", agent._rule_hint)
+        self.assertEqual(status, "RESOLVED")  # Resolved by the (scripted) model, not the rule
+
+    def test_denied_remediation_falls_back(self):
+        status, agent, target = self.run_mission(SCENARIOS["cpu-spike"], approve=False, max_cycles=2)
+        self.assertEqual(agent.rule_stats, {"decisions": 1, "matched": "cpu-stress-ng", "outcome": "denied"})
+        self.assertEqual(target.state, "incident")
+
+    def test_persisting_signature_falls_back(self):
+        scenario = copy.deepcopy(SCENARIOS["cpu-spike"])
+        for command in scenario["target"]["commands"]:
+            command.pop("transition", None)  # kill succeeds but the load comes back
+        status, agent, target = self.run_mission(scenario, max_cycles=5)
+        self.assertEqual(agent.rule_stats, {"decisions": 3, "matched": "cpu-stress-ng", "outcome": "persisted"})
+        self.assertIn("persisted after 3 remediation attempts", agent._rule_hint)
+
+
+if __name__ == '__main__':
+    unittest.main()
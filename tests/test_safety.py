@@ -1,5 +1,11 @@
 import unittest
 import shlex
+import os
+import json
+import tempfile
+from backend.core.agent import SysMindAgent
+from backend.simulation.runner import QuietConsole
+from backend.simulation.scripted import build_backends
 from backend.tools.process import ProcessTools
 
 class TestSafety(unittest.TestCase):
@@ -18,5 +24,37 @@ class TestSafety(unittest.TestCase):
         self.assertIn(expected_part, cmd)
         self.assertNotIn("rm -rf /", cmd.replace(expected_part, "")) # Ensure raw injection is impossible
 
+
+class TestHumanApproval(unittest.TestCase):
+    def test_denied_high_risk_action_aborts_the_mission(self):
+        """A denied red-button action ends the mission like any other outcome: status, audit, done event."""
+        scenario = {
+            "script": [{"tool": "THOUGHT", "args": {"text": "RISK_ANALYSIS: HIGH - kills a database. THOUGHT: kill 4242"}},
+                       {"tool": "kill_process", "args": {"pid": 4242, "force": True}}],
+            "target": {"initial_state": "incident", "commands": [
+                {"match": "^kill", "outputs": {"*": ""}, "transition": "resolved"},
+            ]},
+        }
+        brain, target = build_backends(scenario, seed=3)
+        events = []
+        with tempfile.TemporaryDirectory() as root:
+            agent = SysMindAgent(console=QuietConsole(), report_dir=root, interactive=False, auto_approve=False,
+                                 transport=target, brain=brain)
+            agent.on_event = lambda t, e, **d: events.append((e, d))
+            agent.kb_file = os.path.join(root, "kb.json")
+            agent.connect()
+            agent.simulation_mode = False  # The approval gate is skipped in simulation mode
+            status = agent.ooda_loop("db latency", max_cycles=3)
+            audits = [f for f in os.listdir(root) if f.startswith("audit_")]
+            with open(os.path.join(root, audits[0]), encoding="utf-8") as f:
+                audit = json.load(f)
+        self.assertEqual(status, "ABORTED")
+        self.assertEqual(audit["status"], "ABORTED")
+        self.assertIn("aborted by human operator", audit["summary"])
+        self.assertIn("metrics", audit)
+        self.assertEqual(events[-1], ("done", {"status": "ABORTED", "summary": audit["summary"]}))
+        self.assertEqual(target.state, "incident")  # The kill never ran
+
+
 if __name__ == '__main__':
     unittest.main()
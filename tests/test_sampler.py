@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+import time
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.agent import SysMindAgent
+from backend.core.sampler import MetricsRing, MetricsSampler, release_sampler, sampler_from_env
+from backend.simulation.runner import QuietConsole
+
+
+class TestMetricsRing(unittest.TestCase):
+    def test_wraparound_keeps_newest_in_order(self):
+        ring = MetricsRing(capacity=5)
+        for i in range(8):
+            ring.append(1000.0 + i, {"cpu": i * 10})
+        series = ring.window()
+        self.assertEqual(len(ring), 5)
+        self.assertEqual(list(series["t"]), [1003.0, 1004.0, 1005.0, 1006.0, 1007.0])
+        self.assertEqual(list(ring.window(2.5, now=1007.0)["cpu"]), [50.0, 60.0, 70.0])
+
+    def test_windowed_stats(self):
+        ring = MetricsRing(capacity=100)
+        now = time.time()
+        for i in range(100):
+            ring.append(now - 99 + i, {"cpu": float(i), "mem": 50.0})
+        stats = ring.query(seconds=10)
+        cpu = stats["fields"]["cpu"]
+        self.assertEqual(stats["samples"], 10)  # the newest 10 samples (90..99)
+        self.assertEqual((cpu["min"], cpu["max"], cpu["last"]), (90.0, 99.0, 99.0))
+        self.assertAlmostEqual(cpu["p50"], 94.5)
+
+
+class TestSampler(unittest.TestCase):
+    def test_counters_become_rates(self):
+        sent = iter([0, 1024 * 100, 1024 * 300])
+        sampler = MetricsSampler(lambda: {"cpu_percent": 12.0, "mem_percent": 40.0, "net_rx_bytes": next(sent)}, interval=0.1)
+        stored = []
+        for _ in range(3):
+            stored.append(sampler.sample_once())
+            time.sleep(0.05)
+        rates = sampler.ring.window()["net_rx"]
+        self.assertEqual(stored, [False, True, True])  # The first sample is only the counters' baseline
+        self.assertEqual(len(rates), 2)
+        self.assertGreater(rates[1], rates[0])  # 200 KB in the same ~50ms beats 100 KB
+
+    def test_background_thread_and_tool(self):
+        sampler = MetricsSampler(lambda: {"cpu_percent": 97.0, "mem_percent": 20.0}, interval=0.01, name="web-1").start()
+        try:
+            self.assertTrue(sampler.wait_first(1))
+            time.sleep(0.1)
+        finally:
+            sampler.stop()
+        self.assertFalse(sampler.running())
+
+        agent = SysMindAgent(target_name="web-1", console=QuietConsole())
+        self.assertTrue(agent.run_tool("get_metrics").startswith("Error:"))
+        agent.sampler = sampler
+        report = agent.run_tool("get_metrics", window=60, metrics=["cpu"])
+        self.assertIn("[METRICS] web-1", report)
+        self.assertIn("97.0", report)
+        self.assertNotIn("mem", report)
+        self.assertIn("97.00%", sampler.line())
+
+    def test_shared_sampler_stops_with_its_last_agent(self):
+        class StatsTransport:
+            def stats(self, name):
+                return {"cpu_percent": 5.0, "mem_percent": 10.0}
+
+        with mock.patch.dict(os.environ, {"SYSMIND_METRICS_SAMPLER": "true", "SYSMIND_METRICS_INTERVAL": "0.01"}):
+            first = sampler_from_env(StatsTransport(), "web-9")
+            second = sampler_from_env(StatsTransport(), "web-9")
+        self.assertIs(first, second)
+        agent = SysMindAgent(target_name="web-9", console=QuietConsole())
+        agent.sampler = second
+        agent.close()
+        self.assertIsNone(agent.sampler)
+        self.assertTrue(first.running())  # Another agent still holds it
+        release_sampler(first)
+        self.assertFalse(first.running())
+
+
+if __name__ == '__main__':
+    unittest.main()
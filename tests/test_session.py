@@ -0,0 +1,141 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core import agent as agent_module
+from backend.core.accounting import HistoryCompactor
+from backend.core.agent import SysMindAgent
+from backend.core.session import ChatSession
+from backend.simulation.runner import QuietConsole
+from backend.simulation.scripted import build_backends
+
+
+class TestChatSession(unittest.TestCase):
+    def test_turns_alternate(self):
+        session = ChatSession("Fix CPU spike", "[KNOWLEDGE BASE] Past Lessons:\n- kill stress-ng")
+        calls = [("list_processes", {}), ("get_net_stats", {})]
+        session.add_model(ChatSession.content_from_calls(calls))
+        session.add_function_result("list_processes", "root 42 stress-ng")
+        session.add_function_result("get_net_stats", "LISTEN 0.0.0.0:22")
+
+        roles = [c.role for c in session.contents]
+        self.assertEqual(roles, ["user", "model", "user"])
+        # Both responses answer the same model turn
+        self.assertEqual(len(session.contents[2].parts), 2)
+
+        session.add_model(ChatSession.content_from_calls([("THOUGHT", "Analyzing...")]))
+        session.ensure_user_turn()
+        self.assertEqual(session.contents[-1].role, "user")
+
+    def test_render_keeps_full_history(self):
+        session = ChatSession("Audit")
+        for i in range(8):
+            session.add_model(ChatSession.content_from_calls([("check_service", {"service": f"svc{i}"})]))
+            session.add_function_result("check_service", f"result {i}")
+        text = ChatSession.render(session.contents)
+        self.assertIn("OBJECTIVE: Audit", text)
+        self.assertIn("HISTORY:", text)
+        # Nothing falls out of a sliding window
+        self.assertIn("Result[check_service]=result 0", text)
+        self.assertIn("Result[check_service]=result 7", text)
+
+    def test_compact_keeps_alternation(self):
+        session = ChatSession("Audit")
+        for i in range(5):
+            session.add_model(ChatSession.content_from_calls([("check_service", {"service": f"svc{i}"})]), step=i + 1)
+            session.add_function_result("check_service", f"result {i}")
+        session.compact(4, "EARLIER STEPS (compacted):\nStep 1: check_service -> result 0\n")
+        self.assertEqual([c.role for c in session.contents], ["user", "model", "user", "model", "user"])
+        self.assertIn("EARLIER STEPS", session.contents[0].parts[0].text)
+        self.assertIn("Result[check_service]=result 4", ChatSession.render(session.contents))
+
+    def test_compact_follows_the_folded_history(self):
+        """THOUGHT-only and multi-call turns: the cut follows history steps, not a count of turns."""
+        session, history = ChatSession("Audit"), []
+        turns = [[("THOUGHT", "Plan first.")],
+                 [("list_processes", {}), ("get_net_stats", {}), ("get_system_stats", {})],
+                 [("THOUGHT", "Nothing obvious.")],
+                 [("check_service", {"service": "nginx"}), ("read_log", {"path": "/var/log/syslog"})],
+                 [("THOUGHT", "Syslog points at nginx.")]]
+        for cycle, calls in enumerate(turns, start=1):
+            session.add_model(ChatSession.content_from_calls(calls), step=cycle)
+            for name, args in calls[1:] if calls[0][0] == "THOUGHT" else calls:
+                session.add_function_result(name, f"{name} output")
+                history.append({"step": cycle, "tool": name, "args": args, "result": f"{name} output"})
+            session.ensure_user_turn()
+        compactor = HistoryCompactor(keep_recent=3)
+        self.assertEqual(compactor.compact(history), 2)  # Two of the three calls of cycle 2
+        session.compact(history[compactor.compacted]["step"], compactor.summary_text())
+        text = ChatSession.render(session.contents)
+        # Cycle 2 holds the first unfolded step: only cycle 1 is dropped, the last 3 turns would lose it
+        self.assertNotIn("Plan first.", text)
+        self.assertIn("Result[get_system_stats]=get_system_stats output", text)
+        self.assertIn("Syslog points at nginx.", text)
+        self.assertEqual(session.model_steps, [2, 3, 4, 5])
+        self.assertEqual([c.role for c in session.contents], ["user"] + ["model", "user"] * 4)
+        # Everything folded: only the opening turn (with the summary) is left
+        history.append({"step": 6, "tool": "check_disk", "args": {}, "result": "ok"})
+        compactor = HistoryCompactor(keep_recent=0)
+        compactor.compact(history)
+        session.compact(7, compactor.summary_text())
+        self.assertEqual(len(session.contents), 1)
+        self.assertIn("Step 6: check_disk", session.contents[0].parts[0].text)
+
+    def test_answer_pending_after_a_failed_tool(self):
+        session = ChatSession("Audit")
+        session.add_model(ChatSession.content_from_calls([("THOUGHT", "Two checks."), ("list_processes", {}), ("get_net_stats", {})]))
+        session.add_function_result("list_processes", "root 42 stress-ng")
+        self.assertEqual(session.answer_pending("Error: boom"), 1)
+        responses = [p.function_response for p in session.contents[-1].parts]
+        self.assertEqual([(r.name, r.response["result"]) for r in responses],
+                         [("list_processes", "root 42 stress-ng"), ("get_net_stats", "Error: boom")])
+        self.assertEqual(session.answer_pending("Error: again"), 0)  # Nothing left to answer
+        self.assertEqual([c.role for c in session.contents], ["user", "model", "user"])
+
+
+class RecordingBrain:
+    """Two calls in the first turn, then records the conversation it is shown and finishes."""
+
+    def __init__(self):
+        self.seen = None
+
+    def decide(self, prompt):
+        if self.seen is None and len(prompt) == 1:
+            return [("list_processes", {}), ("get_system_stats", {})]
+        self.seen = list(prompt)
+        return [("mission_complete", {"summary": "done"})]
+
+
+class TestSessionMission(unittest.TestCase):
+    def test_tool_exception_still_answers_every_call(self):
+        brain = RecordingBrain()
+        _, target = build_backends({"script": [], "target": {"commands": []}}, seed=1)
+        with tempfile.TemporaryDirectory() as root, \
+                mock.patch.dict(os.environ, {"SYSMIND_CHAT_SESSION": "true"}), \
+                mock.patch.object(agent_module.time, "sleep"):
+            agent = SysMindAgent(console=QuietConsole(), report_dir=root, interactive=False, transport=target, brain=brain)
+            agent.kb_file = os.path.join(root, "kb.json")
+            agent.knowledge = []
+            agent.simulation_mode = True
+            agent.connect()
+            tool = agent._timed_tool
+
+            def flaky_tool(name, args):
+                if name == "get_system_stats":
+                    raise RuntimeError("docker went away")
+                return tool(name, args)
+
+            agent._timed_tool = flaky_tool
+            self.assertEqual(agent.ooda_loop("Audit", max_cycles=3), "RESOLVED")
+        self.assertEqual([c.role for c in brain.seen], ["user", "model", "user"])
+        responses = [p.function_response for p in brain.seen[2].parts]
+        self.assertEqual([r.name for r in responses], ["list_processes", "get_system_stats"])
+        self.assertEqual(responses[1].response["result"], "Error: docker went away")
+
+
+if __name__ == '__main__':
+    unittest.main()
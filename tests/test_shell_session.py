@@ -0,0 +1,62 @@
+import unittest
+import subprocess
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.transport.shell import ShellSession, ShellSessionLost
+
+
+class LocalShellSession(ShellSession):
+    """Same framing protocol, but against a local bash instead of docker exec."""
+    def _spawn_command(self):
+        return ["bash", "--noprofile", "--norc"]
+
+
+class TestShellSession(unittest.TestCase):
+    def setUp(self):
+        self.session = LocalShellSession("local", default_timeout=5)
+
+    def tearDown(self):
+        self.session.close()
+
+    def run_text(self, command, **kwargs):
+        code, out, err = self.session.run(command, **kwargs)
+        return code, out.text(), err.text()
+
+    def test_framing_and_exit_codes(self):
+        """stdout, stderr and exit code are delivered separately per command."""
+        self.assertEqual(self.run_text("echo hi; echo oops >&2; exit 3"), (3, "hi\n", "oops\n"))
+        self.assertEqual(self.run_text("printf abc"), (0, "abc", ""))
+        # stdin is detached from the control channel
+        self.assertEqual(self.run_text("cat"), (0, "", ""))
+
+    def test_timeout_restarts_session(self):
+        with self.assertRaises(subprocess.TimeoutExpired):
+            self.session.run("sleep 5", timeout=0.3)
+        self.assertEqual(self.run_text("echo back"), (0, "back\n", ""))
+        self.assertEqual(self.session.restarts, 1)
+
+    def test_dead_session_is_reported_not_replayed(self):
+        with self.assertRaises(ShellSessionLost):
+            self.session.run("kill -9 $$")
+        self.assertEqual(self.run_text("echo again")[1], "again\n")
+
+    def test_large_output_is_bounded(self):
+        """A huge stream keeps only head/tail bytes but reports exact totals."""
+        code, out, err = self.session.run("seq 1 50000; seq 1 5000 >&2", max_bytes=4096)
+        self.assertEqual(code, 0)
+        self.assertLessEqual(len(out.head) + len(out.tail), 4096)
+        self.assertEqual(out.lines, 50000)
+        self.assertEqual(out.total_bytes, len("".join(f"{i}\n" for i in range(1, 50001))))
+        self.assertTrue(out.truncated)
+        text = out.text()
+        self.assertTrue(text.startswith("1\n2\n"))
+        self.assertTrue(text.endswith("49999\n50000\n"))
+        self.assertIn("TRIMMED", text)
+        self.assertEqual(err.lines, 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
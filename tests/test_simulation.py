@@ -0,0 +1,38 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.simulation.runner import SimulationRunner
+from backend.simulation.scripted import build_backends, load_scenarios
+
+
+class TestScriptedBackends(unittest.TestCase):
+    def test_fake_target_state_machine(self):
+        scenario = load_scenarios()["cpu-spike"]
+        brain, target = build_backends(scenario, seed=7)
+        calls = [brain.decide() for _ in range(4)]
+        kill = calls[3][0]
+        self.assertEqual(kill[0], "kill_process")
+        pid = kill[1]["pid"]
+        self.assertIsInstance(pid, int)
+
+        code, out = target.run("ps aux --sort=-%cpu | head -n 15")
+        self.assertIn(f"root     {pid}", out)
+        self.assertEqual(target.run("kill -9 1")[0], 1)  # wrong PID changes nothing
+        self.assertEqual(target.run(f"kill -9 {pid}")[0], 0)
+        self.assertEqual(target.state, "resolved")
+        self.assertNotIn("stress-ng", target.run("ps aux --sort=-%cpu | head -n 15")[1])
+
+    def test_runner_offline(self):
+        with tempfile.TemporaryDirectory() as root:
+            summary = SimulationRunner(missions=30, workers=3, report_root=root).run()
+            self.assertEqual(summary["passed"], 30)
+            self.assertEqual(set(summary["scenarios"]), set(load_scenarios()))
+            self.assertTrue(os.path.exists(os.path.join(root, "knowledge_base.json")))
+
+
+if __name__ == '__main__':
+    unittest.main()
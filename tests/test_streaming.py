@@ -0,0 +1,56 @@
+import unittest
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.genai import types
+from rich.console import Console
+from backend.core.agent import SysMindAgent
+
+
+def chunk(*parts):
+    return types.GenerateContentResponse(candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))])
+
+
+class FakeModels:
+    def generate_content_stream(self, **request):
+        yield chunk(types.Part(text="Checking processes first. "))
+        yield chunk(types.Part.from_function_call(name="list_processes", args={}))
+        time.sleep(0.3)  # the rest of the turn is slow
+        yield chunk(types.Part.from_function_call(name="kill_process", args={"pid": 5}),
+                    types.Part.from_function_call(name="get_net_stats", args={}))
+
+
+class FakeClient:
+    models = FakeModels()
+
+
+class TestStreamingDispatch(unittest.TestCase):
+    def setUp(self):
+        self.agent = SysMindAgent(client=FakeClient(), console=Console(quiet=True), interactive=False)
+        self.started = {}
+        self.agent.run_tool = lambda name, **kw: self.started.setdefault(name, time.time()) and f"out {name}"
+
+    def tearDown(self):
+        self.agent.close()
+
+    def test_read_only_prefix_dispatched_early(self):
+        begin = time.time()
+        response = self.agent._stream_model(est_tokens=100, on_call=self.agent._dispatch_early, model="m", contents="x")
+        finished = time.time()
+
+        names = [p.function_call.name for p in response.candidates[0].content.parts if p.function_call]
+        self.assertEqual(names, ["list_processes", "kill_process", "get_net_stats"])
+        # list_processes ran before the stream finished
+        self.assertLess(self.started["list_processes"] - begin, finished - begin - 0.2)
+        # Destructive call closes the prefix: nothing after it is started early
+        self.assertEqual(self.agent._dispatched[0][0], "list_processes")
+        self.assertEqual(self.agent._dispatched[1:], [None, None])
+        self.assertNotIn("kill_process", self.started)
+        self.assertEqual(self.agent._dispatched[0][3].result()[0], "out list_processes")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import io
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+from backend.core.agent import SysMindAgent
+from backend.core.ratelimit import RateLimiter
+from backend.simulation.gemini_stub import GeminiStub
+from backend.simulation.runner import QuietConsole
+from backend.tools.multimodal import VisionCache, detect_mime, image_digest, prepare_image
+from google import genai
+from google.genai import types
+
+
+def dashboard_png(size=(2400, 1600), border=200) -> bytes:
+    """Flat-colour 'dashboard' with a wide uniform border around the chart."""
+    image = Image.new("RGB", size, (20, 20, 20))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((border, border, size[0] - border, size[1] - border), fill=(40, 44, 52))
+    draw.line([(border + 50, size[1] - 400), (size[0] // 2, size[1] - 420), (size[0] // 2 + 20, border + 100)], fill=(255, 80, 80), width=6)
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+class TestImagePipeline(unittest.TestCase):
+    def test_detect_mime_ignores_extension(self):
+        out = io.BytesIO()
+        Image.new("RGB", (8, 8)).save(out, format="JPEG")
+        self.assertEqual(detect_mime(out.getvalue()), "image/jpeg")
+        self.assertEqual(detect_mime(dashboard_png((16, 16), 2)), "image/png")
+        self.assertIsNone(detect_mime(b"not an image"))
+
+    def test_crop_downsample_recompress(self):
+        raw = dashboard_png()
+        image = prepare_image(raw, max_side=1024)
+        self.assertLessEqual(max(image["width"], image["height"]), 1024)
+        # Border cropped before scaling: aspect follows the content box, not the canvas
+        self.assertAlmostEqual(image["width"] / image["height"], 2008 / 1208, places=1)
+        self.assertLess(image["bytes"], len(raw))
+        self.assertEqual(detect_mime(image["data"]), image["mime"])
+
+    def test_cache_ttl(self):
+        cache = VisionCache(ttl=0.05, max_entries=2)
+        cache.put("a", "spike")
+        self.assertEqual(cache.get("a"), "spike")
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("a"))
+        for key in "bcd":
+            cache.put(key, key)
+        self.assertIsNone(cache.get("b"))  # LRU bound
+
+
+class TestAgentVision(unittest.TestCase):
+    def test_same_screenshot_is_analysed_once(self):
+        with GeminiStub() as stub, tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "alert.png")
+            with open(path, "wb") as f:
+                f.write(dashboard_png())
+            client = genai.Client(api_key="stub", http_options=types.HttpOptions(base_url=stub.base_url))
+            agent = SysMindAgent(client=client, console=QuietConsole())
+            agent.simulation_mode = False
+            agent.rate_limiter = RateLimiter(rpm=0, tpm=0)
+            agent.vision_cache = VisionCache()
+
+            first = agent.run_tool("analyze_dashboard", image_path=path)
+            second = agent.run_tool("analyze_dashboard", image_path=path)
+            self.assertIn("[VISUAL ANALYSIS]", first)
+            self.assertEqual(first, second)
+            self.assertEqual(stub.stats["vision"], 1)
+            self.assertEqual(agent.vision_stats["cache_hits"], 1)
+            self.assertLess(agent.vision_stats["upload_bytes"], agent.vision_stats["original_bytes"])
+            self.assertTrue(agent.vision_cache.get(f"{agent.model_id}:1024:{image_digest(open(path, 'rb').read())}"))
+
+
+if __name__ == '__main__':
+    unittest.main()